@@ -9,7 +9,14 @@ sys.path.append(os.path.join(project_root, 'ml-models'))
 
 # Import the Flask app from the existing API file
 # We use standard import because we added the paths above
+# Importing is cheap: numpy, the model and the compliance package load on a
+# background thread, and the first request waits for them only if it arrives
+# before they are ready (see /ready)
 from api import app
 
 # Vercel expects 'app' to be available for WSGI
-# It is already available from the import above
+# It is already available from the import above.
+# With ML_API_MODE=asgi, export the ASGI bridge (same routes, scoring on a
+# bounded thread pool) instead.
+if os.environ.get('ML_API_MODE') == 'asgi':
+    from asgi import app
@@ -186,7 +186,9 @@ router.post('/bulk-upload', authorize('fedex_admin'), upload.single('file'), asy
         const transaction = await sequelize.transaction();
 
         try {
-            // Validate and create cases
+            // Validate rows and derive model features
+            const validRows: Array<{ index: number; row: any; amount: number; dueDate: Date; overdueDays: number }> = [];
+            const today = new Date();
             for (let i = 0; i < results.length; i++) {
                 const row = results[i];
 
@@ -196,23 +198,32 @@ router.post('/bulk-upload', authorize('fedex_admin'), upload.single('file'), asy
                     continue;
                 }
 
-                try {
-                    const amount = parseFloat(row.amount);
-                    const dueDate = new Date(row.dueDate);
-                    const today = new Date();
-                    const overdueDays = Math.max(0, Math.floor((today.getTime() - dueDate.getTime()) / (1000 * 60 * 60 * 24)));
+                const amount = parseFloat(row.amount);
+                const dueDate = new Date(row.dueDate);
+                const overdueDays = Math.max(0, Math.floor((today.getTime() - dueDate.getTime()) / (1000 * 60 * 60 * 24)));
+
+                validRows.push({ index: i, row, amount, dueDate, overdueDays });
+            }
+
+            // Get ML predictions for all rows in a single batch call
+            const predictions = await MLService.predictPaymentProbabilityBatch(
+                validRows.map(({ amount, overdueDays }) => ({
+                    overdueDays,
+                    amount,
+                    historicalPayments: 0,
+                    contactFrequency: 0,
+                }))
+            );
+
+            // Create cases
+            for (let j = 0; j < validRows.length; j++) {
+                const { index: i, row, amount, dueDate, overdueDays } = validRows[j];
+                const prediction = predictions[j];
 
+                try {
                     // Generate case number
                     const caseNumber = `CASE-${Date.now()}-${Math.floor(Math.random() * 1000)}`;
 
-                    // Get ML predictions
-                    const prediction = await MLService.predictPaymentProbability({
-                        overdueDays,
-                        amount,
-                        historicalPayments: 0,
-                        contactFrequency: 0,
-                    });
-
                     // Create case within transaction
                     const caseRecord = await Case.create({
                         caseNumber,
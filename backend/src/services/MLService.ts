@@ -17,6 +17,14 @@ interface PredictionResponse {
     priority: 'high' | 'medium' | 'low';
 }
 
+interface BatchPredictionResponse {
+    count: number;
+    paymentProbability: number[];
+    riskScore: number[];
+    priority: Array<'high' | 'medium' | 'low'>;
+    confidence: number[];
+}
+
 class MLService {
     async predictPaymentProbability(input: PredictionInput): Promise<PredictionResponse> {
         try {
@@ -33,6 +41,29 @@ class MLService {
         }
     }
 
+    async predictPaymentProbabilityBatch(inputs: PredictionInput[]): Promise<PredictionResponse[]> {
+        if (inputs.length === 0) return [];
+
+        try {
+            // One vectorized call for the whole batch; allow ~1s per 10k rows on top of the base timeout
+            const response = await axios.post<BatchPredictionResponse>(`${ML_API_URL}/predict/batch`, { cases: inputs }, {
+                timeout: 5000 + Math.ceil(inputs.length / 10000) * 1000,
+            });
+
+            const { paymentProbability, riskScore, priority } = response.data;
+            return inputs.map((_, i) => ({
+                paymentProbability: paymentProbability[i],
+                riskScore: riskScore[i],
+                priority: priority[i],
+            }));
+        } catch (error: any) {
+            logger.error('ML API batch call failed:', error.message);
+
+            // Fallback to rule-based scoring if ML API is unavailable
+            return inputs.map((input) => this.fallbackScoring(input));
+        }
+    }
+
     private fallbackScoring(input: PredictionInput): PredictionResponse {
         logger.warn('Using fallback rule-based scoring');
 
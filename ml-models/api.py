@@ -1,24 +1,298 @@
-from flask import Flask, request, jsonify
+import time
+_import_started = time.perf_counter()
+
+from flask import Flask, request, jsonify, g, has_request_context
 from flask_cors import CORS
+import hmac
+import json
 import os
+import signal
 import sys
+import threading
+from datetime import date
+from types import SimpleNamespace
 
 # Add parent directory to path
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
-from prediction.predict import PaymentPredictor
-from scoring.risk_engine import RiskEngine
+from scoring.risk_engine import RiskEngine, RISK_COLUMNS
 from recommendation.prioritizer import CasePrioritizer
-from compliance.decision_orchestrator import DecisionOrchestrator
+from recommendation.dca_registry import DCARegistry, UPDATABLE_FIELDS
+from recommendation.priority_index import COMPONENTS, PriorityIndex
+from serving.cache import FeatureError, PredictionCache, feature_key
+from serving.coalescer import MicroBatcher
+from serving.readiness import BackgroundLoader
+from prediction.registry import ModelRegistry
 
 app = Flask(__name__)
 CORS(app)
 
-# Initialize ML components
-predictor = PaymentPredictor()
+# Rule-based engines are plain Python and load instantly
 risk_engine = RiskEngine()
-prioritizer = CasePrioritizer()
-compliance_orchestrator = DecisionOrchestrator()
+
+# Server-side DCA roster, optionally seeded from a JSON list of DCAs. Updates
+# through /dcas apply to the worker process that receives them
+dca_registry = DCARegistry()
+if os.environ.get('ML_DCA_ROSTER'):
+    with open(os.environ['ML_DCA_ROSTER']) as roster:
+        dca_registry = DCARegistry.from_dcas(json.load(roster))
+prioritizer = CasePrioritizer(dca_registry)
+
+# Open cases in priority order for work-queue views, kept current through
+# /cases. It lives in this process: with several processes each would see
+# only the updates it handled, so the /cases routes need a single process
+case_index = PriorityIndex(prioritizer)
+CASE_INDEX_MULTIPROCESS_ERROR = (
+    'The case priority index needs a single server process '
+    '(ML_API_WORKERS=1 / ML_ASGI_WORKERS=1); send cases to /prioritize instead'
+)
+
+def _case_index_refused():
+    return request.environ.get('wsgi.multiprocess', False)
+
+def _case_queue():
+    # Overdue days grow daily; re-rank the cases that crossed a bucket edge
+    case_index.tick(date.today())
+    return case_index
+
+# Loads counted by roster assignments live in this process too. With several
+# processes serving the app (gunicorn workers, the ASGI process pool) each
+# would fill every DCA's capacity on its own, so assigning over the roster
+# needs a single process
+ROSTER_MULTIPROCESS_ERROR = (
+    'Assigning over the server-side roster needs a single server process '
+    '(ML_API_WORKERS=1 / ML_ASGI_WORKERS=1); send available_dcas instead'
+)
+
+def _roster_assignment_refused():
+    return request.environ.get('wsgi.multiprocess', False)
+
+# The payment model (numpy + model artifacts) and the compliance package load
+# on a background thread so importing the app stays fast. Requests that need
+# them wait for loading to finish; /ready reports when they can be served
+# without waiting.
+def _load_models():
+    from prediction.predict import PaymentPredictor
+    from compliance.decision_orchestrator import DecisionOrchestrator
+
+    return SimpleNamespace(
+        predictor=PaymentPredictor(),
+        compliance_orchestrator=DecisionOrchestrator()
+    )
+
+WARMUP_CASES = [
+    {'overdueDays': 15, 'amount': 1500, 'historicalPayments': 5, 'contactFrequency': 2},
+    {'overdueDays': 45, 'amount': 5000, 'historicalPayments': 2, 'contactFrequency': 1},
+    {'overdueDays': 95, 'amount': 12000, 'historicalPayments': 0, 'contactFrequency': 6},
+    {'overdueDays': 150, 'amount': 25000, 'historicalPayments': 1, 'contactFrequency': 0}
+]
+
+def _validate_predictor(predictor):
+    """
+    Run the warm-up batch through every prediction path and sanity-check it
+
+    Raises ValueError if the model didn't load or its output is off.
+    """
+    if not predictor.is_trained:
+        raise ValueError('Model files not found')
+    columns = predictor.predict_many(WARMUP_CASES)
+    predictor.predict_with_explanation_many(WARMUP_CASES)
+    single = [predictor.predict(case)['paymentProbability'] for case in WARMUP_CASES]
+    if columns['paymentProbability'] != single:
+        raise ValueError('Batch and single-row predictions disagree')
+    if not all(0 <= probability <= 100 for probability in single):
+        raise ValueError(f"Payment probabilities out of range: {single}")
+
+def _warm_up(loaded):
+    """Run a small batch through every scoring path before reporting ready"""
+    if loaded.predictor.is_trained:
+        _validate_predictor(loaded.predictor)
+    else:
+        loaded.predictor.predict_many(WARMUP_CASES)
+        loaded.predictor.predict_with_explanation_many(WARMUP_CASES)
+        for case in WARMUP_CASES:
+            loaded.predictor.predict(case)
+    for case in WARMUP_CASES:
+        risk_engine.get_risk_assessment({**case, 'paymentProbability': 50})
+        prioritizer.calculate_priority_score({**case, 'paymentProbability': 50})
+    loaded.compliance_orchestrator.make_decision({}, 'send_sms')
+
+models = BackgroundLoader('models', _load_models, _warm_up)
+models.start()
+
+def current_predictor():
+    """The payment model for this request (reported in X-Model-Version)"""
+    predictor = models.get().predictor
+    g.model_version = predictor.model_version or 'fallback'
+    return predictor
+
+# Model hot-swap - new versions are published to the registry
+# (prediction.registry); every process watches its active version and swaps
+# the predictor in once the candidate passes validation
+model_registry = ModelRegistry()
+reload_interval = float(os.environ.get('ML_MODEL_RELOAD_INTERVAL', 10))
+admin_token = os.environ.get('ML_ADMIN_TOKEN', '')
+_reload_lock = threading.Lock()
+_rejected_versions = set()
+_watcher_pid = None
+_watcher_lock = threading.Lock()
+
+def reload_model(version=None, activate=False):
+    """
+    Swap the payment model for a registry version (default: the active one)
+
+    The candidate is loaded and validated on the warm-up batch first; if it
+    fails, the error is raised and the current model keeps serving. Requests
+    already running finish on the model they started with. With activate,
+    the version is made the registry's active one only after it passes, so
+    a rejected version never reaches the other workers or the next boot.
+
+    Returns:
+        (previous_version, model_version)
+    """
+    from prediction.predict import PaymentPredictor
+
+    with _reload_lock:
+        version = version or model_registry.current()
+        if version is None:
+            raise ValueError('No active model version in the registry')
+        loaded = models.get()
+        if version == loaded.predictor.model_version:
+            if activate:
+                model_registry.activate(version)
+            return version, version
+
+        try:
+            candidate = PaymentPredictor(artifact_path=model_registry.path(version))
+            _validate_predictor(candidate)
+        except Exception:
+            _rejected_versions.add(version)
+            raise
+        if activate:
+            model_registry.activate(version)
+        models.replace(SimpleNamespace(**{**vars(loaded), 'predictor': candidate}))
+        previous_version = loaded.predictor.model_version or 'fallback'
+        print(f"Model reloaded: {previous_version} -> {version} (pid {os.getpid()})")
+        return previous_version, version
+
+def _reload_quietly(version=None):
+    try:
+        reload_model(version)
+    except Exception as e:
+        print(f"Warning: model reload failed, keeping {models.get().predictor.model_version or 'fallback'}: {e}")
+
+def _watch_registry():
+    while True:
+        version = model_registry.current()
+        if (version and models.ready and version not in _rejected_versions
+                and version != models.get().predictor.model_version):
+            # Re-read CURRENT under the reload lock, so a concurrent admin
+            # reload that just activated another version isn't undone
+            _reload_quietly()
+        time.sleep(reload_interval)
+
+@app.before_request
+def _start_registry_watcher():
+    # Threads don't survive fork - start one per worker process. The first
+    # requests of a threaded worker race here, so check again under the lock
+    global _watcher_pid
+    if reload_interval <= 0 or _watcher_pid == os.getpid():
+        return
+    with _watcher_lock:
+        if _watcher_pid != os.getpid():
+            threading.Thread(target=_watch_registry, name='model-registry-watcher', daemon=True).start()
+            _watcher_pid = os.getpid()
+
+@app.after_request
+def _model_version_header(response):
+    version = g.get('model_version')
+    if version is None and models.ready:
+        version = models.get().predictor.model_version or 'fallback'
+    if version is not None:
+        response.headers['X-Model-Version'] = version
+    return response
+
+# Result caches - keyed on the normalized features each engine reads
+cache_settings = {
+    'max_entries': int(os.environ.get('ML_CACHE_MAX_ENTRIES', 100000)),
+    'max_bytes': int(os.environ.get('ML_CACHE_MAX_BYTES', 64 * 1024 * 1024)),
+    'ttl_seconds': float(os.environ.get('ML_CACHE_TTL_SECONDS', 300))
+}
+predict_cache = PredictionCache(
+    'predict',
+    version=lambda: models.get().predictor.model_version if models.ready else None,
+    **cache_settings
+)
+risk_cache = PredictionCache('risk', **cache_settings)
+priority_cache = PredictionCache('priority', **cache_settings)
+
+# prediction.predict.FEATURE_NAMES - not imported here so numpy loads in the background
+PREDICT_KEY_FIELDS = [
+    (name, KeyError) for name in ('overdueDays', 'amount', 'historicalPayments', 'contactFrequency')
+]
+RISK_KEY_FIELDS = [
+    ('paymentProbability', 50), ('overdueDays', 0), ('amount', 0),
+    ('historicalDefaults', 0), ('historicalPayments', 0), ('contactFrequency', 0)
+]
+PRIORITY_KEY_FIELDS = [
+    ('paymentProbability', 50), ('amount', 0), ('overdueDays', 0), ('slaStatus', 'on_track')
+]
+
+# Micro-batching - concurrent single-row requests that miss the cache are
+# scored together in one vectorized call
+def _predict_rows(rows):
+    columns = models.get().predictor.predict_many(rows)
+    return [dict(zip(columns, values)) for values in zip(*columns.values())]
+
+def _assess_rows(rows):
+    columns = {
+        name: [row.get(name, default) for row in rows] for name, default in RISK_COLUMNS.items()
+    }
+    assessed = risk_engine.get_risk_assessment_many(columns, decode=True)
+    return [
+        {'riskScore': score, 'riskLevel': level, 'riskFactors': factors}
+        for score, level, factors in zip(
+            assessed['riskScore'].tolist(), assessed['riskLevel'].tolist(), assessed['riskFactors']
+        )
+    ]
+
+batching_enabled = os.environ.get('ML_BATCH_ENABLED', 'true').lower() == 'true'
+batch_settings = {
+    'max_batch_size': int(os.environ.get('ML_BATCH_MAX_SIZE', 64)),
+    'max_wait_ms': float(os.environ.get('ML_BATCH_WINDOW_MS', 2))
+}
+predict_batcher = MicroBatcher('predict', _predict_rows, **batch_settings)
+risk_batcher = MicroBatcher('score-risk', _assess_rows, **batch_settings)
+
+def _coalescing():
+    """
+    Whether this request can share a batch with others
+
+    Only when the server runs requests concurrently in this process
+    (gunicorn gthread workers, the ASGI thread executor, the threaded dev
+    server). A sync worker serves one request at a time, so its batches
+    would always hold one item and only add the hand-off to the batcher.
+    """
+    return batching_enabled and has_request_context() and request.environ.get('wsgi.multithread', False)
+
+def cached_predict(features):
+    predictor = current_predictor()
+    return predict_cache.get_or_compute(
+        feature_key(features, PREDICT_KEY_FIELDS),
+        lambda: predict_batcher.submit(features) if _coalescing() else predictor.predict(features)
+    )
+
+def cached_risk_assessment(features):
+    return risk_cache.get_or_compute(
+        feature_key(features, RISK_KEY_FIELDS),
+        lambda: risk_batcher.submit(features) if _coalescing() else risk_engine.get_risk_assessment(features)
+    )
+
+def cached_priority_score(features):
+    return priority_cache.get_or_compute(
+        feature_key(features, PRIORITY_KEY_FIELDS),
+        lambda: prioritizer.calculate_priority_score(features)
+    )
 
 @app.route('/health', methods=['GET'])
 def health_check():
@@ -29,12 +303,88 @@ def health_check():
         'modules': ['predictor', 'risk_engine', 'prioritizer', 'compliance_engine']
     })
 
+@app.route('/ready', methods=['GET'])
+def readiness_check():
+    """
+    Readiness probe - 200 once models are loaded and warmed up, 503 before
+
+    /health only says the process is up; route traffic on /ready.
+    """
+    status = models.status()
+    result = {
+        'status': 'ready' if models.ready else status['state'],
+        'import_ms': round(import_seconds * 1000, 1),
+        'load_ms': status['load_ms'],
+        'warmup_ms': status['warmup_ms']
+    }
+    if models.ready:
+        result['modelVersion'] = models.get().predictor.model_version
+        result['modelTrained'] = models.get().predictor.is_trained
+        result['registryVersion'] = model_registry.current()
+    elif status['error']:
+        result['error'] = status['error']
+    return jsonify(result), 200 if models.ready else 503
+
+@app.route('/cache/stats', methods=['GET'])
+def cache_stats():
+    return jsonify({
+        'caches': [cache.stats() for cache in (predict_cache, risk_cache, priority_cache)]
+    })
+
+@app.route('/batching/stats', methods=['GET'])
+def batching_stats():
+    return jsonify({
+        'enabled': batching_enabled,
+        # False on sync workers, which bypass the batchers
+        'active': bool(_coalescing()),
+        'batchers': [batcher.stats() for batcher in (predict_batcher, risk_batcher)]
+    })
+
+@app.route('/admin/model/reload', methods=['POST'])
+def admin_reload_model():
+    """
+    Hot-swap the payment model
+
+    Request: {} to load the registry's active version, or { "version": "..." }
+             to load that version and, once it passes validation, make it
+             the active one (other workers follow within
+             ML_MODEL_RELOAD_INTERVAL seconds)
+    Header: X-Admin-Token: <ML_ADMIN_TOKEN>
+    """
+    if not admin_token:
+        return jsonify({'error': 'Admin endpoints are disabled (ML_ADMIN_TOKEN is not set)'}), 403
+    if not hmac.compare_digest(request.headers.get('X-Admin-Token', ''), admin_token):
+        return jsonify({'error': 'Invalid admin token'}), 403
+
+    try:
+        data = request.get_json(silent=True) or {}
+        version = data.get('version')
+        _rejected_versions.discard(version or model_registry.current())
+
+        previous_version, model_version = reload_model(version, activate=bool(version))
+        g.model_version = model_version
+        return jsonify({
+            'success': True,
+            'previousVersion': previous_version,
+            'modelVersion': model_version,
+            'reloaded': previous_version != model_version
+        })
+
+    except (ValueError, FileNotFoundError) as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)}), 500
+
 @app.route('/predict', methods=['POST'])
 def predict():
     """Original prediction endpoint - payment probability"""
     try:
         data = request.json
-        prediction = predictor.predict(data)
+        prediction = cached_predict(data)
+        risk_assessment = cached_risk_assessment({
+            **data,
+            'paymentProbability': prediction['paymentProbability']
+        })
         # Combine results
         result = {
             **prediction,
@@ -44,6 +394,87 @@ def predict():
         
         return jsonify(result)
         
+    except KeyError as e:
+        return jsonify({'error': f'Missing feature {e}'}), 400
+    except FeatureError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/predict/batch', methods=['POST'])
+def predict_batch():
+    """
+    Batch prediction endpoint - scores N cases in one vectorized model call
+
+    Request: { "cases": [{ "overdueDays": 45, "amount": 5000, ... }, ...] }
+    Returns: Columnar result - parallel arrays of paymentProbability, riskScore,
+             priority and confidence in request order
+    """
+    try:
+        data = request.get_json(silent=True)
+
+        cases = data.get('cases') if isinstance(data, dict) else None
+        if not isinstance(cases, list):
+            return jsonify({'error': 'Missing cases list'}), 400
+
+        # Validate required fields, as /predict does per case
+        required_fields = ['overdueDays', 'amount', 'historicalPayments', 'contactFrequency']
+        for i, case in enumerate(cases):
+            if not isinstance(case, dict):
+                return jsonify({'error': f'Case {i} is not an object'}), 400
+            for field in required_fields:
+                if field not in case:
+                    return jsonify({'error': f'Missing required field: {field} (case {i})'}), 400
+
+        predictions = current_predictor().predict_many(cases)
+
+        return jsonify({
+            'count': len(cases),
+            **predictions
+        })
+
+    except ValueError as e:
+        # A feature that isn't a number
+        return jsonify({'error': f'Invalid feature value: {e}'}), 400
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/score/full', methods=['POST'])
+def score_full():
+    """
+    Full scoring in one pass - prediction, risk, priority and optionally DCA assignment
+
+    Request: { "cases": [...], "available_dcas": [...] (optional), "assign": true (optional) }
+             "assign" without available_dcas assigns over the server-side roster
+    Returns: Columnar result in request order, plus the batch assignment
+             when DCAs are given
+    """
+    from scoring.pipeline import score_full as run_pipeline
+
+    try:
+        data = request.get_json()
+
+        cases = data.get('cases')
+        if not isinstance(cases, list):
+            return jsonify({'error': 'Missing cases list'}), 400
+
+        available_dcas = data.get('available_dcas')
+        use_roster = available_dcas is None and data.get('assign', False)
+        if use_roster and _roster_assignment_refused():
+            return jsonify({'error': ROSTER_MULTIPROCESS_ERROR}), 409
+
+        result = run_pipeline(cases, current_predictor(), risk_engine, prioritizer, available_dcas)
+        if use_roster and len(dca_registry):
+            # Scored outside the roster lock; only the assignment holds it
+            result['assignment'] = dca_registry.assign(
+                lambda roster: prioritizer.assign_dcas(
+                    cases, roster, priority_scores=result['priorityScore']
+                )
+            )
+        return jsonify(result)
+
+    except KeyError as e:
+        return jsonify({'error': f'Missing feature {e}'}), 400
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -52,9 +483,11 @@ def score_risk():
     try:
         data = request.get_json()
         
-        risk_assessment = risk_engine.get_risk_assessment(data)
+        risk_assessment = cached_risk_assessment(data)
         return jsonify(risk_assessment)
         
+    except FeatureError as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -63,13 +496,22 @@ def prioritize():
     try:
         data = request.get_json()
         
-        # Single case prioritization
+        top_k = data.get('topK')
+        if top_k is not None and (not isinstance(top_k, int) or top_k < 0):
+            return jsonify({'error': 'topK must be a non-negative integer'}), 400
+        
+        # Work queue as columns: {"columns": {"amount": [...], ...}, "ids": [...]}
+        if 'columns' in data:
+            top = prioritizer.prioritize_many(data['columns'], top_k=top_k, ids=data.get('ids'))
+            return jsonify({'cases': {name: values.tolist() for name, values in top.items()}})
+        
+        # Case list - with topK only the best cases' ids and scores are returned
         if 'cases' in data:
-            prioritized_cases = prioritizer.prioritize_cases(data['cases'])
+            prioritized_cases = prioritizer.prioritize_cases(data['cases'], top_k=top_k)
             return jsonify({'cases': prioritized_cases})
         else:
             # Single case score
-            priority_score = prioritizer.calculate_priority_score(data)
+            priority_score = cached_priority_score(data)
             
             if priority_score >= 75:
                 priority_level = 'high'
@@ -83,21 +525,217 @@ def prioritize():
                 'priorityLevel': priority_level
             })
         
+    except FeatureError as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+@app.route('/dcas', methods=['GET'])
+def list_dcas():
+    return jsonify({'dcas': dca_registry.dcas()})
+
+@app.route('/dcas', methods=['POST'])
+def upsert_dcas():
+    """
+    Add or update DCAs in the server-side roster
+
+    Request: { "dcas": [{ "id": ..., "name": ..., "success_rate": ..., "current_load": ...,
+               "max_load": ..., "specialization": ... }, ...] }
+    """
+    try:
+        data = request.get_json()
+        
+        dcas = data.get('dcas', [])
+        if not isinstance(dcas, list) or any(not isinstance(dca, dict) or 'id' not in dca for dca in dcas):
+            return jsonify({'error': 'dcas must be a list of DCAs with ids'}), 400
+        dca_registry.upsert_many(dcas)
+        
+        return jsonify({'count': len(dca_registry)})
+        
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/dcas/<dca_id>', methods=['PATCH'])
+def update_dca(dca_id):
+    """
+    Change one DCA's fields, or its load by a number of cases
+
+    Request: { "success_rate": 74 } or { "loadDelta": 1 } - any of loadDelta,
+             name, success_rate, current_load, max_load, specialization
+    """
+    try:
+        data = request.get_json(silent=True)
+        if not isinstance(data, dict):
+            return jsonify({'error': 'Request body must be a JSON object'}), 400
+        
+        if dca_id not in dca_registry:
+            return jsonify({'error': f'Unknown DCA {dca_id}'}), 404
+        load_delta = data.pop('loadDelta', 0)
+        if isinstance(load_delta, bool) or not isinstance(load_delta, int):
+            return jsonify({'error': 'loadDelta must be an integer'}), 400
+        unknown = sorted(set(data) - set(UPDATABLE_FIELDS))
+        if unknown:
+            return jsonify({
+                'error': f"Can't update {', '.join(unknown)} - fields are loadDelta, {', '.join(UPDATABLE_FIELDS)}"
+            }), 400
+        # Fields and load change together, or not at all
+        dca_registry.update(dca_id, load_delta=load_delta, **data)
+        
+        return jsonify({'dca': dca_registry.get(dca_id)})
+        
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/dcas/<dca_id>', methods=['DELETE'])
+def remove_dca(dca_id):
+    if not dca_registry.remove(dca_id):
+        return jsonify({'error': f'Unknown DCA {dca_id}'}), 404
+    return jsonify({'count': len(dca_registry)})
+
+@app.route('/cases', methods=['POST'])
+def upsert_cases():
+    """
+    Add or update open cases in the priority index
+
+    Request: { "cases": [{ "id": ..., "paymentProbability": ..., "amount": ...,
+               "overdueDays": ..., "slaStatus": ... }, ...] }
+    """
+    if _case_index_refused():
+        return jsonify({'error': CASE_INDEX_MULTIPROCESS_ERROR}), 409
+    try:
+        data = request.get_json(silent=True)
+        cases = data.get('cases') if isinstance(data, dict) else None
+        if not isinstance(cases, list) or any(not isinstance(case, dict) or 'id' not in case for case in cases):
+            return jsonify({'error': 'cases must be a list of cases with ids'}), 400
+        # Ids are kept as strings, as /cases/<id> looks them up
+        _case_queue().upsert_many([{**case, 'id': str(case['id'])} for case in cases])
+        
+        return jsonify({'count': len(case_index)})
+        
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/cases/next', methods=['GET'])
+def next_case():
+    """The highest-priority open case ({"case": null} when there are none)"""
+    if _case_index_refused():
+        return jsonify({'error': CASE_INDEX_MULTIPROCESS_ERROR}), 409
+    return jsonify({'case': _case_queue().next_best()})
+
+@app.route('/cases/queue', methods=['GET'])
+def case_queue():
+    """The topK (default 50) highest-priority open cases"""
+    if _case_index_refused():
+        return jsonify({'error': CASE_INDEX_MULTIPROCESS_ERROR}), 409
+    top_k = request.args.get('topK', '50')
+    if not top_k.isdigit():
+        return jsonify({'error': 'topK must be a non-negative integer'}), 400
+    return jsonify({'cases': _case_queue().top(int(top_k))})
+
+@app.route('/cases/<case_id>', methods=['GET'])
+def get_case(case_id):
+    if _case_index_refused():
+        return jsonify({'error': CASE_INDEX_MULTIPROCESS_ERROR}), 409
+    queue = _case_queue()
+    if case_id not in queue:
+        return jsonify({'error': f'Unknown case {case_id}'}), 404
+    return jsonify({'case': {**queue.get(case_id), 'rank': queue.rank(case_id)}})
+
+@app.route('/cases/<case_id>', methods=['PATCH'])
+def update_case(case_id):
+    """
+    Change an open case's features, e.g. its SLA status
+
+    Request: { "slaStatus": "breached" } - any of paymentProbability, amount,
+             overdueDays, slaStatus
+    """
+    if _case_index_refused():
+        return jsonify({'error': CASE_INDEX_MULTIPROCESS_ERROR}), 409
+    try:
+        data = request.get_json(silent=True)
+        if not isinstance(data, dict):
+            return jsonify({'error': 'Request body must be a JSON object'}), 400
+        
+        queue = _case_queue()
+        if case_id not in queue:
+            return jsonify({'error': f'Unknown case {case_id}'}), 404
+        unknown = sorted(set(data) - set(COMPONENTS))
+        if unknown:
+            return jsonify({
+                'error': f"Can't update {', '.join(unknown)} - fields are {', '.join(COMPONENTS)}"
+            }), 400
+        queue.upsert(case_id, **data)
+        
+        return jsonify({'case': {**queue.get(case_id), 'rank': queue.rank(case_id)}})
+        
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/cases/<case_id>', methods=['DELETE'])
+def close_case(case_id):
+    """Drop a closed case from the priority index"""
+    if _case_index_refused():
+        return jsonify({'error': CASE_INDEX_MULTIPROCESS_ERROR}), 409
+    if not case_index.close(case_id):
+        return jsonify({'error': f'Unknown case {case_id}'}), 404
+    return jsonify({'count': len(case_index)})
+
 @app.route('/recommend-dca', methods=['POST'])
 def recommend_dca():
     try:
         data = request.get_json()
         
         case = data.get('case', {})
-        available_dcas = data.get('available_dcas', [])
+        # Without available_dcas the server-side roster is used
+        available_dcas = data.get('available_dcas')
+        top_k = data.get('topK')
+        if top_k is not None and (not isinstance(top_k, int) or top_k < 0):
+            return jsonify({'error': 'topK must be a non-negative integer'}), 400
         
-        recommendation = prioritizer.recommend_dca_assignment(case, available_dcas)
+        recommendation = prioritizer.recommend_dca_assignment(case, available_dcas, top_k=top_k)
         
         return jsonify({'recommended_dca': recommendation})
-        
+
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/recommend-dca/batch', methods=['POST'])
+def recommend_dca_batch():
+    """
+    Assign a batch of cases to DCAs in one go, within each DCA's capacity
+
+    Request: { "cases": [...], "available_dcas": [...] }
+    Returns: one assignment per case (request order) and the resulting DCA loads
+    """
+    try:
+        data = request.get_json()
+
+        cases = data.get('cases', [])
+        available_dcas = data.get('available_dcas')
+        # Without available_dcas the batch goes to the server-side roster,
+        # whose loads then count the assigned cases
+        if available_dcas is None:
+            if not len(dca_registry):
+                return jsonify({'error': 'Missing available_dcas'}), 400
+            if _roster_assignment_refused():
+                return jsonify({'error': ROSTER_MULTIPROCESS_ERROR}), 409
+            # Read, solve and count the loads under the roster lock, so
+            # concurrent batches don't fill the same capacity
+            return jsonify(dca_registry.assign(lambda roster: prioritizer.assign_dcas(cases, roster)))
+
+        if not available_dcas:
+            return jsonify({'error': 'Missing available_dcas'}), 400
+
+        return jsonify(prioritizer.assign_dcas(cases, available_dcas))
+
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -122,10 +760,70 @@ def predict_with_explanation():
                 }), 400
         
         # Get explainable prediction
-        result = predictor.predict_with_explanation(data)
+        result = current_predictor().predict_with_explanation(data)
+        
+        return jsonify({
+            'success': True,
+            **result
+        })
+        
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+@app.route('/predict/explain/batch', methods=['POST'])
+def predict_with_explanation_batch():
+    """
+    Batch explainable prediction endpoint
+    
+    Request: { "cases": [{...}, ...], "explain": [0, 4, 7] }
+             explain is optional - row indices to render explanations for
+             (default: every row)
+    Returns: Columnar predictions for every case, plus explanations for the
+             requested rows (explainedRows[i] is the row of explanations[i])
+    """
+    try:
+        data = request.get_json(silent=True)
+        
+        cases = data.get('cases') if isinstance(data, dict) else None
+        if not isinstance(cases, list):
+            return jsonify({
+                'success': False,
+                'error': 'Missing cases list'
+            }), 400
+        
+        explain = data.get('explain')
+        # bool is an int subclass - true/false are not indices
+        if explain is not None and not (isinstance(explain, list) and all(
+            isinstance(i, int) and not isinstance(i, bool) and 0 <= i < len(cases) for i in explain
+        )):
+            return jsonify({
+                'success': False,
+                'error': 'explain must be a list of case indices'
+            }), 400
+        
+        # Validate required fields
+        required_fields = ['overdueDays', 'amount', 'historicalPayments', 'contactFrequency']
+        for i, case in enumerate(cases):
+            if not isinstance(case, dict):
+                return jsonify({
+                    'success': False,
+                    'error': f'Case {i} is not an object'
+                }), 400
+            for field in required_fields:
+                if field not in case:
+                    return jsonify({
+                        'success': False,
+                        'error': f'Missing required field: {field} (case {i})'
+                    }), 400
+        
+        result = current_predictor().predict_with_explanation_many(cases, explain)
         
         return jsonify({
             'success': True,
+            'count': len(cases),
             **result
         })
         
@@ -140,23 +838,24 @@ def smart_allocation():
     """
     Smart DCA Allocation endpoint - AI-driven assignment with explanations
     
-    Request: { "case": {...}, "available_dcas": [...] }
+    Request: { "case": {...}, "available_dcas": [...] } (available_dcas
+             defaults to the server-side roster)
     Returns: Best-fit DCA with match score and reasons
     """
     try:
         data = request.get_json()
         
         case = data.get('case', {})
-        available_dcas = data.get('available_dcas', [])
+        available_dcas = data.get('available_dcas')
         
-        if not case or not available_dcas:
+        if not case or not (available_dcas or (available_dcas is None and len(dca_registry))):
             return jsonify({
                 'success': False,
                 'error': 'Missing case or available_dcas'
             }), 400
         
         # Add priority score to case
-        case['priorityScore'] = prioritizer.calculate_priority_score(case)
+        case['priorityScore'] = cached_priority_score(case)
         
         # Get smart allocation recommendation
         recommendation = prioritizer.recommend_dca_assignment(case, available_dcas)
@@ -166,6 +865,8 @@ def smart_allocation():
             'allocation': recommendation
         })
         
+    except FeatureError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
     except Exception as e:
         return jsonify({
             'success': False,
@@ -190,7 +891,7 @@ def compliance_decide():
             return jsonify({'error': 'Missing proposed_action'}), 400
         
         # Make compliance decision
-        decision = compliance_orchestrator.make_decision(case_data, proposed_action)
+        decision = models.get().compliance_orchestrator.make_decision(case_data, proposed_action)
         
         return jsonify({
             'success': True,
@@ -203,11 +904,19 @@ def compliance_decide():
             'error': str(e)
         }), 500
 
+import_seconds = time.perf_counter() - _import_started
+
 if __name__ == '__main__':
     port = int(os.environ.get('FLASK_PORT', 8000))
     debug = os.environ.get('FLASK_ENV', 'production') == 'development'
     
     print(f"Starting CollectIQ ML API on port {port}")
-    print(f"Model loaded: {predictor.is_trained}")
+    print(f"App imported in {import_seconds * 1000:.0f} ms (models loading in background)")
+    predictor = models.get().predictor
+    status = models.status()
+    print(f"Model loaded: {predictor.is_trained} ({status['load_ms']:.0f} ms, warm-up {status['warmup_ms']:.0f} ms)")
+    
+    # kill -HUP <pid> reloads the registry's active version now
+    signal.signal(signal.SIGHUP, lambda *_: threading.Thread(target=_reload_quietly, daemon=True).start())
     
     app.run(host='0.0.0.0', port=port, debug=debug)
@@ -0,0 +1,48 @@
+"""
+ASGI entry point for the ML API
+
+    uvicorn asgi:app --host 0.0.0.0 --port 8000
+
+Serves the same routes as api.py. Scoring runs on a bounded pool so the
+event loop keeps accepting connections under load:
+
+    ML_ASGI_EXECUTOR         thread (default) or process
+    ML_ASGI_WORKERS          pool size (default: CPU count)
+    ML_ASGI_MAX_CONCURRENCY  requests scored at once (default: pool size)
+    ML_ASGI_MAX_QUEUE        requests allowed to wait for a slot before
+                             answering 503 (default: unbounded)
+
+The process executor forks the pool from this process once the models have
+loaded, so each worker process starts with them in memory. The thread
+executor lets them load in the background (see /ready).
+"""
+
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from api import app as wsgi_app, models
+from serving.asgi import ASGIBridge
+
+executor = os.environ.get('ML_ASGI_EXECUTOR', 'thread')
+max_queue = os.environ.get('ML_ASGI_MAX_QUEUE')
+
+if executor == 'process':
+    models.get()
+
+app = ASGIBridge(
+    wsgi_app,
+    app_target='api:app',
+    executor=executor,
+    max_workers=int(os.environ.get('ML_ASGI_WORKERS', os.cpu_count() or 1)),
+    max_concurrency=int(os.environ['ML_ASGI_MAX_CONCURRENCY']) if 'ML_ASGI_MAX_CONCURRENCY' in os.environ else None,
+    max_queue=int(max_queue) if max_queue else None
+)
+
+if __name__ == '__main__':
+    import uvicorn
+
+    port = int(os.environ.get('FLASK_PORT', 8000))
+    print(f"Starting CollectIQ ML API (ASGI, {app.executor_kind} pool of {app.max_workers}) on port {port}")
+    uvicorn.run(app, host='0.0.0.0', port=port)
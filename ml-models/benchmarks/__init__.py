@@ -0,0 +1,11 @@
+"""
+ML API benchmarks
+
+Components:
+- portfolio: Synthetic case portfolios built from the sample-data schemas
+- harness: Throughput, p50/p99 latency and peak memory of one benchmark
+- suite: Every engine and Flask route, per portfolio size
+- compare: Regression check of a run against a stored baseline
+
+Usage: python -m benchmarks run | compare (see __main__)
+"""
@@ -0,0 +1,69 @@
+"""
+Benchmark CLI
+
+    python -m benchmarks run --sizes 1000,100000,1000000 --output results.json
+    python -m benchmarks compare baseline.json results.json
+
+Run from the ml-models directory. compare exits non-zero if any benchmark
+regressed beyond the thresholds.
+"""
+
+import argparse
+import json
+import sys
+
+from .compare import compare, format_report
+from .suite import DEFAULT_SIZES, run
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m benchmarks')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    run_parser = commands.add_parser('run', help='run the suite and write JSON results')
+    run_parser.add_argument('--sizes', default=','.join(str(size) for size in DEFAULT_SIZES),
+                            help='comma-separated portfolio sizes')
+    run_parser.add_argument('--max-calls', type=int, default=2000,
+                            help='cases scored one by one per per-call benchmark')
+    run_parser.add_argument('--batch-size', type=int, default=1000,
+                            help='cases per request for batch routes')
+    run_parser.add_argument('--repeat', type=int, default=3, help='runs per batch benchmark')
+    run_parser.add_argument('--seed', type=int, default=0)
+    run_parser.add_argument('--only', help='only benchmarks whose name contains this')
+    run_parser.add_argument('--output', default='benchmark-results.json')
+
+    compare_parser = commands.add_parser('compare', help='flag regressions against a baseline')
+    compare_parser.add_argument('baseline')
+    compare_parser.add_argument('current')
+    compare_parser.add_argument('--threshold', type=float, default=0.10,
+                                help='allowed throughput drop / p50 increase (fraction)')
+    compare_parser.add_argument('--p99-threshold', type=float, default=0.25)
+    compare_parser.add_argument('--memory-threshold', type=float, default=0.20)
+
+    args = parser.parse_args(argv)
+
+    if args.command == 'run':
+        results = run(
+            sizes=[int(size) for size in args.sizes.split(',')],
+            max_calls=args.max_calls,
+            batch_size=args.batch_size,
+            repeat=args.repeat,
+            seed=args.seed,
+            only=args.only
+        )
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+        print(f"Results written to {args.output}")
+        return 0
+
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    with open(args.current) as f:
+        current = json.load(f)
+    rows = compare(baseline, current, args.threshold, args.p99_threshold, args.memory_threshold)
+    print(format_report(rows))
+    return 1 if any(row['regressions'] for row in rows) else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,95 @@
+"""
+Benchmark Comparison
+Flags regressions of a run against a stored baseline
+"""
+
+from typing import Any, Dict, List
+
+# metric -> True if higher is better
+METRICS = {
+    'throughput_per_s': True,
+    'p50_ms': False,
+    'p99_ms': False,
+    'peak_memory_mb': False
+}
+
+# Latency changes smaller than this are timer noise, whatever the ratio
+MIN_LATENCY_DELTA_MS = 0.01
+
+
+def compare(
+    baseline: Dict[str, Any],
+    current: Dict[str, Any],
+    threshold: float = 0.10,
+    p99_threshold: float = 0.25,
+    memory_threshold: float = 0.20
+) -> List[Dict[str, Any]]:
+    """
+    Compare two suite results benchmark by benchmark
+
+    Args:
+        baseline, current: output of suite.run()
+        threshold: allowed relative throughput drop / p50 increase
+        p99_threshold: allowed relative p99 increase (tail latency is noisier)
+        memory_threshold: allowed relative peak memory increase
+
+    Returns:
+        one row per (name, size) in either run, with the relative change of
+        each metric and the list of regressions (empty if none)
+    """
+    limits = {
+        'throughput_per_s': threshold,
+        'p50_ms': threshold,
+        'p99_ms': p99_threshold,
+        'peak_memory_mb': memory_threshold
+    }
+    before = {(r['name'], r['size']): r for r in baseline['results']}
+    after = {(r['name'], r['size']): r for r in current['results']}
+
+    rows = []
+    for key in list(before) + [key for key in after if key not in before]:
+        old, new = before.get(key), after.get(key)
+        row = {'name': key[0], 'size': key[1], 'changes': {}, 'regressions': []}
+        rows.append(row)
+
+        if new is None:
+            row['status'] = 'missing'
+            continue
+        if old is None:
+            row['status'] = 'new'
+            continue
+        row['status'] = 'ok'
+
+        for metric, higher_is_better in METRICS.items():
+            old_value, new_value = old.get(metric), new.get(metric)
+            if not old_value or new_value is None:
+                continue
+            change = (new_value - old_value) / old_value
+            row['changes'][metric] = round(change, 4)
+
+            worse = -change if higher_is_better else change
+            if metric.endswith('_ms') and abs(new_value - old_value) < MIN_LATENCY_DELTA_MS:
+                continue
+            if worse > limits[metric]:
+                row['regressions'].append(metric)
+
+        if new.get('errors', 0) > old.get('errors', 0):
+            row['regressions'].append('errors')
+        if row['regressions']:
+            row['status'] = 'regressed'
+
+    return rows
+
+
+def format_report(rows: List[Dict[str, Any]]) -> str:
+    lines = []
+    for row in rows:
+        changes = '  '.join(
+            f"{metric} {change:+.1%}" for metric, change in row['changes'].items()
+        )
+        flag = f" <- {', '.join(row['regressions'])}" if row['regressions'] else ''
+        lines.append(f"{row['status'].upper():<9} {row['name']:<48} {row['size']:>9,}  {changes}{flag}")
+
+    regressed = sum(1 for row in rows if row['regressions'])
+    lines.append(f"{regressed} regression(s) in {len(rows)} benchmark(s)")
+    return '\n'.join(lines)
@@ -0,0 +1,87 @@
+"""
+Benchmark Harness
+Times a benchmark body and reports throughput, latency percentiles and peak memory
+"""
+
+import time
+import tracemalloc
+from typing import Any, Callable, Dict, List, NamedTuple
+
+import numpy as np
+
+
+class Benchmark(NamedTuple):
+    """
+    One thing to measure
+
+    kind 'call': fn(item) runs once per input, latency is per call.
+    kind 'batch': fn(inputs) runs `repeat` times, latency is per batch.
+    items is the number of cases one fn call scores (1 for most 'call'
+    benchmarks), so throughput is comparable across kinds.
+    """
+    name: str
+    kind: str
+    fn: Callable[[Any], Any]
+    inputs: List[Any]
+    items: int = 1
+
+
+def measure(benchmark: Benchmark, size: int, repeat: int = 3, warmup: int = 3,
+            memory_sample: int = 1000) -> Dict[str, Any]:
+    """
+    Run one benchmark and summarize it
+
+    Timing and memory are separate passes: tracemalloc slows allocation down
+    enough to distort latency, so peak memory is taken from one extra run
+    (the whole batch, or the first memory_sample calls).
+    """
+    calls = [benchmark.inputs] * repeat if benchmark.kind == 'batch' else benchmark.inputs
+
+    for args in calls[:warmup if benchmark.kind == 'call' else 1]:
+        _call(benchmark.fn, args)
+
+    latencies = np.empty(len(calls))
+    errors = 0
+    first_error = None
+    clock = time.perf_counter
+    started = clock()
+    for i, args in enumerate(calls):
+        call_started = clock()
+        error = _call(benchmark.fn, args)
+        latencies[i] = clock() - call_started
+        if error is not None:
+            errors += 1
+            first_error = first_error or error
+    elapsed = clock() - started
+
+    tracemalloc.start()
+    tracemalloc.reset_peak()
+    for args in calls[:1] if benchmark.kind == 'batch' else calls[:memory_sample]:
+        _call(benchmark.fn, args)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    items = len(calls) * benchmark.items
+    return {
+        'name': benchmark.name,
+        'kind': benchmark.kind,
+        'size': size,
+        'calls': len(calls),
+        'items': items,
+        'seconds': round(elapsed, 6),
+        'throughput_per_s': round(items / elapsed, 2) if elapsed > 0 else None,
+        'p50_ms': round(float(np.percentile(latencies, 50)) * 1000, 4) if len(calls) else None,
+        'p99_ms': round(float(np.percentile(latencies, 99)) * 1000, 4) if len(calls) else None,
+        'peak_memory_mb': round(peak / (1024 * 1024), 3),
+        'errors': errors,
+        'first_error': first_error
+    }
+
+
+def _call(fn, args):
+    """Run fn(args); return the error message if it raised"""
+    try:
+        fn(args)
+    except Exception as e:
+        return f"{type(e).__name__}: {e}".strip()
+    return None
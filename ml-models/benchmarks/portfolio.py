@@ -0,0 +1,124 @@
+"""
+Synthetic Portfolios
+Benchmark inputs built from the schemas in sample-data/
+"""
+
+import copy
+import csv
+import json
+import os
+import re
+from typing import Any, Dict, List
+
+import numpy as np
+
+SAMPLE_DATA_DIR = os.path.join(os.path.dirname(__file__), '..', '..', 'sample-data')
+BULK_CASES_FILE = 'bulk-cases-100.csv'
+COMPLIANCE_CASES_FILE = 'compliance_demo_cases.json'
+
+# Actions evaluated for demo cases that don't propose one
+DEFAULT_ACTIONS = ['send_email', 'send_sms', 'send_phone_call']
+
+DCA_SPECIALIZATIONS = ['general', 'complex', 'high_value']
+
+
+def load_bulk_cases(data_dir: str = SAMPLE_DATA_DIR) -> List[Dict[str, str]]:
+    with open(os.path.join(data_dir, BULK_CASES_FILE), newline='') as f:
+        return list(csv.DictReader(f))
+
+
+def load_compliance_cases(data_dir: str = SAMPLE_DATA_DIR) -> List[Dict[str, Any]]:
+    """The demo cases file is markdown with one ```json block per case"""
+    with open(os.path.join(data_dir, COMPLIANCE_CASES_FILE)) as f:
+        text = f.read()
+    return [json.loads(block) for block in re.findall(r'```json\n(.*?)\n```', text, re.S)]
+
+
+def payment_cases(n: int, seed: int = 0, data_dir: str = SAMPLE_DATA_DIR) -> List[Dict[str, Any]]:
+    """
+    n cases shaped like the bulk upload rows, plus the engine inputs
+
+    amount, overdueDays and the categorical columns are bootstrapped from the
+    sample file (numbers jittered so cache keys don't repeat).
+    historicalPayments, contactFrequency and paymentProbability aren't in the
+    upload schema and are drawn from plausible distributions.
+    """
+    rng = np.random.default_rng(seed)
+    sample = load_bulk_cases(data_dir)
+    rows = rng.integers(0, len(sample), n)
+
+    amounts = np.array([float(row['amount']) for row in sample])[rows]
+    amounts = np.round(amounts * rng.lognormal(0, 0.25, n), 2)
+    overdue = np.array([int(row['overdueDays']) for row in sample])[rows]
+    overdue = np.clip(overdue + rng.integers(-10, 11, n), 0, None)
+
+    historical_payments = rng.poisson(2, n)
+    contact_frequency = rng.poisson(3, n)
+    payment_probability = np.round(rng.uniform(5, 95, n), 2)
+
+    cases = []
+    for i, (row, amount, days, payments, contacts, probability) in enumerate(zip(
+        rows.tolist(), amounts.tolist(), overdue.tolist(), historical_payments.tolist(),
+        contact_frequency.tolist(), payment_probability.tolist()
+    )):
+        template = sample[row]
+        cases.append({
+            'caseNumber': f"BENCH-{i:07d}",
+            'amount': amount,
+            'currency': template['currency'],
+            'overdueDays': days,
+            'status': template['status'],
+            'priority': template['priority'],
+            'slaStatus': template['slaStatus'],
+            'productType': template['productType'],
+            'region': template['region'],
+            'historicalPayments': payments,
+            'contactFrequency': contacts,
+            'paymentProbability': probability
+        })
+    return cases
+
+
+def compliance_requests(n: int, seed: int = 0, data_dir: str = SAMPLE_DATA_DIR) -> List[Dict[str, Any]]:
+    """
+    n (case_data, proposed_action) pairs built from the compliance demo cases
+
+    Amount and days overdue are jittered; everything else (contact history,
+    consent, vulnerability, timezone) is copied from the demo case so every
+    compliance branch the demo exercises is covered.
+    """
+    rng = np.random.default_rng(seed)
+    templates = load_compliance_cases(data_dir)
+    rows = rng.integers(0, len(templates), n)
+    amount_scale = rng.lognormal(0, 0.25, n)
+    day_offsets = rng.integers(-10, 11, n)
+    actions = rng.integers(0, len(DEFAULT_ACTIONS), n)
+
+    requests = []
+    for i in range(n):
+        template = templates[rows[i]]
+        case = copy.deepcopy(template)
+        case.pop('expected_ai_decision', None)
+        proposed_action = case.pop('proposed_action', None) or DEFAULT_ACTIONS[actions[i]]
+        case['case_id'] = f"BENCH-{i:07d}"
+        case['amount_due'] = round(float(template['amount_due']) * float(amount_scale[i]), 2)
+        case['days_overdue'] = max(0, int(template['days_overdue']) + int(day_offsets[i]))
+        requests.append({'case_data': case, 'proposed_action': proposed_action})
+    return requests
+
+
+def dca_pool(n: int = 8, seed: int = 0) -> List[Dict[str, Any]]:
+    """Available DCAs in the shape recommend_dca_assignment reads"""
+    rng = np.random.default_rng(seed)
+    max_load = rng.integers(30, 80, n)
+    return [
+        {
+            'id': f"DCA-{i:03d}",
+            'name': f"Agency {i}",
+            'success_rate': round(float(rng.uniform(40, 90)), 1),
+            'current_load': int(rng.integers(0, max_load[i])),
+            'max_load': int(max_load[i]),
+            'specialization': DCA_SPECIALIZATIONS[i % len(DCA_SPECIALIZATIONS)]
+        }
+        for i in range(n)
+    ]
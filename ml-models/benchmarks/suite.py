@@ -0,0 +1,186 @@
+"""
+Benchmark Suite
+Every scoring engine and every Flask route, over synthetic portfolios
+"""
+
+import os
+import platform
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, List, Optional
+
+import numpy as np
+
+from .harness import Benchmark, measure
+from .portfolio import compliance_requests, dca_pool, payment_cases
+
+DEFAULT_SIZES = [1_000, 100_000]
+
+
+class RouteError(Exception):
+    pass
+
+
+def engine_benchmarks(api, cases, compliance, dcas, max_calls) -> List[Benchmark]:
+    loaded = api.models.get()
+    predictor = loaded.predictor
+    orchestrator = loaded.compliance_orchestrator
+    sample = cases[:max_calls]
+
+    return [
+        Benchmark('engine.predictor.predict', 'call', predictor.predict, sample),
+        Benchmark('engine.predictor.predict_with_explanation', 'call',
+                  predictor.predict_with_explanation, sample),
+        Benchmark('engine.predictor.predict_many', 'batch', predictor.predict_many, cases, len(cases)),
+        Benchmark('engine.risk_engine.get_risk_assessment', 'call',
+                  api.risk_engine.get_risk_assessment, sample),
+        Benchmark('engine.prioritizer.prioritize_cases', 'batch',
+                  api.prioritizer.prioritize_cases, cases, len(cases)),
+        Benchmark('engine.prioritizer.recommend_dca_assignment', 'call',
+                  lambda case: api.prioritizer.recommend_dca_assignment(case, dcas), sample),
+        Benchmark('engine.compliance.make_decision', 'call',
+                  lambda body: orchestrator.make_decision(body['case_data'], body['proposed_action']),
+                  compliance)
+    ]
+
+
+def route_benchmarks(api, cases, compliance, dcas, max_calls, batch_size) -> List[Benchmark]:
+    client = api.app.test_client()
+
+    def get(path):
+        return lambda _: _check(client.get(path), path)
+
+    def post(path, body=lambda item: item):
+        return lambda item: _check(client.post(path, json=body(item)), path)
+
+    sample = cases[:max_calls]
+    chunk = min(batch_size, len(cases))
+    chunks = [cases[start:start + chunk] for start in range(0, len(cases) - chunk + 1, chunk)][:max_calls]
+    no_body = [None] * len(sample)
+
+    return [
+        Benchmark('route.GET /health', 'call', get('/health'), no_body),
+        Benchmark('route.GET /ready', 'call', get('/ready'), no_body),
+        Benchmark('route.GET /cache/stats', 'call', get('/cache/stats'), no_body),
+        Benchmark('route.GET /batching/stats', 'call', get('/batching/stats'), no_body),
+        Benchmark('route.POST /predict', 'call', post('/predict'), sample),
+        Benchmark('route.POST /predict/batch', 'call',
+                  post('/predict/batch', lambda rows: {'cases': rows}), chunks, chunk),
+        Benchmark('route.POST /score-risk', 'call', post('/score-risk'), sample),
+        Benchmark('route.POST /score/full', 'call',
+                  post('/score/full', lambda rows: {'cases': rows, 'available_dcas': dcas}), chunks, chunk),
+        Benchmark('route.POST /prioritize', 'call', post('/prioritize'), sample),
+        Benchmark('route.POST /prioritize (cases)', 'call',
+                  post('/prioritize', lambda rows: {'cases': rows}), chunks, chunk),
+        Benchmark('route.POST /recommend-dca', 'call',
+                  post('/recommend-dca', lambda case: {'case': case, 'available_dcas': dcas}), sample),
+        Benchmark('route.POST /predict/explain', 'call', post('/predict/explain'), sample),
+        Benchmark('route.POST /predict/explain/batch', 'call',
+                  post('/predict/explain/batch', lambda rows: {'cases': rows}), chunks, chunk),
+        Benchmark('route.POST /allocate/smart', 'call',
+                  post('/allocate/smart', lambda case: {'case': case, 'available_dcas': dcas}), sample),
+        Benchmark('route.POST /compliance/decide', 'call', post('/compliance/decide'), compliance)
+    ]
+
+
+def run(
+    sizes: Iterable[int] = DEFAULT_SIZES,
+    max_calls: int = 2_000,
+    batch_size: int = 1_000,
+    repeat: int = 3,
+    seed: int = 0,
+    only: Optional[str] = None,
+    log=print
+) -> Dict[str, Any]:
+    """
+    Run the suite once per portfolio size
+
+    Per-call benchmarks score the first max_calls cases of each portfolio;
+    batch benchmarks (and batch routes, in batch_size requests) cover it all.
+    Result caches are cleared before every benchmark so they measure scoring,
+    not cache hits.
+    """
+    import api
+
+    loaded = api.models.get()
+    sizes = list(sizes)
+    results = []
+
+    for size in sizes:
+        started = time.perf_counter()
+        cases = payment_cases(size, seed)
+        compliance = compliance_requests(min(size, max_calls), seed)
+        dcas = dca_pool(seed=seed)
+        log(f"Portfolio of {size:,} cases built in {time.perf_counter() - started:.1f}s")
+
+        benchmarks = (
+            engine_benchmarks(api, cases, compliance, dcas, max_calls)
+            + route_benchmarks(api, cases, compliance, dcas, max_calls, batch_size)
+        )
+        for benchmark in benchmarks:
+            if only and only not in benchmark.name:
+                continue
+            for cache in (api.predict_cache, api.risk_cache, api.priority_cache):
+                cache.clear()
+            result = measure(benchmark, size, repeat=repeat)
+            results.append(result)
+            log(_format_result(result))
+
+    return {
+        'meta': {
+            'timestamp': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+            'git_commit': _git_commit(),
+            'python': platform.python_version(),
+            'numpy': np.__version__,
+            'platform': platform.platform(),
+            'cpu_count': os.cpu_count(),
+            'model_version': loaded.predictor.model_version,
+            'model_trained': loaded.predictor.is_trained,
+            'sizes': sizes,
+            'max_calls': max_calls,
+            'batch_size': batch_size,
+            'repeat': repeat,
+            'seed': seed,
+            'max_rss_mb': _max_rss_mb()
+        },
+        'results': results
+    }
+
+
+def _check(response, path):
+    if response.status_code >= 400:
+        raise RouteError(f"{path} returned {response.status_code}: {response.get_data(as_text=True)[:200]}")
+    return response
+
+
+def _format_result(result):
+    line = (
+        f"  {result['name']:<48} {result['throughput_per_s'] or 0:>12,.0f}/s"
+        f"  p50 {result['p50_ms'] or 0:>9.3f} ms  p99 {result['p99_ms'] or 0:>9.3f} ms"
+        f"  peak {result['peak_memory_mb']:>8.2f} MB"
+    )
+    if result['errors']:
+        line += f"  ({result['errors']} errors: {result['first_error']})"
+    return line
+
+
+def _git_commit():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'],
+            cwd=os.path.dirname(__file__), capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _max_rss_mb():
+    try:
+        import resource
+    except ImportError:
+        return None
+    # ru_maxrss is KB on Linux, bytes on macOS
+    scale = 1024 * 1024 if sys.platform == 'darwin' else 1024
+    return round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / scale, 1)
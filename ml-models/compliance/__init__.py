@@ -7,19 +7,27 @@ Components:
 - ethical_risk_scorer: ML-based harm assessment
 - explainable_ai: Natural language explanation generator
 - decision_orchestrator: Main decision coordination layer
+
+Components are imported on first use, so importing one submodule doesn't
+load the others (or pytz).
 """
 
+import importlib
+
 __version__ = "1.0.0"
 __author__ = "CollectIQ Team"
 
-from .compliance_engine import ComplianceEngine
-from .ethical_risk_scorer import EthicalRiskScorer
-from .explainable_ai import ExplainableAI
-from .decision_orchestrator import DecisionOrchestrator
-
-__all__ = [
-    'ComplianceEngine',
-    'EthicalRiskScorer',
-    'ExplainableAI',
-    'DecisionOrchestrator'
-]
+_EXPORTS = {
+    'ComplianceEngine': '.compliance_engine',
+    'EthicalRiskScorer': '.ethical_risk_scorer',
+    'ExplainableAI': '.explainable_ai',
+    'DecisionOrchestrator': '.decision_orchestrator'
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    if name not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    return getattr(importlib.import_module(_EXPORTS[name], __name__), name)
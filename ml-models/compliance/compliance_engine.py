@@ -7,6 +7,19 @@ from datetime import datetime, timedelta
 from typing import Dict, List, Any, Optional
 import pytz
 
+# Violation rules and warning checks in bit order for validate_action_many
+COMPLIANCE_RULES = [
+    'FDCPA_TIME_WINDOW',
+    'CFPB_CONTACT_FREQUENCY',
+    'TCPA_CONSENT_VIOLATION',
+    'FDCPA_DISPUTE_HANDLING',
+    'BANKRUPTCY_AUTO_STAY_VIOLATION'
+]
+WARNING_CHECKS = ['contact_time_window', 'vulnerable_debtor']
+
+# Channel bit order of features.case_batch consent masks
+CONSENT_CHANNELS = ['phone', 'sms', 'email']
+
 
 class ComplianceEngine:
     """
@@ -71,6 +84,62 @@ class ComplianceEngine:
         
         return results
     
+    def validate_action_many(self, action: str, batch) -> Dict[str, Any]:
+        """
+        validate_action for every case of a features.case_batch.CaseBatch
+        
+        Runs the same checks on the batch's compliance columns with array
+        operations; the time window check runs once per distinct timezone.
+        
+        Args:
+            action: Proposed action, as validate_action
+            batch: CaseBatch built with compliance fields
+        
+        Returns:
+            Dict of arrays: status, violationCodes (bitmask over
+            COMPLIANCE_RULES) and warningCodes (bitmask over WARNING_CHECKS)
+        """
+        import numpy as np
+        
+        if not batch.has_compliance:
+            raise ValueError('CaseBatch has no compliance fields (build it with compliance=True)')
+        
+        n = batch.num_cases
+        violations = np.zeros(n, dtype=np.uint8)
+        warnings = np.zeros(n, dtype=np.uint8)
+        
+        def flag(codes, rule_list, rule, mask):
+            codes |= mask.astype(np.uint8) << rule_list.index(rule)
+        
+        if action in ['send_phone_call', 'send_sms']:
+            for code, name in enumerate(batch.timezones):
+                check = self._check_contact_time_window(action, {'debtor_info': {'timezone': name}})
+                in_zone = batch['timezone'] == code
+                if check['status'] == 'FAIL':
+                    flag(violations, COMPLIANCE_RULES, 'FDCPA_TIME_WINDOW', in_zone)
+                elif check['status'] == 'WARNING':
+                    flag(warnings, WARNING_CHECKS, 'contact_time_window', in_zone)
+        
+        channel = self._extract_channel(action)
+        if channel in self.frequency_limits:
+            limit = self.frequency_limits[channel]
+            contacts = batch[f"contacts_{channel}_{limit['period_days']}d"]
+            flag(violations, COMPLIANCE_RULES, 'CFPB_CONTACT_FREQUENCY', contacts >= limit['count'])
+        
+        if channel == 'sms':
+            sms_consented = batch['consent'] & (1 << CONSENT_CHANNELS.index('sms'))
+            flag(violations, COMPLIANCE_RULES, 'TCPA_CONSENT_VIOLATION', sms_consented == 0)
+        
+        flag(violations, COMPLIANCE_RULES, 'FDCPA_DISPUTE_HANDLING', batch['dispute_open'])
+        flag(warnings, WARNING_CHECKS, 'vulnerable_debtor', batch['vulnerability_flag'])
+        flag(violations, COMPLIANCE_RULES, 'BANKRUPTCY_AUTO_STAY_VIOLATION', batch['automatic_stay_active'])
+        
+        return {
+            'status': np.select([violations > 0, warnings > 0], ['FAILED', 'PASSED_WITH_WARNINGS'], 'PASSED'),
+            'violationCodes': violations,
+            'warningCodes': warnings
+        }
+    
     def _check_contact_time_window(self, action: str, context: Dict[str, Any]) -> Dict[str, Any]:
         """
         FDCPA §805(a) - No contact before 8 AM or after 9 PM debtor local time
@@ -290,28 +359,41 @@ class ComplianceEngine:
     
     def _count_recent_contacts(self, contact_history: Dict[str, Any], channel: str, days: int) -> int:
         """Count contacts on specific channel in last N days"""
-        contacts_in_period = contact_history.get(f'contacts_last_{days}_days', [])
-        
-        # Handle both list and count formats
-        if isinstance(contacts_in_period, int):
-            return contacts_in_period
-        
-        if isinstance(contacts_in_period, list):
-            return sum(1 for contact in contacts_in_period 
-                      if contact.get('channel', '').lower() == channel)
-        
-        # Fallback: check specific counters
-        if channel == 'sms' and 'sms_count_today' in contact_history:
-            return contact_history['sms_count_today']
-        
-        return 0
+        return count_recent_contacts(contact_history, channel, days)
     
     def _parse_consent(self, consent_status: str) -> List[str]:
         """Parse consent string into list of consented channels"""
-        if consent_status == 'all':
-            return ['phone', 'sms', 'email']
-        elif consent_status == 'none':
-            return []
-        else:
-            # Parse formats like "phone_email" or "sms,email"
-            return [ch.strip() for ch in consent_status.replace('_', ',').split(',')]
+        return parse_consent(consent_status)
+
+
+def count_recent_contacts(contact_history: Dict[str, Any], channel: str, days: int) -> int:
+    """Count contacts on specific channel in last N days"""
+    contacts_in_period = contact_history.get(f'contacts_last_{days}_days', [])
+    
+    # Handle list, per-channel count (features.contact_history) and count formats
+    if isinstance(contacts_in_period, dict):
+        return int(contacts_in_period.get(channel, 0))
+    
+    if isinstance(contacts_in_period, int):
+        return contacts_in_period
+    
+    if isinstance(contacts_in_period, list):
+        return sum(1 for contact in contacts_in_period 
+                  if contact.get('channel', '').lower() == channel)
+    
+    # Fallback: check specific counters
+    if channel == 'sms' and 'sms_count_today' in contact_history:
+        return contact_history['sms_count_today']
+    
+    return 0
+
+
+def parse_consent(consent_status: str) -> List[str]:
+    """Parse consent string into list of consented channels"""
+    if consent_status == 'all':
+        return ['phone', 'sms', 'email']
+    elif consent_status == 'none':
+        return []
+    else:
+        # Parse formats like "phone_email" or "sms,email"
+        return [ch.strip() for ch in consent_status.replace('_', ',').split(',')]
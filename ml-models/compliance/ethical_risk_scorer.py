@@ -87,7 +87,7 @@ class EthicalRiskScorer:
         contact_history = context.get('contact_history', {})
         
         # Contact frequency risk
-        contacts_last_7_days = len(contact_history.get('contacts_last_7_days', []))
+        contacts_last_7_days = self._count_recent_contacts(contact_history)
         frequency_risk = min(contacts_last_7_days * 15, 60)  # Cap at 60
         
         # Channel diversity risk (using same channel repeatedly = higher risk)
@@ -176,7 +176,7 @@ class EthicalRiskScorer:
         
         # Harassment factors
         if harassment_risk > 60:
-            contact_count = len(context.get('contact_history', {}).get('contacts_last_7_days', []))
+            contact_count = self._count_recent_contacts(context.get('contact_history', {}))
             factors.append(f"✗ High contact frequency: {contact_count} attempts in past 7 days (high harassment risk)")
         
         # Pressure factors
@@ -232,6 +232,13 @@ class EthicalRiskScorer:
     
     # Helper methods
     
+    def _count_recent_contacts(self, contact_history: Dict[str, Any]) -> int:
+        """Contacts in the last 7 days - a contact list or per-channel counts"""
+        recent_contacts = contact_history.get('contacts_last_7_days', [])
+        if isinstance(recent_contacts, dict):
+            return sum(recent_contacts.values())
+        return len(recent_contacts)
+    
     def _calculate_same_channel_ratio(self, contact_history: Dict[str, Any], action: str) -> float:
         """Calculate ratio of contacts using same channel"""
         recent_contacts = contact_history.get('contacts_last_7_days', [])
@@ -239,6 +246,12 @@ class EthicalRiskScorer:
             return 0.0
         
         proposed_channel = self._extract_channel(action)
+        
+        # Per-channel counts (features.contact_history)
+        if isinstance(recent_contacts, dict):
+            total = sum(recent_contacts.values())
+            return recent_contacts.get(proposed_channel, 0) / total if total else 0.0
+        
         same_channel_count = sum(1 for c in recent_contacts 
                                  if c.get('channel', '').lower() == proposed_channel)
         
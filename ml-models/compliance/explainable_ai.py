@@ -157,7 +157,7 @@ Compliance validation:
             check_display = check_name.replace('_', ' ').title()
             explanation += f"- {check_display}: {status}\n"
         
-        explanation += f"\nEthical risk score: {ethical_assessment.get('total_score', 0)}/100 ({"low" if ethical_assessment.get('total_score', 0) < 40 else "moderate"} harm potential)\n"
+        explanation += f"\nEthical risk score: {ethical_assessment.get('total_score', 0)}/100 ({'low' if ethical_assessment.get('total_score', 0) < 40 else 'moderate'} harm potential)\n"
         
         # Add positive factors
         factors = ethical_assessment.get('risk_factors', [])
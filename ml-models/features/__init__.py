@@ -0,0 +1,9 @@
+"""
+Feature engineering
+
+Components:
+- contact_history: Per-case contact, escalation, promise-to-pay and payment
+  features from raw event logs, for the payment model and the compliance layer
+- case_batch: Compact array-backed cases (CaseBatch) that every scoring
+  engine takes in place of per-case dicts
+"""
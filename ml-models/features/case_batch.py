@@ -0,0 +1,255 @@
+"""
+Case Batch
+Compact, array-backed cases for every scoring engine
+
+Engines used to take cases as dicts, one per case, with a .get() and a
+default for every field. At portfolio scale those dicts dominate memory
+and the lookups dominate CPU time. A CaseBatch holds each field as one
+typed numpy column: a float per model feature, a uint8 code for the SLA
+status. That is under 60 bytes a case for scoring, and under 90 with the
+compliance fields, instead of a dict of boxed values.
+
+A batch is a read-only mapping of column names to arrays, so the columnar
+engine APIs take it directly:
+
+    batch = CaseBatch.from_csv('portfolio.csv')
+    predictor.predict_many(batch)
+    risk_engine.get_risk_assessment_many(batch)
+    prioritizer.prioritize_many(batch, top_k=200, ids=batch.ids)
+    compliance_engine.validate_action_many('send_sms', batch)
+
+Columns that already have the right dtype (numpy arrays, pandas columns,
+Parquet/CSV reads) are used as they are, without copying.
+"""
+
+from collections.abc import Mapping
+from typing import Any, Dict, Iterable, List, Optional
+
+import numpy as np
+
+from recommendation.prioritizer import SLA_SCORES
+
+# Numeric case fields with the engines' defaults
+NUMERIC_COLUMNS = {
+    'overdueDays': 0,
+    'amount': 0,
+    'historicalPayments': 0,
+    'contactFrequency': 0,
+    'historicalDefaults': 0,
+    'paymentProbability': 50
+}
+
+# slaStatus is stored as an index into SLA_STATUSES; any other status gets
+# the last code, which scores like an unknown status does
+SLA_STATUSES = list(SLA_SCORES) + ['other']
+
+# Compliance context fields (with compliance=True), named like the
+# features.contact_history columns. consent is a bitmask over CHANNELS.
+CHANNELS = ['phone', 'sms', 'email']
+CONTACT_WINDOWS_DAYS = [1, 7, 30]
+CONTACT_COLUMNS = [
+    f"contacts_{channel}_{days}d" for channel in CHANNELS for days in CONTACT_WINDOWS_DAYS
+]
+FLAG_COLUMNS = ['dispute_open', 'vulnerability_flag', 'automatic_stay_active']
+DEFAULT_TIMEZONE = 'America/New_York'
+
+DTYPES = {
+    **{name: np.float64 for name in NUMERIC_COLUMNS},
+    'slaStatus': np.uint8,
+    'consent': np.uint8,
+    **{name: np.uint16 for name in CONTACT_COLUMNS},
+    **{name: np.bool_ for name in FLAG_COLUMNS},
+    'timezone': np.uint16
+}
+COMPLIANCE_COLUMNS = ['consent'] + CONTACT_COLUMNS + FLAG_COLUMNS + ['timezone']
+
+
+class CaseBatch(Mapping):
+    """
+    Cases as typed columns
+
+    Attributes:
+        ids: case ids (array or None)
+        timezones: timezone names the timezone column indexes into
+    """
+
+    __slots__ = ('ids', 'timezones', '_columns')
+
+    def __init__(self, columns: Dict[str, np.ndarray], ids=None, timezones=None):
+        self._columns = columns
+        self.ids = ids
+        self.timezones = list(timezones or [])
+
+    @classmethod
+    def from_columns(cls, columns, ids=None) -> 'CaseBatch':
+        """
+        Wrap columns (dict of arrays/lists, or a DataFrame)
+
+        Numeric columns already of dtype float64 are used without a copy.
+        slaStatus may be strings or SLA_STATUSES codes, consent strings
+        ('sms,email', 'all') or bitmasks, timezone names. Missing numeric
+        columns take the engines' defaults; compliance columns are kept
+        only if any are given.
+        """
+        n = max((len(columns[name]) for name in columns), default=0)
+        batch = {}
+        for name, default in NUMERIC_COLUMNS.items():
+            if name in columns:
+                batch[name] = np.asarray(columns[name], dtype=np.float64)
+            else:
+                batch[name] = np.full(n, float(default))
+
+        if 'slaStatus' in columns:
+            batch['slaStatus'] = _encode(columns['slaStatus'], _sla_code, np.uint8)
+        else:
+            batch['slaStatus'] = np.full(n, _sla_code('on_track'), dtype=np.uint8)
+
+        timezones = []
+        if any(name in columns for name in COMPLIANCE_COLUMNS):
+            if 'consent' in columns:
+                batch['consent'] = _encode(columns['consent'], consent_mask, np.uint8)
+            else:
+                batch['consent'] = np.zeros(n, dtype=np.uint8)
+            for name in CONTACT_COLUMNS + FLAG_COLUMNS:
+                batch[name] = (
+                    np.asarray(columns[name], dtype=DTYPES[name]) if name in columns
+                    else np.zeros(n, dtype=DTYPES[name])
+                )
+            if 'timezone' in columns:
+                batch['timezone'], timezones = _factorize(columns['timezone'])
+            else:
+                batch['timezone'] = np.zeros(n, dtype=np.uint16)
+                timezones = [DEFAULT_TIMEZONE]
+
+        if ids is None and 'id' in columns:
+            ids = np.asarray(columns['id'])
+        return cls(batch, ids, timezones)
+
+    @classmethod
+    def from_dicts(cls, cases: Iterable[Dict[str, Any]], id_field: str = 'id',
+                   compliance: bool = False) -> 'CaseBatch':
+        """
+        Pack case dicts (e.g. a JSON request body) into columns
+
+        With compliance, each case's compliance context (consent_status,
+        contact_history, response_history, dispute_details,
+        vulnerability_flag, bankruptcy_details, debtor_info.timezone) is
+        packed too, as ComplianceEngine.validate_action reads it.
+        """
+        cases = cases if isinstance(cases, list) else list(cases)
+        columns = {
+            name: np.fromiter((case.get(name, default) for case in cases), np.float64, len(cases))
+            for name, default in NUMERIC_COLUMNS.items()
+        }
+        columns['slaStatus'] = [case.get('slaStatus', 'on_track') for case in cases]
+        if compliance:
+            columns.update(_compliance_columns(cases))
+        ids = [case.get(id_field) for case in cases]
+        return cls.from_columns(columns, ids=ids)
+
+    @classmethod
+    def from_csv(cls, path, id_field: str = 'id', **read_csv_args) -> 'CaseBatch':
+        """Read a CSV with one column per field (as written by to_csv)"""
+        import pandas as pd
+
+        frame = pd.read_csv(path, **read_csv_args)
+        ids = frame[id_field].to_numpy() if id_field in frame else None
+        return cls.from_columns({name: frame[name].to_numpy() for name in frame.columns}, ids=ids)
+
+    def to_frame(self, decode: bool = True):
+        """A DataFrame over the columns (slaStatus and timezone as names with decode)"""
+        import pandas as pd
+
+        columns = dict(self._columns)
+        if decode:
+            columns['slaStatus'] = np.asarray(SLA_STATUSES, dtype=object)[columns['slaStatus']]
+            if 'timezone' in columns:
+                columns['timezone'] = np.asarray(self.timezones, dtype=object)[columns['timezone']]
+        frame = pd.DataFrame(columns, copy=False)
+        if self.ids is not None:
+            frame.insert(0, 'id', self.ids)
+        return frame
+
+    def to_csv(self, path, **to_csv_args):
+        self.to_frame().to_csv(path, index=False, **to_csv_args)
+
+    def take(self, index) -> 'CaseBatch':
+        """A batch of the selected rows (slice for a view, index array for a copy)"""
+        return CaseBatch(
+            {name: values[index] for name, values in self._columns.items()},
+            None if self.ids is None else np.asarray(self.ids)[index],
+            self.timezones
+        )
+
+    @property
+    def has_compliance(self) -> bool:
+        return 'consent' in self._columns
+
+    @property
+    def nbytes(self) -> int:
+        return sum(values.nbytes for values in self._columns.values())
+
+    def __getitem__(self, name) -> np.ndarray:
+        return self._columns[name]
+
+    def __iter__(self):
+        return iter(self._columns)
+
+    def __len__(self) -> int:
+        # Mapping length is the number of columns; use num_cases for rows
+        return len(self._columns)
+
+    @property
+    def num_cases(self) -> int:
+        return len(self._columns['amount'])
+
+
+def consent_mask(consent_status: str) -> int:
+    """Bitmask over CHANNELS of a consent string, as ComplianceEngine parses it"""
+    from compliance.compliance_engine import parse_consent
+
+    consented = parse_consent(consent_status)
+    return sum(1 << bit for bit, channel in enumerate(CHANNELS) if channel in consented)
+
+
+def _compliance_columns(cases: List[Dict[str, Any]]) -> Dict[str, Any]:
+    from compliance.compliance_engine import count_recent_contacts
+
+    histories = [case.get('contact_history', {}) for case in cases]
+    columns = {
+        f"contacts_{channel}_{days}d": [count_recent_contacts(history, channel, days) for history in histories]
+        for channel in CHANNELS for days in CONTACT_WINDOWS_DAYS
+    }
+    columns['consent'] = [case.get('consent_status', '') for case in cases]
+    columns['dispute_open'] = [
+        case.get('response_history', '') in ['disputed', 'validation_requested']
+        and not case.get('dispute_details', {}).get('validation_provided', False)
+        for case in cases
+    ]
+    columns['vulnerability_flag'] = [bool(case.get('vulnerability_flag', False)) for case in cases]
+    columns['automatic_stay_active'] = [
+        bool(case.get('bankruptcy_details', {}).get('automatic_stay_active', False)) for case in cases
+    ]
+    columns['timezone'] = [
+        case.get('debtor_info', {}).get('timezone', DEFAULT_TIMEZONE) for case in cases
+    ]
+    return columns
+
+
+def _sla_code(sla_status: str) -> int:
+    return SLA_STATUSES.index(sla_status) if sla_status in SLA_SCORES else len(SLA_STATUSES) - 1
+
+
+def _encode(values, encode_one, dtype) -> np.ndarray:
+    """Codes for a categorical column: integer columns pass through, others are encoded per distinct value"""
+    values = np.asarray(values)
+    if np.issubdtype(values.dtype, np.integer):
+        return values.astype(dtype, copy=False)
+    codes, names = _factorize(values)
+    return np.array([encode_one(name) for name in names], dtype=dtype)[codes]
+
+
+def _factorize(values, dtype=np.uint16):
+    """(codes, distinct values) - only the distinct values go through Python"""
+    names, codes = np.unique(np.asarray(values, dtype=object).astype(str), return_inverse=True)
+    return codes.astype(dtype), names.tolist()
@@ -0,0 +1,75 @@
+"""
+Gunicorn configuration for the ML API - pre-fork serving mode
+
+    gunicorn -c gunicorn.conf.py api:app
+
+The app and its models are loaded once in the master process. The master's
+heap is then GC-frozen so forked workers keep sharing it copy-on-write, and
+the compiled model arrays are memory-mapped read-only, so all workers share
+one copy through the page cache. Startup time and per-worker memory are
+logged at boot.
+"""
+
+import gc
+import os
+import time
+
+_started = time.perf_counter()
+
+bind = f"0.0.0.0:{os.environ.get('FLASK_PORT', 8000)}"
+workers = int(os.environ.get('ML_API_WORKERS', os.cpu_count() or 1))
+# More than one thread per worker switches to gthread workers, which serve
+# requests concurrently - the only mode in which /predict and /score-risk
+# requests are coalesced into batches
+threads = int(os.environ.get('ML_API_THREADS', 1))
+preload_app = True
+timeout = int(os.environ.get('ML_API_TIMEOUT', 30))
+accesslog = '-'
+
+
+def _memory_report():
+    """Resident/shared memory of the current process in MB (Linux /proc)"""
+    report = {}
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                key, _, value = line.partition(':')
+                if key in ('VmRSS', 'RssAnon', 'RssFile', 'RssShmem'):
+                    report[key] = int(value.split()[0]) / 1024
+        with open('/proc/self/smaps_rollup') as f:
+            for line in f:
+                if line.startswith('Pss:'):
+                    report['Pss'] = int(line.split()[1]) / 1024
+    except OSError:
+        import resource
+        report['MaxRSS'] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    return ', '.join(f"{key}={value:.1f}MB" for key, value in report.items())
+
+
+def when_ready(server):
+    """Runs in the master after the app is preloaded, before workers fork"""
+    import api
+
+    # Finish the background model load here so every worker forks with the
+    # models loaded and warmed up
+    predictor = api.models.get().predictor
+    status = api.models.status()
+    server.log.info(
+        "Startup complete in %.0f ms (app import %.0f ms, model load %.0f ms, warm-up %.0f ms, "
+        "model version %s, trained=%s)",
+        (time.perf_counter() - _started) * 1000,
+        api.import_seconds * 1000,
+        status['load_ms'],
+        status['warmup_ms'],
+        predictor.model_version,
+        predictor.is_trained
+    )
+
+    # Move everything allocated so far out of GC tracking - collections in
+    # the workers would otherwise touch (and un-share) these pages
+    gc.freeze()
+    server.log.info("Master memory: %s", _memory_report())
+
+
+def post_worker_init(worker):
+    worker.log.info("Worker %s memory: %s", worker.pid, _memory_report())
@@ -0,0 +1,285 @@
+"""
+Compiled tree-ensemble inference
+
+Flattens a trained RandomForestClassifier (plus the StandardScaler applied
+before it) into plain NumPy arrays and evaluates every tree for a whole batch
+with vectorized passes. Serving only needs NumPy - sklearn is imported at
+compile time, never at predict time.
+
+On disk a compiled forest is a directory holding manifest.json and one .npy
+file per array. Loading memory-maps the arrays read-only, so every process
+serving the same artifact shares one copy of the pages.
+"""
+
+import hashlib
+import json
+import os
+import shutil
+from datetime import datetime
+
+import numpy as np
+
+# Rows evaluated per pass; bounds the (rows x trees x classes) leaf gather
+ROW_CHUNK = 1024
+
+FORMAT_NAME = 'collectiq-compiled-forest'
+FORMAT_VERSION = 1
+MANIFEST_FILE = 'manifest.json'
+
+
+def _float32_boundary(threshold):
+    """
+    Widen split thresholds to the float64 boundary sklearn actually uses
+
+    sklearn casts inputs to float32 before comparing them to a threshold t,
+    so a row goes left whenever float32(x) <= t. That holds for every x
+    below the midpoint between the largest float32 <= t and the next
+    float32 up, which lets us compare float64 inputs directly.
+    """
+    threshold = np.asarray(threshold, dtype=np.float64)
+    lower = threshold.astype(np.float32)
+    lower = np.where(lower > threshold, np.nextafter(lower, np.float32(-np.inf)), lower)
+    upper = np.nextafter(lower, np.float32(np.inf))
+    return (lower.astype(np.float64) + upper.astype(np.float64)) / 2
+
+
+class CompiledForest:
+    """
+    Array representation of a fitted forest
+
+    All trees share one node table. Node i tests raw feature feature[i]
+    against threshold[i] (scaler already folded in) and moves to
+    children[2*i] when x <= threshold, children[2*i + 1] otherwise.
+    Leaves point to themselves, so every row can be stepped max_depth
+    times without checking for termination.
+    """
+
+    ARRAYS = ('feature', 'threshold', 'children', 'value', 'roots',
+              'classes_', 'feature_importances_')
+
+    def __init__(self, feature, threshold, children, value, roots,
+                 classes_, feature_importances_, max_depth, model_version=None):
+        self.feature = feature
+        self.threshold = threshold
+        self.children = children
+        self.value = value
+        self.roots = roots
+        self.classes_ = classes_
+        self.feature_importances_ = feature_importances_
+        self.max_depth = int(max_depth)
+        self.model_version = model_version or self.content_hash()
+
+    @classmethod
+    def from_sklearn(cls, model, scaler=None):
+        """
+        Compile a fitted RandomForestClassifier
+
+        Args:
+            model: fitted RandomForestClassifier
+            scaler: optional fitted StandardScaler whose output the model was
+                    trained on; its mean/scale are folded into the thresholds
+
+        Returns:
+            CompiledForest that accepts raw (unscaled) feature rows
+        """
+        mean = getattr(scaler, 'mean_', None) if scaler is not None else None
+        scale = getattr(scaler, 'scale_', None) if scaler is not None else None
+
+        features, thresholds, children, values, roots = [], [], [], [], []
+        offset = 0
+        max_depth = 0
+
+        for estimator in model.estimators_:
+            tree = estimator.tree_
+            n_nodes = tree.node_count
+            node_ids = np.arange(n_nodes)
+            is_leaf = tree.children_left == -1
+
+            feature = np.where(is_leaf, 0, tree.feature).astype(np.intp)
+
+            # x_scaled <= t  <=>  x <= t * scale + mean  (scale is always > 0)
+            threshold = _float32_boundary(tree.threshold)
+            if scale is not None:
+                threshold = threshold * scale[feature]
+            if mean is not None:
+                threshold = threshold + mean[feature]
+            threshold = np.where(is_leaf, np.inf, threshold)
+
+            left = np.where(is_leaf, node_ids, tree.children_left) + offset
+            right = np.where(is_leaf, node_ids, tree.children_right) + offset
+
+            # Per-node class distribution, normalized as in predict_proba
+            value = tree.value[:, 0, :].astype(np.float64)
+            totals = value.sum(axis=1, keepdims=True)
+            value = np.divide(value, totals, out=np.zeros_like(value), where=totals > 0)
+
+            features.append(feature)
+            thresholds.append(threshold)
+            children.append(np.column_stack([left, right]).ravel())
+            values.append(value)
+            roots.append(offset)
+
+            offset += n_nodes
+            max_depth = max(max_depth, tree.max_depth)
+
+        return cls(
+            feature=np.concatenate(features),
+            threshold=np.concatenate(thresholds),
+            children=np.concatenate(children).astype(np.intp),
+            value=np.concatenate(values),
+            roots=np.array(roots, dtype=np.intp),
+            classes_=np.asarray(model.classes_).astype(str),
+            feature_importances_=np.asarray(model.feature_importances_, dtype=np.float64),
+            max_depth=max_depth
+        )
+
+    @property
+    def n_trees(self):
+        return len(self.roots)
+
+    @property
+    def n_nodes(self):
+        return len(self.feature)
+
+    @property
+    def nbytes(self):
+        return sum(getattr(self, name).nbytes for name in self.ARRAYS)
+
+    def predict_proba(self, X):
+        """
+        Class probabilities averaged over all trees
+
+        Args:
+            X: N x n_features array of raw feature values
+
+        Returns:
+            N x n_classes array, columns ordered as classes_
+        """
+        X = np.ascontiguousarray(X, dtype=np.float64)
+        n_rows = X.shape[0]
+        proba = np.empty((n_rows, len(self.classes_)), dtype=np.float64)
+
+        for start in range(0, n_rows, ROW_CHUNK):
+            stop = min(start + ROW_CHUNK, n_rows)
+            leaves = self.apply(X[start:stop])
+            proba[start:stop] = self.value[leaves].mean(axis=1)
+
+        return proba
+
+    def apply(self, X):
+        """
+        Leaf node reached in every tree
+
+        Returns:
+            N x n_trees array of global node ids
+        """
+        n_rows, n_features = X.shape
+        flat = X.ravel()
+        feature, threshold, children = self.feature, self.threshold, self.children
+
+        if n_rows == 1:
+            # Single-row fast path: skip the row offset broadcast
+            nodes = self.roots
+            for _ in range(self.max_depth):
+                nodes = children[2 * nodes + (flat[feature[nodes]] > threshold[nodes])]
+            return nodes[None, :]
+
+        row_base = (np.arange(n_rows) * n_features)[:, None]
+        nodes = np.repeat(self.roots[None, :], n_rows, axis=0)
+        for _ in range(self.max_depth):
+            go_right = flat[row_base + feature[nodes]] > threshold[nodes]
+            nodes = children[2 * nodes + go_right]
+
+        return nodes
+
+    def content_hash(self):
+        """Short digest of the compiled arrays, used as the default model version"""
+        digest = hashlib.sha256()
+        for name in self.ARRAYS:
+            array = np.ascontiguousarray(getattr(self, name))
+            digest.update(name.encode())
+            digest.update(str(array.dtype).encode())
+            digest.update(array.tobytes())
+        digest.update(str(self.max_depth).encode())
+        return digest.hexdigest()[:12]
+
+    def save(self, path, metadata=None):
+        """
+        Write the forest as a versioned artifact directory
+
+        The directory is assembled next to the target and renamed into place,
+        so readers never observe a half-written artifact. metadata (JSON
+        serializable, e.g. training lineage) is stored in the manifest.
+        """
+        path = os.path.abspath(path)
+        staging = f"{path}.tmp-{os.getpid()}"
+        shutil.rmtree(staging, ignore_errors=True)
+        os.makedirs(staging)
+
+        arrays = {}
+        for name in self.ARRAYS:
+            array = np.ascontiguousarray(getattr(self, name))
+            filename = f"{name}.npy"
+            np.save(os.path.join(staging, filename), array)
+            arrays[name] = {
+                'file': filename,
+                'dtype': array.dtype.str,
+                'shape': list(array.shape)
+            }
+
+        manifest = {
+            'format': FORMAT_NAME,
+            'format_version': FORMAT_VERSION,
+            'model_version': self.model_version,
+            'created_at': datetime.utcnow().isoformat() + 'Z',
+            'max_depth': self.max_depth,
+            'n_trees': self.n_trees,
+            'n_nodes': self.n_nodes,
+            'metadata': metadata or {},
+            'arrays': arrays
+        }
+        with open(os.path.join(staging, MANIFEST_FILE), 'w') as f:
+            json.dump(manifest, f, indent=2)
+
+        if os.path.exists(path):
+            retired = f"{path}.old-{os.getpid()}"
+            os.rename(path, retired)
+            os.rename(staging, path)
+            shutil.rmtree(retired, ignore_errors=True)
+        else:
+            os.rename(staging, path)
+
+    @classmethod
+    def load(cls, path, mmap=True):
+        """
+        Load a forest written by save()
+
+        Args:
+            path: artifact directory
+            mmap: memory-map the arrays read-only instead of reading them in
+
+        Raises:
+            FileNotFoundError: no artifact at path
+            ValueError: artifact written in an unsupported format
+        """
+        with open(os.path.join(path, MANIFEST_FILE)) as f:
+            manifest = json.load(f)
+
+        if manifest.get('format') != FORMAT_NAME or manifest.get('format_version') != FORMAT_VERSION:
+            raise ValueError(
+                f"Unsupported model artifact format: {manifest.get('format')} "
+                f"v{manifest.get('format_version')}"
+            )
+
+        arrays = {}
+        for name in cls.ARRAYS:
+            spec = manifest['arrays'][name]
+            array = np.load(os.path.join(path, spec['file']), mmap_mode='r' if mmap else None)
+            # Plain ndarray view over the mapping - avoids np.memmap overhead per index op
+            arrays[name] = np.asarray(array)
+
+        return cls(
+            max_depth=manifest['max_depth'],
+            model_version=manifest['model_version'],
+            **arrays
+        )
@@ -1,20 +1,85 @@
 import os
-import joblib
+import time
+from collections.abc import Mapping
+
 import numpy as np
 
+from utils import round2
+
+from .compiled_forest import CompiledForest
+from .registry import ModelRegistry
+
+FEATURE_NAMES = ['overdueDays', 'amount', 'historicalPayments', 'contactFrequency']
+
+# Counts: explanations report whole values of these as ints, even from float columns
+COUNT_FEATURES = np.array([name != 'amount' for name in FEATURE_NAMES])
+
+# Map predicted class to base payment probability (0-100)
+CLASS_TO_PROB = {
+    'low': 25,
+    'medium': 55,
+    'high': 85
+}
+
+# Rule-based fallback buckets: np.digitize bin edges and the score
+# adjustment for each bin (mirrors the branches in _fallback_prediction)
+FALLBACK_OVERDUE_EDGES = np.array([30, 60, 90, 120])
+FALLBACK_OVERDUE_POINTS = np.array([20, 10, 0, -15, -30])
+FALLBACK_AMOUNT_EDGES = np.array([2000, 5000, 10000])
+FALLBACK_AMOUNT_POINTS = np.array([15, 10, 0, -10])
+
+# Recommendation text by payment probability band: <30, 30-50, 50-70, >=70
+RECOMMENDATIONS = [
+    "LOW PRIORITY: Consider escalation or alternative resolution strategies.",
+    "Contact with negotiation approach. Consider extended payment terms or settlement.",
+    "MEDIUM PRIORITY: Schedule contact within 48-72 hours. Structured payment plan recommended.",
+    "HIGH PRIORITY: Contact within 24 hours. High likelihood of recovery with prompt action."
+]
+
+
 class PaymentPredictor:
-    def __init__(self):
-        model_dir = os.path.join(os.path.dirname(__file__), '..', 'models')
+    def __init__(self, artifact_path=None):
+        """
+        Load a compiled artifact - artifact_path, else the registry's active
+        version, else models/payment_predictor, else the legacy pickles
+        
+        Without any of them the rule-based fallback scores requests. A
+        missing artifact_path raises FileNotFoundError instead: the caller
+        asked for that model, not for whatever is available.
+        """
+        model_dir = os.environ.get(
+            'MODEL_PATH',
+            os.path.join(os.path.dirname(__file__), '..', 'models')
+        )
+        compiled_path = (
+            artifact_path
+            or ModelRegistry(os.path.join(model_dir, 'registry')).current_path()
+            or os.path.join(model_dir, 'payment_predictor')
+        )
         model_path = os.path.join(model_dir, 'payment_predictor.pkl')
         scaler_path = os.path.join(model_dir, 'scaler.pkl')
         
+        started = time.perf_counter()
+        self.model_version = None
         try:
-            self.model = joblib.load(model_path)
-            self.scaler = joblib.load(scaler_path)
+            if artifact_path or os.path.exists(compiled_path):
+                # Compiled forest: memory-mapped read-only, scaler already folded in
+                self.model = CompiledForest.load(compiled_path)
+            else:
+                # Legacy pickles - compiled in memory, not shared between workers
+                import joblib
+                self.model = CompiledForest.from_sklearn(
+                    joblib.load(model_path),
+                    joblib.load(scaler_path)
+                )
+            self.model_version = self.model.model_version
             self.is_trained = True
         except FileNotFoundError:
+            if artifact_path:
+                raise
             print("Warning: Model files not found. Using fallback prediction.")
             self.is_trained = False
+        self.load_seconds = time.perf_counter() - started
     
     def predict(self, features):
         """
@@ -29,36 +94,9 @@ class PaymentPredictor:
         if not self.is_trained:
             return self._fallback_prediction(features)
         
-        # Prepare input
-        X = np.array([[
-            features['overdueDays'],
-            features['amount'],
-            features['historicalPayments'],
-            features['contactFrequency']
-        ]])
-        
-        # Scale
-        X_scaled = self.scaler.transform(X)
-        
-        # Predict
-        prediction_class = self.model.predict(X_scaled)[0]
-        probabilities = self.model.predict_proba(X_scaled)[0]
-        
-        # Map to payment probability (0-100)
-        class_to_prob = {
-            'low': 25,
-            'medium': 55,
-            'high': 85
-        }
-        base_probability = class_to_prob.get(prediction_class, 50)
-        
-        # Add some variance based on probabilities
-        confidence = max(probabilities)
-        payment_probability = base_probability + (confidence - 0.5) * 20
-        payment_probability = max(0, min(100, payment_probability))
-        
-        # Calculate risk score (inverse)
-        risk_score = 100 - payment_probability
+        X = np.array([[features[name] for name in FEATURE_NAMES]], dtype=float)
+        payment_probability, risk_score, confidence = self._score_matrix(X)
+        payment_probability = float(payment_probability[0])
         
         # Determine priority
         if payment_probability >= 70:
@@ -70,11 +108,106 @@ class PaymentPredictor:
         
         return {
             'paymentProbability': round(payment_probability, 2),
-            'riskScore': round(risk_score, 2),
+            'riskScore': round(float(risk_score[0]), 2),
             'priority': priority,
-            'confidence': round(confidence * 100, 2)
+            'confidence': round(float(confidence[0]) * 100, 2)
+        }
+    
+    def predict_many(self, rows):
+        """
+        Predict payment probability for a batch of cases
+        
+        All rows go through one scaler.transform and one predict_proba call.
+        
+        Args:
+            rows: list of feature dicts (same keys as predict), a mapping
+                  of FEATURE_NAMES columns (e.g. CaseBatch), or an N x 4
+                  array-like in FEATURE_NAMES column order
+        
+        Returns:
+            dict of parallel lists: paymentProbability, riskScore, priority, confidence
+        """
+        X = self._to_matrix(rows)
+        
+        if len(X) == 0:
+            return {'paymentProbability': [], 'riskScore': [], 'priority': [], 'confidence': []}
+        
+        if not self.is_trained:
+            return self._fallback_prediction_many(X, self._integer_inputs(rows))
+        
+        payment_probability, risk_score, confidence = self._score_matrix(X)
+        priority = np.where(
+            payment_probability >= 70, 'high',
+            np.where(payment_probability >= 40, 'medium', 'low')
+        )
+        
+        # Same rounding as predict(), so batched and single-row results agree
+        return {
+            'paymentProbability': round2(payment_probability).tolist(),
+            'riskScore': round2(risk_score).tolist(),
+            'priority': priority.tolist(),
+            'confidence': round2(confidence * 100).tolist()
         }
     
+    def _to_matrix(self, rows):
+        """Build an N x 4 float matrix from feature dicts, columns or an array-like"""
+        if isinstance(rows, Mapping):
+            # Columns, e.g. a features.case_batch.CaseBatch
+            return np.column_stack([np.asarray(rows[name], dtype=float) for name in FEATURE_NAMES])
+        if len(rows) and isinstance(rows[0], dict):
+            return np.array(
+                [[row[name] for name in FEATURE_NAMES] for row in rows],
+                dtype=float
+            )
+        return np.asarray(rows, dtype=float).reshape(-1, len(FEATURE_NAMES))
+    
+    def _integer_inputs(self, rows):
+        """
+        N x 4 mask of the features given as integers (ints in feature dicts, integer columns or arrays)
+        
+        The fallback rules keep these in integer arithmetic, as
+        _fallback_prediction does, so the batch reports the same int or
+        float as the scalar call (75 or 75.0 in JSON).
+        """
+        if isinstance(rows, Mapping):
+            columns = [np.asarray(rows[name]) for name in FEATURE_NAMES]
+            return np.column_stack([
+                np.full(len(column), _is_integer(column.dtype)) for column in columns
+            ])
+        if len(rows) and isinstance(rows[0], dict):
+            return np.array(
+                [[isinstance(row[name], (int, np.integer)) for name in FEATURE_NAMES] for row in rows],
+                dtype=bool
+            ).reshape(-1, len(FEATURE_NAMES))
+        array = np.asarray(rows)
+        return np.full(array.shape, _is_integer(array.dtype)).reshape(-1, len(FEATURE_NAMES))
+    
+    def _score_matrix(self, X):
+        """
+        Score an N x 4 raw feature matrix with the trained model
+        
+        Returns:
+            (payment_probability, risk_score, confidence) arrays of length N
+        """
+        probabilities = self.model.predict_proba(X)
+        
+        # Predicted class is the argmax column, exactly as model.predict does
+        best = probabilities.argmax(axis=1)
+        class_probs = np.array(
+            [CLASS_TO_PROB.get(label, 50) for label in self.model.classes_],
+            dtype=float
+        )
+        base_probability = class_probs[best]
+        
+        # Add some variance based on probabilities
+        confidence = probabilities[np.arange(len(best)), best]
+        payment_probability = np.clip(base_probability + (confidence - 0.5) * 20, 0, 100)
+        
+        # Calculate risk score (inverse)
+        risk_score = 100 - payment_probability
+        
+        return payment_probability, risk_score, confidence
+    
     def predict_with_explanation(self, features):
         """
         Predict with full explainability - shows WHY the AI made this prediction
@@ -96,13 +229,8 @@ class PaymentPredictor:
         
         # Extract feature importance from the model
         # RandomForest models have feature_importances_ attribute
-        feature_names = ['overdueDays', 'amount', 'historicalPayments', 'contactFrequency']
-        feature_values = [
-            features['overdueDays'],
-            features['amount'],
-            features['historicalPayments'],
-            features['contactFrequency']
-        ]
+        feature_names = FEATURE_NAMES
+        feature_values = [features[name] for name in feature_names]
         
         try:
             feature_importances = self.model.feature_importances_
@@ -146,6 +274,105 @@ class PaymentPredictor:
             }
         }
     
+    def predict_with_explanation_many(self, rows, explain=None):
+        """
+        Batch predict_with_explanation
+        
+        Feature importances, the factor ranking and the trend rules are
+        evaluated once per batch with array operations; explanation text is
+        only rendered for the rows listed in explain.
+        
+        Args:
+            rows: list of feature dicts, columns (e.g. CaseBatch), or an N x 4 array-like
+            explain: row indices to explain (default: every row)
+        
+        Returns:
+            columnar prediction (as predict_many) plus explainedRows and a
+            parallel explanations list
+        """
+        X = self._to_matrix(rows)
+        integer = self._integer_inputs(rows)
+        if self.is_trained:
+            predictions = self.predict_many(X)
+        else:
+            predictions = self._fallback_prediction_many(X, integer)
+        explain = list(range(len(X))) if explain is None else [int(i) for i in explain]
+        
+        if not explain:
+            return {**predictions, 'explainedRows': [], 'explanations': []}
+        
+        index = np.array(explain)
+        # Feature dicts are reported as given; columns and arrays from X,
+        # with whole counts as ints (45 days overdue, not 45.0)
+        row_dicts = not isinstance(rows, Mapping) and len(rows) > 0 and isinstance(rows[0], dict)
+        shown_int = integer[index]
+        if not row_dicts:
+            shown_int = shown_int | (COUNT_FEATURES & (X[index] == np.floor(X[index])))
+        
+        if not self.is_trained:
+            subset = {key: [values[i] for i in explain] for key, values in predictions.items()}
+            return {
+                **predictions,
+                'explainedRows': explain,
+                'explanations': self._fallback_explanation_many(X[index], subset, shown_int)
+            }
+        
+        try:
+            feature_importances = np.asarray(self.model.feature_importances_, dtype=float)
+        except AttributeError:
+            # Fallback if model doesn't have feature_importances_
+            feature_importances = np.array([0.4, 0.3, 0.2, 0.1])  # Default weights
+        
+        # Same ranking for every row: stable descending sort on the rounded impact
+        impacts = feature_importances * 100
+        rounded_impacts = [round(impact, 1) for impact in impacts.tolist()]
+        ranking = np.argsort(-np.array(rounded_impacts), kind='stable')[:3].tolist()
+        factor_names = [self._humanize_factor_name(name) for name in FEATURE_NAMES]
+        
+        trends = self._determine_trends(X[index])
+        
+        explanations = []
+        for j, i in enumerate(explain):
+            features = rows[i] if row_dicts else dict(zip(FEATURE_NAMES, _typed(X[i], shown_int[j])))
+            prediction = {key: predictions[key][i] for key in predictions}
+            
+            factors = []
+            for k in ranking:
+                name = FEATURE_NAMES[k]
+                value = features[name]
+                trend = trends[k][j]
+                factors.append({
+                    'factor': factor_names[k],
+                    'value': value,
+                    'impact': rounded_impacts[k],
+                    'trend': trend,
+                    'explanation': self._format_factor_explanation(name, value, trend, impacts[k])
+                })
+            
+            explanations.append({
+                'summary': f"Payment probability is {prediction['priority']} based on {len(FEATURE_NAMES)} key factors.",
+                'factors': factors,
+                'recommendation': self._generate_recommendation(prediction, factors),
+                'reasoning': self._generate_reasoning(features, prediction)
+            })
+        
+        return {**predictions, 'explainedRows': explain, 'explanations': explanations}
+    
+    def _determine_trends(self, X):
+        """
+        Vectorized _determine_trend for every feature column of X
+        
+        Returns:
+            list (in FEATURE_NAMES order) of per-row trend lists
+        """
+        overdue_days, amount, historical_payments, contact_frequency = X.T
+        return [
+            np.where(overdue_days > 60, 'negative', 'neutral').tolist(),
+            np.where(amount > 10000, 'negative', 'neutral').tolist(),
+            np.where(historical_payments > 0, 'positive', 'negative').tolist(),
+            np.where(contact_frequency > 2, 'positive', 'neutral').tolist()
+        ]
+    
     def _determine_trend(self, factor_name, value):
         """Determine if factor has positive or negative impact"""
         if factor_name == 'overdueDays':
@@ -199,13 +426,13 @@ class PaymentPredictor:
         prob = prediction['paymentProbability']
         
         if prob >= 70:
-            return "HIGH PRIORITY: Contact within 24 hours. High likelihood of recovery with prompt action."
+            return RECOMMENDATIONS[3]
         elif prob >= 50:
-            return "MEDIUM PRIORITY: Schedule contact within 48-72 hours. Structured payment plan recommended."
+            return RECOMMENDATIONS[2]
         elif prob >= 30:
-            return "Contact with negotiation approach. Consider extended payment terms or settlement."
+            return RECOMMENDATIONS[1]
         else:
-            return "LOW PRIORITY: Consider escalation or alternative resolution strategies."
+            return RECOMMENDATIONS[0]
     
     def _generate_reasoning(self, features, prediction):
         """Generate detailed reasoning for the prediction"""
@@ -297,3 +524,110 @@ class PaymentPredictor:
             'priority': priority,
             'confidence': 0
         }
+    
+    def _fallback_prediction_many(self, X, integer=None):
+        """
+        Vectorized _fallback_prediction over an N x 4 raw feature matrix
+        
+        Applies the same rules in the same order, so every row matches the
+        scalar result exactly (including Python's min/max/round semantics).
+        
+        Args:
+            X: N x 4 raw feature matrix
+            integer: N x 4 mask of features given as integers (default: none),
+                     see _integer_inputs
+        
+        Returns:
+            dict of parallel lists: paymentProbability, riskScore, priority, confidence
+        """
+        overdue_days, amount, historical_payments, contact_frequency = X.T
+        
+        score = 50 + FALLBACK_OVERDUE_POINTS[np.digitize(overdue_days, FALLBACK_OVERDUE_EDGES)]
+        score = score + FALLBACK_AMOUNT_POINTS[np.digitize(amount, FALLBACK_AMOUNT_EDGES)]
+        
+        # min(x, cap) keeps x unless cap < x - np.where reproduces that exactly
+        payments_points = historical_payments * 5
+        score = score + np.where(25 < payments_points, 25, payments_points)
+        contact_points = contact_frequency * 2
+        score = score + np.where(15 < contact_points, 15, contact_points)
+        
+        # max(0, min(100, score))
+        unclamped = score
+        score = np.where(score < 100, score, 100)
+        score = np.where(score > 0, score, 0)
+        risk_score = 100 - score
+        
+        priority = np.select([score >= 70, score >= 40], ['high', 'medium'], 'low')
+        
+        # The scalar score stays an int while every term added to it is one:
+        # integer features, or the int cap where min() applied it. The
+        # clamp's min/max return their int bound (100 or 0) once reached.
+        if integer is None:
+            integer = np.zeros(X.shape, dtype=bool)
+        is_int = (
+            (integer[:, 2] | (25 < payments_points)) & (integer[:, 3] | (15 < contact_points))
+            | (unclamped >= 100) | (unclamped <= 0)
+        )
+        
+        return {
+            'paymentProbability': _typed(round2(score), is_int),
+            'riskScore': _typed(round2(risk_score), is_int),
+            'priority': priority.tolist(),
+            'confidence': [0] * len(score)
+        }
+    
+    def _fallback_explanation_many(self, X, predictions, integer=None):
+        """
+        Batch variant of _fallback_explanation
+        
+        Args:
+            X: N x 4 raw feature matrix
+            predictions: columnar result of _fallback_prediction_many
+            integer: N x 4 mask of feature values to report as ints (default: none)
+        
+        Returns:
+            list of N explanation dicts
+        """
+        overdue_days, amount = X[:, 0], X[:, 1]
+        if integer is None:
+            integer = np.zeros(X.shape, dtype=bool)
+        overdue_trend = np.where(overdue_days > 60, 'negative', 'neutral').tolist()
+        amount_trend = np.where(amount > 10000, 'negative', 'neutral').tolist()
+        
+        probability = np.array(predictions['paymentProbability'], dtype=float)
+        band = np.select([probability >= 70, probability >= 50, probability >= 30], [3, 2, 1], 0)
+        recommendation = [RECOMMENDATIONS[k] for k in band.tolist()]
+        
+        return [
+            {
+                'summary': "Prediction based on rule-based analysis (ML model not available)",
+                'factors': [
+                    {
+                        'factor': 'Days Overdue',
+                        'value': overdue,
+                        'impact': 40.0,
+                        'trend': overdue_trend[i]
+                    },
+                    {
+                        'factor': 'Outstanding Amount',
+                        'value': value,
+                        'impact': 30.0,
+                        'trend': amount_trend[i]
+                    }
+                ],
+                'recommendation': recommendation[i],
+                'reasoning': 'Rule-based fallback mode active'
+            }
+            for i, (overdue, value) in enumerate(zip(
+                _typed(overdue_days, integer[:, 0]), _typed(amount, integer[:, 1])
+            ))
+        ]
+
+
+def _is_integer(dtype):
+    return np.issubdtype(dtype, np.integer) or np.issubdtype(dtype, np.bool_)
+
+
+def _typed(values, is_int):
+    """values as a list, with the rows flagged in is_int as Python ints"""
+    return [int(value) if flag else value for value, flag in zip(values.tolist(), is_int.tolist())]
@@ -0,0 +1,140 @@
+"""
+Model Registry
+Versioned compiled-model directory with an atomically switched active version
+
+    python -m prediction.registry list
+    python -m prediction.registry activate <version>
+    python -m prediction.registry prune --keep 10
+
+Layout (under MODEL_PATH/registry):
+
+    <version>/      one compiled forest artifact per version, never modified
+    CURRENT         the active version
+
+Publishing copies an artifact in under its version; activating rewrites
+CURRENT with an atomic rename. Running APIs watch CURRENT and hot-swap to
+the new version (see api.reload_model).
+"""
+
+import json
+import os
+import shutil
+import sys
+from typing import Any, Dict, List, Optional
+
+CURRENT_FILE = 'CURRENT'
+MANIFEST_FILE = 'manifest.json'
+
+
+def default_root() -> str:
+    model_dir = os.environ.get(
+        'MODEL_PATH',
+        os.path.join(os.path.dirname(__file__), '..', 'models')
+    )
+    return os.path.join(model_dir, 'registry')
+
+
+class ModelRegistry:
+    def __init__(self, root: Optional[str] = None):
+        self.root = os.path.abspath(root or default_root())
+
+    def path(self, version: str) -> str:
+        return os.path.join(self.root, version)
+
+    def current(self) -> Optional[str]:
+        """Active version, or None if nothing was activated yet"""
+        try:
+            with open(os.path.join(self.root, CURRENT_FILE)) as f:
+                return f.read().strip() or None
+        except FileNotFoundError:
+            return None
+
+    def current_path(self) -> Optional[str]:
+        version = self.current()
+        return self.path(version) if version else None
+
+    def versions(self) -> List[Dict[str, Any]]:
+        """Manifests of every published version, oldest first"""
+        if not os.path.isdir(self.root):
+            return []
+        manifests = []
+        for name in os.listdir(self.root):
+            manifest_path = os.path.join(self.root, name, MANIFEST_FILE)
+            if os.path.isfile(manifest_path):
+                with open(manifest_path) as f:
+                    manifests.append(json.load(f))
+        return sorted(manifests, key=lambda manifest: manifest.get('created_at', ''))
+
+    def publish(self, artifact_path: str, activate: bool = True) -> str:
+        """
+        Copy a compiled artifact into the registry under its model version
+
+        Publishing the same version twice is a no-op. Returns the version.
+        """
+        with open(os.path.join(artifact_path, MANIFEST_FILE)) as f:
+            version = json.load(f)['model_version']
+
+        target = self.path(version)
+        if not os.path.exists(target):
+            os.makedirs(self.root, exist_ok=True)
+            staging = f"{target}.tmp-{os.getpid()}"
+            shutil.rmtree(staging, ignore_errors=True)
+            shutil.copytree(artifact_path, staging)
+            os.rename(staging, target)
+
+        if activate:
+            self.activate(version)
+        return version
+
+    def activate(self, version: str):
+        """Point CURRENT at a published version (atomic)"""
+        if not os.path.isfile(os.path.join(self.path(version), MANIFEST_FILE)):
+            raise ValueError(f"Model version {version} is not in the registry")
+        staging = os.path.join(self.root, f"{CURRENT_FILE}.tmp-{os.getpid()}")
+        with open(staging, 'w') as f:
+            f.write(version + '\n')
+        os.replace(staging, os.path.join(self.root, CURRENT_FILE))
+
+    def prune(self, keep: int = 10) -> List[str]:
+        """Delete all but the newest keep versions (never the active one)"""
+        current = self.current()
+        versions = [manifest['model_version'] for manifest in self.versions()]
+        removed = [version for version in versions[:-keep] if version != current] if keep else \
+            [version for version in versions if version != current]
+        for version in removed:
+            shutil.rmtree(self.path(version), ignore_errors=True)
+        return removed
+
+
+def main(argv=None):
+    import argparse
+
+    parser = argparse.ArgumentParser(prog='python -m prediction.registry')
+    parser.add_argument('--root', help='registry directory (default: MODEL_PATH/registry)')
+    commands = parser.add_subparsers(dest='command', required=True)
+    commands.add_parser('list', help='published versions, oldest first')
+    activate_parser = commands.add_parser('activate', help='switch the active version (rollback)')
+    activate_parser.add_argument('version')
+    prune_parser = commands.add_parser('prune', help='delete old versions')
+    prune_parser.add_argument('--keep', type=int, default=10)
+    args = parser.parse_args(argv)
+
+    registry = ModelRegistry(args.root)
+    if args.command == 'list':
+        current = registry.current()
+        for manifest in registry.versions():
+            marker = '*' if manifest['model_version'] == current else ' '
+            training = manifest.get('metadata', {}).get('training', '-')
+            print(f"{marker} {manifest['model_version']}  {manifest.get('created_at', '')}  "
+                  f"{manifest.get('n_trees')} trees  {training}")
+    elif args.command == 'activate':
+        registry.activate(args.version)
+        print(f"Active model version: {args.version}")
+    else:
+        removed = registry.prune(args.keep)
+        print(f"Removed {len(removed)} version(s)")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,202 @@
+"""
+DCA Registry
+Server-side DCA roster kept in score order for fast recommendations
+
+recommend_dca_assignment used to score and sort every DCA a caller sent
+in the request body. A DCA's score is its success-rate and capacity terms,
+which don't depend on the case, plus a specialization bonus, which depends
+on the case only through its priority score. The registry therefore keeps
+the case-independent part precomputed, with the DCAs of each specialization
+sorted by it. The best DCAs for a case are a merge of the specializations'
+heads, each shifted by its bonus for that case, so only the first k are
+looked at. A load or success-rate change re-scores one DCA.
+"""
+
+import heapq
+import threading
+from bisect import bisect_left, insort
+from itertools import count, islice
+from typing import Any, Callable, Dict, Iterable, List
+
+from .prioritizer import specialization_bonus
+
+# Roster fields with recommend_dca_assignment's defaults
+DEFAULTS = {
+    'success_rate': 50,
+    'current_load': 0,
+    'max_load': 50,
+    'specialization': 'general'
+}
+
+# Fields a DCA update may change (the id names the DCA and can't)
+UPDATABLE_FIELDS = ['name'] + list(DEFAULTS)
+
+
+class DCARegistry:
+    """
+    DCAs by specialization, each group sorted by base score, highest first
+
+    Ties keep the order DCAs were registered in, as recommend_dca_assignment
+    keeps the order of available_dcas. Safe to share between request threads.
+    """
+
+    def __init__(self):
+        self._dcas: Dict[Any, Dict[str, Any]] = {}
+        self._ids: Dict[int, Any] = {}
+        # Sorted (-base score, seq) keys per specialization; seq is the
+        # DCA's registration number
+        self._groups: Dict[str, List[tuple]] = {}
+        self._seq = count()
+        # Reentrant so assign() can read and update the roster while holding it
+        self._lock = threading.RLock()
+
+    @classmethod
+    def from_dcas(cls, dcas: Iterable[Dict[str, Any]]) -> 'DCARegistry':
+        registry = cls()
+        for dca in dcas:
+            registry.upsert(dca)
+        return registry
+
+    def __len__(self) -> int:
+        return len(self._dcas)
+
+    def __contains__(self, dca_id) -> bool:
+        return dca_id in self._dcas
+
+    def upsert(self, dca: Dict[str, Any]):
+        """
+        Add a DCA or replace its fields (id, name, success_rate, current_load, max_load, specialization)
+
+        Raises ValueError, leaving the roster unchanged, if the merged
+        fields are invalid.
+        """
+        self.upsert_many([dca])
+
+    def upsert_many(self, dcas: Iterable[Dict[str, Any]]):
+        """upsert several DCAs; if any is invalid, none are applied"""
+        with self._lock:
+            # Later entries for the same id update earlier ones
+            merged = {}
+            for dca in dcas:
+                existing = self._dcas.get(dca['id'])
+                base = merged.get(dca['id']) or (existing['dca'] if existing is not None else {})
+                merged[dca['id']] = {**base, **dca}
+
+            # Build (and validate) every record before the roster changes
+            changes = []
+            for dca_id, dca in merged.items():
+                existing = self._dcas.get(dca_id)
+                seq = existing['seq'] if existing is not None else None
+                changes.append((existing, self._record(dca, seq)))
+            for existing, record in changes:
+                if existing is not None:
+                    self._remove(existing)
+                elif record['seq'] is None:
+                    seq = next(self._seq)
+                    record['seq'], record['key'] = seq, (record['key'][0], seq)
+                self._insert(record)
+
+    def update(self, dca_id, load_delta: int = 0, **fields):
+        """Change some of a DCA's fields, e.g. success_rate after new outcomes, and its load by load_delta cases"""
+        with self._lock:
+            record = self._dcas[dca_id]
+            dca = {**record['dca'], **fields, 'id': dca_id}
+            if load_delta:
+                dca['current_load'] = _number(dca, 'current_load') + load_delta
+            self._replace(record, dca)
+
+    def add_load(self, dca_id, cases: int = 1):
+        """Count cases assigned to (or, negative, closed by) a DCA"""
+        self.update(dca_id, load_delta=cases)
+
+    def assign(self, solve: Callable[[List[Dict[str, Any]]], Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Assign a batch over the roster and count the assigned cases, as one step
+
+        solve gets the roster and returns a CasePrioritizer.assign_dcas
+        result, whose dca_load is added to the loads before another request
+        can read them - two batches never fill the same free capacity.
+        """
+        with self._lock:
+            result = solve(self.dcas())
+            for load in result['dca_load']:
+                if load['assigned']:
+                    self.add_load(load['dca_id'], load['assigned'])
+            return result
+
+    def remove(self, dca_id) -> bool:
+        """Drop a DCA from the roster (False if it wasn't registered)"""
+        with self._lock:
+            record = self._dcas.get(dca_id)
+            if record is None:
+                return False
+            self._remove(record)
+            del self._dcas[dca_id]
+            del self._ids[record['seq']]
+            return True
+
+    def get(self, dca_id) -> Dict[str, Any]:
+        return dict(self._dcas[dca_id]['dca'])
+
+    def dcas(self) -> List[Dict[str, Any]]:
+        """The roster in registration order"""
+        with self._lock:
+            return [dict(self._dcas[self._ids[seq]]['dca']) for seq in sorted(self._ids)]
+
+    def top(self, priority_score: float, k: int = 1) -> List[Dict[str, Any]]:
+        """The k best-scoring DCAs for a case with the given priority score, best first"""
+        with self._lock:
+            heads = [
+                _shifted(keys, specialization_bonus(priority_score, specialization))
+                for specialization, keys in self._groups.items()
+            ]
+            return [dict(self._dcas[self._ids[seq]]['dca']) for _, seq in islice(heapq.merge(*heads), k)]
+
+    def _record(self, dca: Dict[str, Any], seq: int) -> Dict[str, Any]:
+        """Validate a DCA and compute its order key, without touching the roster"""
+        dca = {**DEFAULTS, **dca}
+        for name in ('success_rate', 'current_load', 'max_load'):
+            _number(dca, name)
+        if dca['max_load'] <= 0:
+            raise ValueError(f"DCA {dca['id']}: max_load must be positive, got {dca['max_load']!r}")
+        if not isinstance(dca['specialization'], str):
+            raise ValueError(f"DCA {dca['id']}: specialization must be a string")
+
+        # Same additions, in the same order, as recommend_dca_assignment
+        score = 0
+        score += dca['success_rate'] / 100 * 40
+        score += (1 - (dca['current_load'] / dca['max_load'])) * 30
+
+        # Rounded like the reported match score, so ties fall back to
+        # registration order; the specialization bonus is whole points
+        return {'dca': dca, 'seq': seq, 'key': (-round(score, 2), seq)}
+
+    def _replace(self, record: Dict[str, Any], dca: Dict[str, Any]):
+        # Build (and validate) the new record before the old one leaves its group
+        fresh = self._record(dca, record['seq'])
+        self._remove(record)
+        self._insert(fresh)
+
+    def _insert(self, record: Dict[str, Any]):
+        self._ids[record['seq']] = record['dca']['id']
+        self._dcas[record['dca']['id']] = record
+        insort(self._groups.setdefault(record['dca']['specialization'], []), record['key'])
+
+    def _remove(self, record: Dict[str, Any]):
+        group = self._groups[record['dca']['specialization']]
+        del group[bisect_left(group, record['key'])]
+        if not group:
+            del self._groups[record['dca']['specialization']]
+
+
+def _shifted(keys: List[tuple], bonus: float):
+    """A group's keys with its specialization bonus added; the order is unchanged"""
+    for score, seq in keys:
+        yield score - bonus, seq
+
+
+def _number(dca: Dict[str, Any], name: str):
+    value = dca[name]
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        raise ValueError(f"DCA {dca['id']}: {name} must be a number, got {value!r}")
+    return value
@@ -1,6 +1,35 @@
+import heapq
+
+import numpy as np
+
+from utils import round2
+
+# SLA urgency scores by slaStatus
+SLA_SCORES = {
+    'breached': 100,
+    'warning': 80,
+    'on_track': 50
+}
+
+
+def specialization_bonus(priority_score, specialization):
+    """Case complexity match points (out of 30) for a DCA specialization"""
+    # High-value cases → specialist DCAs
+    if priority_score >= 75 and specialization == 'high_value':
+        return 30
+    # Complex cases → experienced DCAs
+    if priority_score >= 50 and specialization == 'complex':
+        return 25
+    # Standard cases → general DCAs
+    if specialization == 'general':
+        return 20
+    return 15
+
+
 class CasePrioritizer:
-    def __init__(self):
-        pass
+    def __init__(self, dca_registry=None):
+        # Optional server-side DCA roster (recommendation.dca_registry.DCARegistry)
+        self.dca_registry = dca_registry
     
     def calculate_priority_score(self, features):
         """
@@ -40,42 +69,53 @@ class CasePrioritizer:
         
         # SLA urgency: 10%
         sla_status = features.get('slaStatus', 'on_track')
-        sla_scores = {
-            'breached': 100,
-            'warning': 80,
-            'on_track': 50
-        }
-        score += sla_scores.get(sla_status, 50) * 0.1
+        score += SLA_SCORES.get(sla_status, 50) * 0.1
         
         return round(score, 2)
     
-    def prioritize_cases(self, cases):
+    def prioritize_cases(self, cases, top_k=None, id_field='id'):
         """
         Prioritize a list of cases
         
         Args:
-            cases: list of dicts with case features
+            cases: list (or any iterable) of dicts with case features
+            top_k: only keep the top_k highest-priority cases. Cases are
+                   streamed through a heap of top_k entries and not copied,
+                   so a work queue of any size costs memory for top_k only.
+            id_field: case key reported as 'id' in top_k results
         
         Returns:
-            sorted list with priority scores
+            without top_k: every case, copied with priorityScore and
+            priorityLevel added, sorted by priority score
+            with top_k: the top_k cases as {'id', 'index', 'priorityScore',
+            'priorityLevel'} (index = position in cases), same order
         """
+        if top_k is not None:
+            scored = (
+                (self.calculate_priority_score(case), index, case.get(id_field))
+                for index, case in enumerate(cases)
+            )
+            # nlargest is stable like the full sort: ties keep input order
+            top = heapq.nlargest(top_k, scored, key=lambda entry: entry[0])
+            return [
+                {
+                    'id': case_id,
+                    'index': index,
+                    'priorityScore': priority_score,
+                    'priorityLevel': self._priority_level(priority_score)
+                }
+                for priority_score, index, case_id in top
+            ]
+        
         prioritized = []
         
         for case in cases:
             priority_score = self.calculate_priority_score(case)
             
-            # Classify
-            if priority_score >= 75:
-                priority_level = 'high'
-            elif priority_score >= 50:
-                priority_level = 'medium'
-            else:
-                priority_level = 'low'
-            
             prioritized.append({
                 **case,
                 'priorityScore': priority_score,
-                'priorityLevel': priority_level
+                'priorityLevel': self._priority_level(priority_score)
             })
         
         # Sort by priority score descending
@@ -83,76 +123,132 @@ class CasePrioritizer:
         
         return prioritized
     
-    def recommend_dca_assignment(self, case, available_dcas):
+    def calculate_priority_scores(self, columns):
+        """
+        calculate_priority_score for whole columns at once
+        
+        Args:
+            columns: dict of equal-length arrays keyed like the case features
+                     (paymentProbability, amount, overdueDays, slaStatus);
+                     missing columns take the same defaults. slaStatus may
+                     also be integer codes, as in features.case_batch.CaseBatch
+        
+        Returns:
+            array of priority scores, identical to the per-case scores
+        """
+        n = max((len(values) for values in columns.values()), default=0)
+        
+        def column(name, default):
+            if name in columns:
+                return np.asarray(columns[name], dtype=float)
+            return np.full(n, float(default))
+        
+        # Same additions, in the same order, as calculate_priority_score
+        score = column('paymentProbability', 50) * 0.4
+        amount_score = np.minimum(column('amount', 0) / 20000 * 100, 100)
+        score = score + amount_score * 0.3
+        overdue_days = column('overdueDays', 0)
+        overdue_score = np.select(
+            [(overdue_days >= 30) & (overdue_days <= 90), overdue_days < 30, overdue_days <= 120],
+            [100, 60, 70], 40
+        )
+        score = score + overdue_score * 0.2
+        sla_score = np.full(n, 50.0)
+        if 'slaStatus' in columns:
+            sla_status = np.asarray(columns['slaStatus'])
+            if np.issubdtype(sla_status.dtype, np.integer):
+                # Codes into SLA_SCORES order (features.case_batch.SLA_STATUSES),
+                # anything past the end is an unknown status
+                sla_score = np.append(np.array(list(SLA_SCORES.values()), dtype=float), 50.0)[
+                    np.minimum(sla_status, len(SLA_SCORES))
+                ]
+            else:
+                sla_status = sla_status.astype(object)
+                for status, status_score in SLA_SCORES.items():
+                    sla_score[sla_status == status] = status_score
+        score = score + sla_score * 0.1
+        
+        return round2(score)
+    
+    def prioritize_many(self, columns, top_k=None, ids=None):
+        """
+        Columnar prioritize_cases: the top_k cases of a portfolio held as arrays
+        
+        Finds the top_k with a partition rather than sorting everything;
+        ties are ordered like prioritize_cases (input order).
+        
+        Args:
+            columns: as calculate_priority_scores
+            top_k: cases to return (default: all)
+            ids: case ids, reported alongside the input positions
+        
+        Returns:
+            dict of arrays for the selected cases, highest priority first:
+            index, id (if ids given), priorityScore, priorityLevel
+        """
+        scores = self.calculate_priority_scores(columns)
+        if top_k is not None and top_k < len(scores):
+            if top_k <= 0:
+                candidates = np.arange(0)
+            else:
+                # Every case tied with the k-th best is a candidate, so the
+                # stable sort below decides ties the way prioritize_cases does
+                threshold = np.partition(scores, len(scores) - top_k)[len(scores) - top_k]
+                candidates = np.flatnonzero(scores >= threshold)
+        else:
+            candidates = np.arange(len(scores))
+        index = candidates[np.argsort(-scores[candidates], kind='stable')][:top_k]
+        
+        selected = scores[index]
+        result = {
+            'index': index,
+            'priorityScore': selected,
+            'priorityLevel': np.where(selected >= 75, 'high', np.where(selected >= 50, 'medium', 'low'))
+        }
+        if ids is not None:
+            result['id'] = np.asarray(ids)[index]
+        return result
+    
+    @staticmethod
+    def _priority_level(priority_score):
+        if priority_score >= 75:
+            return 'high'
+        elif priority_score >= 50:
+            return 'medium'
+        return 'low'
+    
+    def recommend_dca_assignment(self, case, available_dcas=None, top_k=None):
         """
         Smart DCA Assignment - matches cases to best-fit DCA
         
         Args:
             case: dict with case features
-            available_dcas: list of dicts with DCA info (id, name, success_rate, current_load, specialization)
+            available_dcas: list of dicts with DCA info (id, name, success_rate, current_load, specialization),
+                            or None to look the best DCAs up in the prioritizer's DCA registry
+            top_k: also return the k best DCAs as candidates
         
         Returns:
             dict with recommended DCA and explanation
         """
-        if not available_dcas:
-            return None
-        
         priority_score = self.calculate_priority_score(case)
-        case_amount = case.get('amount', 0)
         
-        # Score each DCA based on fit
-        dca_scores = []
-        for dca in available_dcas:
-            score = 0
-            reasons = []
-            
-            # Factor 1: Success rate (40% weight)
-            success_rate = dca.get('success_rate', 50) / 100
-            score += success_rate * 40
-            if success_rate > 0.7:
-                reasons.append(f"{dca['name']} has {success_rate*100:.0f}% success rate")
-            
-            # Factor 2: Workload capacity (30% weight)
-            current_load = dca.get('current_load', 0)
-            max_load = dca.get('max_load', 50)
-            capacity = 1 - (current_load / max_load)
-            score += capacity * 30
-            if capacity > 0.5:
-                reasons.append(f"Available capacity ({int(capacity*100)}%)")
-            
-            # Factor 3: Case complexity match (30% weight)
-            specialization = dca.get('specialization', 'general')
-            
-            # High-value cases → specialist DCAs
-            if priority_score >= 75 and specialization == 'high_value':
-                score += 30
-                reasons.append("Specializes in high-value cases")
-            # Complex cases → experienced DCAs
-            elif priority_score >= 50 and specialization == 'complex':
-                score += 25
-                reasons.append("Experienced with complex cases")
-            # Standard cases → general DCAs
-            elif specialization == 'general':
-                score += 20
-                reasons.append("General case handler")
-            else:
-                score += 15
-            
-            dca_scores.append({
-                'dca_id': dca.get('id'),
-                'dca_name': dca.get('name'),
-                'score': round(score, 2),
-                'reasons': reasons,
-                'success_rate': success_rate * 100,
-                'current_load': current_load
-            })
+        if available_dcas is None and self.dca_registry is not None:
+            # Registry keeps DCAs ordered by their case-independent score,
+            # so only the best few are looked at
+            best = self.dca_registry.top(priority_score, max(top_k or 0, 2))
+            dca_scores = [self._dca_match(dca, priority_score) for dca in best]
+        else:
+            # Score each DCA based on fit
+            dca_scores = [self._dca_match(dca, priority_score) for dca in available_dcas or []]
+            # Sort by score (descending)
+            dca_scores.sort(key=lambda x: x['score'], reverse=True)
         
-        # Sort by score (descending)
-        dca_scores.sort(key=lambda x: x['score'], reverse=True)
+        if not dca_scores:
+            return None
         
         best_match = dca_scores[0]
         
-        return {
+        recommendation = {
             'recommended_dca_id': best_match['dca_id'],
             'recommended_dca_name': best_match['dca_name'],
             'match_score': best_match['score'],
@@ -160,6 +256,154 @@ class CasePrioritizer:
             'alternative': dca_scores[1] if len(dca_scores) > 1 else None,
             'explanation': self._format_assignment_explanation(case, best_match)
         }
+        if top_k is not None:
+            recommendation['candidates'] = dca_scores[:top_k]
+        return recommendation
+    
+    def _dca_match(self, dca, priority_score):
+        """Score one DCA for a case with the given priority score"""
+        score = 0
+        reasons = []
+        
+        # Factor 1: Success rate (40% weight)
+        success_rate = dca.get('success_rate', 50) / 100
+        score += success_rate * 40
+        if success_rate > 0.7:
+            reasons.append(f"{dca['name']} has {success_rate*100:.0f}% success rate")
+        
+        # Factor 2: Workload capacity (30% weight)
+        current_load = dca.get('current_load', 0)
+        max_load = dca.get('max_load', 50)
+        capacity = 1 - (current_load / max_load)
+        score += capacity * 30
+        if capacity > 0.5:
+            reasons.append(f"Available capacity ({int(capacity*100)}%)")
+        
+        # Factor 3: Case complexity match (30% weight)
+        specialization = dca.get('specialization', 'general')
+        score += specialization_bonus(priority_score, specialization)
+        
+        # High-value cases → specialist DCAs
+        if priority_score >= 75 and specialization == 'high_value':
+            reasons.append("Specializes in high-value cases")
+        # Complex cases → experienced DCAs
+        elif priority_score >= 50 and specialization == 'complex':
+            reasons.append("Experienced with complex cases")
+        # Standard cases → general DCAs
+        elif specialization == 'general':
+            reasons.append("General case handler")
+        
+        return {
+            'dca_id': dca.get('id'),
+            'dca_name': dca.get('name'),
+            'score': round(score, 2),
+            'reasons': reasons,
+            'success_rate': success_rate * 100,
+            'current_load': current_load
+        }
+    
+    def assign_dcas(self, cases, available_dcas, id_field='id', priority_scores=None):
+        """
+        Assign a whole batch of cases to DCAs at once, within each DCA's capacity
+        
+        Scores every case-DCA pair like recommend_dca_assignment (success
+        rate, capacity, specialization match) and finds the assignment with
+        the highest total score that gives no DCA more cases than its
+        remaining slots (max_load - current_load). Unlike calling
+        recommend_dca_assignment per case, load is accounted for, so a bulk
+        import is spread over the DCAs instead of all going to the top one.
+        
+        A pair's score depends on the case only through its priority band
+        (the specialization match), so the optimization runs over bands x
+        DCAs, which is exact and independent of the batch size. Within a
+        band, higher-priority cases are placed first; if total capacity is
+        short, the lowest-priority cases of the cheapest bands are left
+        unassigned.
+        
+        Args:
+            cases: list of dicts with case features
+            available_dcas: list of dicts with DCA info (id, name, success_rate,
+                            current_load, max_load, specialization)
+            id_field: case key reported as case_id
+            priority_scores: the cases' priority scores, if already computed
+        
+        Returns:
+            dict with assignments (one per case, in input order, dca_id None
+            if unassigned), dca_load (load per DCA after the batch),
+            total_score and unassigned count
+        """
+        if not available_dcas:
+            return None
+        
+        if priority_scores is None:
+            priority_scores = [self.calculate_priority_score(case) for case in cases]
+        priority = np.asarray(priority_scores, dtype=float)
+        band = np.select([priority >= 75, priority >= 50], [0, 1], 2)
+        scores = self._dca_band_scores(available_dcas)
+        
+        slots = np.array([
+            max(int(dca.get('max_load', 50) - dca.get('current_load', 0)), 0) for dca in available_dcas
+        ])
+        flow = _max_score_transport(scores, np.bincount(band, minlength=3), slots)
+        
+        chosen = np.full(len(cases), -1)
+        for b in range(3):
+            members = np.flatnonzero(band == b)
+            members = members[np.argsort(-priority[members], kind='stable')]
+            # Best-scoring DCAs first, each repeated for the cases it takes
+            dca_order = np.argsort(-scores[b], kind='stable')
+            targets = np.repeat(dca_order, flow[b, dca_order])
+            chosen[members[:len(targets)]] = targets
+        
+        assigned = chosen >= 0
+        match_score = np.where(assigned, scores[band, np.maximum(chosen, 0)], 0.0)
+        taken = np.bincount(chosen[assigned], minlength=len(available_dcas))
+        
+        return {
+            'assignments': [
+                {
+                    'case_id': case.get(id_field),
+                    'dca_id': available_dcas[j].get('id') if j >= 0 else None,
+                    'dca_name': available_dcas[j].get('name') if j >= 0 else None,
+                    'match_score': round(float(score), 2) if j >= 0 else None,
+                    'priorityScore': float(case_priority)
+                }
+                for case, j, score, case_priority in zip(cases, chosen.tolist(), match_score, priority)
+            ],
+            'dca_load': [
+                {
+                    'dca_id': dca.get('id'),
+                    'assigned': int(count),
+                    'current_load': dca.get('current_load', 0) + int(count),
+                    'max_load': dca.get('max_load', 50)
+                }
+                for dca, count in zip(available_dcas, taken)
+            ],
+            'total_score': round(float(match_score.sum()), 2),
+            'unassigned': int((~assigned).sum())
+        }
+    
+    def _dca_band_scores(self, available_dcas):
+        """
+        recommend_dca_assignment's DCA scores for each priority band
+        
+        Returns a 3 x len(available_dcas) array, rows high / medium / low.
+        """
+        success_rate = np.array([dca.get('success_rate', 50) for dca in available_dcas], dtype=float) / 100
+        capacity = 1 - (
+            np.array([dca.get('current_load', 0) for dca in available_dcas], dtype=float)
+            / np.array([dca.get('max_load', 50) for dca in available_dcas], dtype=float)
+        )
+        specialization = np.array([dca.get('specialization', 'general') for dca in available_dcas], dtype=object)
+        
+        general = np.where(specialization == 'general', 20, 15)
+        complex_match = np.where(specialization == 'complex', 25, general)
+        match = np.stack([
+            np.where(specialization == 'high_value', 30, complex_match),
+            complex_match,
+            general
+        ])
+        return success_rate * 40 + capacity * 30 + match
     
     def _format_assignment_explanation(self, case, dca_match):
         """Generate human-readable explanation for DCA assignment"""
@@ -177,3 +421,76 @@ class CasePrioritizer:
         
         return explanation
 
+
+def _max_score_transport(scores, supply, capacity):
+    """
+    Highest-scoring integral transport of supply[i] units from each row to
+    columns holding at most capacity[j] units, scores[i, j] per unit
+    
+    Min-cost flow on the negated scores by successive shortest paths: each
+    round finds the cheapest source-to-sink path in the residual graph
+    (Bellman-Ford, vectorized over the rows x columns matrix) and pushes as
+    much as it can carry. Exact; rounds are bounded by rows + columns
+    saturations, not by the number of units.
+    
+    Returns:
+        rows x columns array of units sent
+    """
+    n_rows, n_cols = scores.shape
+    cost = -np.asarray(scores, dtype=float)
+    supply = np.array(supply, dtype=np.int64)
+    capacity = np.array(capacity, dtype=np.int64)
+    flow = np.zeros((n_rows, n_cols), dtype=np.int64)
+    columns = np.arange(n_cols)
+    rows = np.arange(n_rows)
+    
+    while supply.any() and capacity.any():
+        # Distances to rows (from the source) and columns; a row can also
+        # be reached back from a column it already sends to
+        row_dist = np.where(supply > 0, 0.0, np.inf)
+        row_pred = np.full(n_rows, -1)
+        col_dist = np.full(n_cols, np.inf)
+        col_pred = np.full(n_cols, -1)
+        for _ in range(n_rows + n_cols + 1):
+            # Only strict improvements move a predecessor, so ties can't
+            # close a zero-cost loop in the path
+            through = row_dist[:, None] + cost
+            best_row = through.argmin(axis=0)
+            best_dist = through[best_row, columns]
+            col_improved = best_dist < col_dist - 1e-9
+            col_dist = np.where(col_improved, best_dist, col_dist)
+            col_pred = np.where(col_improved, best_row, col_pred)
+            back = np.where(flow > 0, col_dist[None, :] - cost, np.inf)
+            back_col = back.argmin(axis=1)
+            back_dist = back[rows, back_col]
+            improved = back_dist < row_dist - 1e-9
+            if not improved.any():
+                break
+            row_dist = np.where(improved, back_dist, row_dist)
+            row_pred = np.where(improved, back_col, row_pred)
+        
+        end = np.where(capacity > 0, col_dist, np.inf)
+        col = int(end.argmin())
+        if not np.isfinite(end[col]):
+            break
+        
+        # Walk the path back to the source, noting the bottleneck
+        path = []
+        amount = capacity[col]
+        j = col
+        while True:
+            i = int(col_pred[j])
+            path.append((i, j, 1))
+            if row_pred[i] == -1:
+                amount = min(amount, supply[i])
+                break
+            j = int(row_pred[i])
+            path.append((i, j, -1))
+            amount = min(amount, flow[i, j])
+        
+        for i, j, direction in path:
+            flow[i, j] += direction * amount
+        supply[i] -= amount
+        capacity[col] -= amount
+    
+    return flow
@@ -0,0 +1,294 @@
+"""
+Priority Index
+Open-case portfolio kept in priority order as cases change
+
+Work-queue views used to re-run prioritize_cases over every open case. The
+index scores each case once with CasePrioritizer.calculate_priority_score
+and keeps the cases sorted. An upsert, closure or SLA change re-scores one
+case and moves it in the order. "Next best case" is the head of the order,
+and a case's rank is one binary search.
+
+Overdue days grow every day, but the priority weight only changes at a few
+bucket edges. Each case therefore stores the day it next crosses one, and
+tick() re-ranks only the cases crossing an edge that day, not the whole
+portfolio.
+
+Overdue days are whole days. Days are date.toordinal() numbers; any date,
+datetime or day number is accepted.
+"""
+
+import heapq
+import math
+import threading
+from bisect import bisect_left, insort
+from datetime import date, datetime
+from itertools import count
+from typing import Any, Dict, Iterable, List, Optional
+
+from .prioritizer import CasePrioritizer
+
+# Overdue days at which calculate_priority_score's overdue weight changes
+# (fresh < 30, sweet spot 30-90, aging 91-120, very old > 120)
+OVERDUE_STEPS = (30, 91, 121)
+
+# Cases crossing on one tick above which the order is rebuilt in one pass
+BULK_RERANK = 256
+
+# Case fields the priority score reads, with calculate_priority_score's defaults
+COMPONENTS = {
+    'paymentProbability': 50,
+    'amount': 0,
+    'overdueDays': 0,
+    'slaStatus': 'on_track'
+}
+
+
+class PriorityIndex:
+    """
+    Open cases sorted by priority score, highest first
+
+    Ties keep the order cases were first added, as prioritize_cases keeps
+    input order. Safe to share between request threads.
+    """
+
+    def __init__(self, prioritizer: Optional[CasePrioritizer] = None, today=None):
+        self.prioritizer = prioritizer or CasePrioritizer()
+        self.today = _day(today)
+
+        self._cases: Dict[Any, Dict[str, Any]] = {}
+        self._ids: Dict[int, Any] = {}
+        # Sorted (-score, seq) keys; seq is the case's arrival number
+        self._order: List[tuple] = []
+        # (day, seq) of upcoming bucket crossings; stale entries are skipped
+        self._crossings: List[tuple] = []
+        self._seq = count()
+        self._lock = threading.RLock()
+
+    @classmethod
+    def from_cases(cls, cases: Iterable[Dict[str, Any]], today=None, id_field: str = 'id',
+                   prioritizer: Optional[CasePrioritizer] = None) -> 'PriorityIndex':
+        """
+        Build an index over a portfolio with one sort instead of one insert per case
+
+        Later entries for the same id update earlier ones, as upsert does.
+        Raises ValueError if any case's features are invalid.
+        """
+        merged = {}
+        for case in cases:
+            merged[case[id_field]] = {**merged.get(case[id_field], {}), **case}
+        index = cls(prioritizer, today)
+        for case_id, case in merged.items():
+            _validate(case_id, case)
+            index._add(case_id, case)
+        index._order.sort()
+        return index
+
+    def __len__(self) -> int:
+        return len(self._cases)
+
+    def __contains__(self, case_id) -> bool:
+        return case_id in self._cases
+
+    def upsert(self, case_id, **features):
+        """
+        Add a case or update some of its features
+
+        Features are paymentProbability, amount, overdueDays (as of today)
+        and slaStatus. Features not given keep their current values, or the
+        scoring defaults for a new case.
+
+        Raises ValueError, leaving the index unchanged, if a feature is invalid.
+        """
+        with self._lock:
+            if case_id in self._cases:
+                features = {**self._features(self._cases[case_id]), **features}
+                _validate(case_id, features)
+                self._remove(case_id)
+            else:
+                _validate(case_id, features)
+            self._add(case_id, features, insert=True)
+
+    def upsert_many(self, cases: Iterable[Dict[str, Any]], id_field: str = 'id'):
+        """upsert several cases; if any is invalid, none are applied"""
+        with self._lock:
+            merged = {}
+            for case in cases:
+                case_id = case[id_field]
+                base = merged.get(case_id) or (self._features(self._cases[case_id]) if case_id in self._cases else {})
+                merged[case_id] = {**base, **{name: case[name] for name in COMPONENTS if name in case}}
+            for case_id, features in merged.items():
+                _validate(case_id, features)
+            for case_id, features in merged.items():
+                self.upsert(case_id, **features)
+
+    def set_sla_status(self, case_id, sla_status: str):
+        self.upsert(case_id, slaStatus=sla_status)
+
+    def close(self, case_id) -> bool:
+        """Drop a closed case (False if it wasn't in the index)"""
+        with self._lock:
+            if case_id not in self._cases:
+                return False
+            self._remove(case_id)
+            record = self._cases.pop(case_id)
+            del self._ids[record['seq']]
+            return True
+
+    def tick(self, today=None) -> int:
+        """
+        Move the index to today (default: the next day)
+
+        Only cases whose overdue days crossed a bucket edge since the last
+        tick are re-scored. Returns how many were.
+        """
+        with self._lock:
+            today = self.today + 1 if today is None else _day(today)
+            if today < self.today:
+                raise ValueError(f"Cannot move the index back from day {self.today} to {today}")
+            self.today = today
+
+            crossed = set()
+            while self._crossings and self._crossings[0][0] <= today:
+                day, seq = heapq.heappop(self._crossings)
+                case_id = self._ids.get(seq)
+                if case_id is not None and self._cases[case_id]['crossing'] == day:
+                    crossed.add(case_id)
+            if len(crossed) <= BULK_RERANK:
+                for case_id in crossed:
+                    self._remove(case_id)
+                    insort(self._order, self._rescore(self._cases[case_id]))
+            else:
+                stale = [self._cases[case_id]['key'] for case_id in crossed]
+                fresh = [self._rescore(self._cases[case_id]) for case_id in crossed]
+                self._replace_keys(stale, fresh)
+            return len(crossed)
+
+    def top(self, k: int = 1) -> List[Dict[str, Any]]:
+        """The k highest-priority cases as {id, priorityScore, priorityLevel}"""
+        with self._lock:
+            return [self._result(self._ids[seq], -score) for score, seq in self._order[:k]]
+
+    def next_best(self) -> Optional[Dict[str, Any]]:
+        """The highest-priority open case, None if there are none"""
+        with self._lock:
+            return self._result(self._ids[self._order[0][1]], -self._order[0][0]) if self._order else None
+
+    def rank(self, case_id) -> int:
+        """0-based position of a case in the priority order"""
+        with self._lock:
+            return bisect_left(self._order, self._cases[case_id]['key'])
+
+    def get(self, case_id) -> Dict[str, Any]:
+        """A case's current features, priority score and level"""
+        with self._lock:
+            record = self._cases[case_id]
+            return {**self._features(record), **self._result(case_id, -record['key'][0])}
+
+    def _add(self, case_id, features: Dict[str, Any], insert: bool = False):
+        existing = self._cases.get(case_id)
+        if existing is not None:
+            seq = existing['seq']
+        else:
+            seq = next(self._seq)
+            self._ids[seq] = case_id
+
+        record = {name: features.get(name, default) for name, default in COMPONENTS.items()}
+        # Overdue days are stored as the day the case became overdue, so
+        # they stay current without updates
+        record['overdueSince'] = self.today - int(record.pop('overdueDays'))
+        record['seq'] = seq
+        self._cases[case_id] = record
+        key = self._rescore(record)
+        if insert:
+            insort(self._order, key)
+        else:
+            # Caller sorts once afterwards
+            self._order.append(key)
+
+    def _rescore(self, record: Dict[str, Any]) -> tuple:
+        """Score a case as of today and schedule its next crossing; returns its new order key"""
+        score = self.prioritizer.calculate_priority_score(self._features(record))
+        record['key'] = (-score, record['seq'])
+        record['crossing'] = _next_crossing(self.today - record['overdueSince'], record['overdueSince'])
+        if record['crossing'] is not None:
+            heapq.heappush(self._crossings, (record['crossing'], record['seq']))
+        return record['key']
+
+    def _replace_keys(self, stale: List[tuple], fresh: List[tuple]):
+        """
+        Swap many keys in the order at once
+
+        Positions come from binary searches and the order is rebuilt from
+        slices, so only the changed keys are compared. When a large share
+        of the portfolio changes (a jump of several days), a full sort is
+        cheaper.
+        """
+        if len(fresh) * 8 > len(self._order):
+            stale = set(stale)
+            self._order = [key for key in self._order if key not in stale] + fresh
+            self._order.sort()
+            return
+
+        kept, start = [], 0
+        for position in sorted(bisect_left(self._order, key) for key in stale):
+            kept += self._order[start:position]
+            start = position + 1
+        kept += self._order[start:]
+
+        merged, start = [], 0
+        for key in sorted(fresh):
+            position = bisect_left(kept, key, start)
+            merged += kept[start:position]
+            merged.append(key)
+            start = position
+        merged += kept[start:]
+        self._order = merged
+
+    def _remove(self, case_id):
+        # The crossing entry is left in the heap; tick() skips it as stale
+        del self._order[bisect_left(self._order, self._cases[case_id]['key'])]
+
+    def _features(self, record: Dict[str, Any]) -> Dict[str, Any]:
+        return {
+            'paymentProbability': record['paymentProbability'],
+            'amount': record['amount'],
+            'overdueDays': self.today - record['overdueSince'],
+            'slaStatus': record['slaStatus']
+        }
+
+    def _result(self, case_id, priority_score: float) -> Dict[str, Any]:
+        return {
+            'id': case_id,
+            'priorityScore': priority_score,
+            'priorityLevel': self.prioritizer._priority_level(priority_score)
+        }
+
+
+def _validate(case_id, features: Dict[str, Any]):
+    """Raise ValueError unless the scored features have usable types"""
+    for name in ('paymentProbability', 'amount', 'overdueDays'):
+        value = features.get(name, COMPONENTS[name])
+        if isinstance(value, bool) or not isinstance(value, (int, float)) or not math.isfinite(value):
+            raise ValueError(f"Case {case_id}: {name} must be a number, got {value!r}")
+    if features.get('overdueDays', 0) != int(features.get('overdueDays', 0)):
+        raise ValueError(f"Case {case_id}: overdueDays must be whole days")
+    if not isinstance(features.get('slaStatus', COMPONENTS['slaStatus']), str):
+        raise ValueError(f"Case {case_id}: slaStatus must be a string")
+
+
+def _next_crossing(overdue_days: int, overdue_since: int) -> Optional[int]:
+    """Day the case next enters another overdue bucket (None after the last)"""
+    for step in OVERDUE_STEPS:
+        if overdue_days < step:
+            return overdue_since + step
+    return None
+
+
+def _day(value) -> int:
+    if value is None:
+        return date.today().toordinal()
+    if isinstance(value, datetime):
+        return value.date().toordinal()
+    if isinstance(value, date):
+        return value.toordinal()
+    return int(value)
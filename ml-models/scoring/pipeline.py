@@ -0,0 +1,87 @@
+"""
+Full Scoring Pipeline
+Payment prediction, risk assessment, priority and DCA assignment in one pass
+
+The backend used to chain /predict, /score-risk, /prioritize and
+/recommend-dca, sending each stage's output back through JSON to feed the
+next. Here the cases are parsed into columns once and every stage reads
+the same arrays: the predicted payment probability goes straight into the
+risk and priority columns, and the priority scores into the DCA assignment.
+"""
+
+import numpy as np
+
+from prediction.predict import FEATURE_NAMES
+from scoring.risk_engine import decode_risk_factors
+
+# Case fields read after prediction, with the engines' defaults
+EXTRA_COLUMNS = {
+    'historicalDefaults': 0,
+    'slaStatus': 'on_track'
+}
+
+
+def case_columns(cases):
+    """
+    Parse feature dicts into columns once
+
+    The prediction features are required, as for predict_many; the
+    columns are views of the one feature matrix the model scores.
+
+    Returns:
+        (X, columns): N x 4 matrix in FEATURE_NAMES order and a dict of columns
+    """
+    X = np.array([[case[name] for name in FEATURE_NAMES] for case in cases], dtype=float)
+    X = X.reshape(-1, len(FEATURE_NAMES))
+    columns = {name: X[:, i] for i, name in enumerate(FEATURE_NAMES)}
+    for name, default in EXTRA_COLUMNS.items():
+        columns[name] = [case.get(name, default) for case in cases]
+    return X, columns
+
+
+def score_full(cases, predictor, risk_engine, prioritizer, available_dcas=None, id_field='id'):
+    """
+    Score a batch of cases through every engine
+
+    Same results as predict_many, then get_risk_assessment and
+    calculate_priority_score with the predicted paymentProbability, then
+    assign_dcas.
+
+    Args:
+        cases: list of feature dicts (overdueDays, amount, historicalPayments,
+               contactFrequency, optionally historicalDefaults and slaStatus)
+        predictor: PaymentPredictor
+        risk_engine: RiskEngine
+        prioritizer: CasePrioritizer
+        available_dcas: DCAs to assign the batch to (None: no assignment)
+        id_field: case key reported as case_id in assignments
+
+    Returns:
+        dict of parallel lists (paymentProbability, confidence, riskScore,
+        riskLevel, riskFactors, priorityScore, priorityLevel) and, with
+        available_dcas, the assign_dcas result as assignment
+    """
+    X, columns = case_columns(cases)
+    prediction = predictor.predict_many(X)
+    columns['paymentProbability'] = np.asarray(prediction['paymentProbability'], dtype=float)
+
+    risk = risk_engine.get_risk_assessment_many(columns)
+    priority_scores = prioritizer.calculate_priority_scores(columns)
+
+    result = {
+        'count': len(cases),
+        'paymentProbability': prediction['paymentProbability'],
+        'confidence': prediction['confidence'],
+        'riskScore': risk['riskScore'].tolist(),
+        'riskLevel': risk['riskLevel'].tolist(),
+        'riskFactors': decode_risk_factors(risk['riskFactorCodes']),
+        'priorityScore': priority_scores.tolist(),
+        'priorityLevel': np.select(
+            [priority_scores >= 75, priority_scores >= 50], ['high', 'medium'], 'low'
+        ).tolist()
+    }
+    if available_dcas:
+        result['assignment'] = prioritizer.assign_dcas(
+            cases, available_dcas, id_field=id_field, priority_scores=priority_scores
+        )
+    return result
@@ -1,3 +1,35 @@
+# Risk factors in bit order: get_risk_assessment_many returns each case's
+# factors as a bitmask code, bit i set when RISK_FACTORS[i] applies
+RISK_FACTORS = [
+    'Long overdue period',
+    'High outstanding amount',
+    'Limited payment history',
+    'No contact attempts'
+]
+
+# Column defaults, as the .get() calls in calculate_risk_score/get_risk_assessment
+RISK_COLUMNS = {
+    'paymentProbability': 50,
+    'overdueDays': 0,
+    'amount': 0,
+    'historicalDefaults': 0,
+    'historicalPayments': 0,
+    'contactFrequency': 0
+}
+
+# Factor lists for every possible code, shared by decode_risk_factors
+_FACTOR_TABLE = [
+    [name for bit, name in enumerate(RISK_FACTORS) if code >> bit & 1]
+    for code in range(1 << len(RISK_FACTORS))
+]
+
+
+def decode_risk_factors(codes):
+    """Bitmask codes (array or list) -> lists of risk factor strings, as get_risk_assessment"""
+    codes = codes.tolist() if hasattr(codes, 'tolist') else codes
+    return [list(_FACTOR_TABLE[code]) for code in codes]
+
+
 class RiskEngine:
     def __init__(self):
         self.risk_thresholds = {
@@ -75,3 +107,63 @@ class RiskEngine:
             'riskLevel': risk_level,
             'riskFactors': risk_factors
         }
+    
+    def get_risk_assessment_many(self, columns, decode=False):
+        """
+        Columnar get_risk_assessment for a whole portfolio
+        
+        Scores, levels and factors are computed with array operations - no
+        per-case dicts or factor lists unless decode is set.
+        
+        Args:
+            columns: dict of equal-length arrays keyed like the features
+                     get_risk_assessment reads (see RISK_COLUMNS); missing
+                     columns take the same defaults
+            decode: also return riskFactors as lists of strings
+        
+        Returns:
+            dict of arrays: riskScore, riskLevel, riskFactorCodes (uint8
+            bitmask over RISK_FACTORS) and, with decode, riskFactors
+        """
+        # numpy is only needed for batches - keeps the engine light to import
+        import numpy as np
+        from utils import round2
+        
+        n = max((len(values) for values in columns.values()), default=0)
+        values = {
+            name: np.asarray(columns[name], dtype=float) if name in columns else np.full(n, float(default))
+            for name, default in RISK_COLUMNS.items()
+        }
+        overdue_days = values['overdueDays']
+        amount = values['amount']
+        
+        # Same additions, in the same order, as calculate_risk_score
+        base_risk = 100 - values['paymentProbability']
+        base_risk = base_risk + np.select(
+            [overdue_days > 120, overdue_days > 90, overdue_days > 60], [15, 10, 5], 0
+        )
+        base_risk = base_risk + np.select([amount > 15000, amount > 10000], [10, 5], 0)
+        base_risk = base_risk + values['historicalDefaults'] * 10
+        risk_score = np.clip(base_risk, 0, 100)
+        
+        risk_level = np.where(
+            risk_score >= self.risk_thresholds['high'], 'high',
+            np.where(risk_score >= self.risk_thresholds['medium'], 'medium', 'low')
+        )
+        
+        codes = (
+            (overdue_days > 90).astype(np.uint8)
+            | (amount > 10000).astype(np.uint8) << 1
+            | (values['historicalPayments'] < 2).astype(np.uint8) << 2
+            | (values['contactFrequency'] == 0).astype(np.uint8) << 3
+        )
+        
+        result = {
+            'riskScore': round2(risk_score),
+            'riskLevel': risk_level,
+            'riskFactorCodes': codes
+        }
+        if decode:
+            result['riskFactors'] = decode_risk_factors(codes)
+        return result
+
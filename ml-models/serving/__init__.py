@@ -0,0 +1,31 @@
+"""
+ML API serving infrastructure
+
+Components:
+- cache: Bounded LRU/TTL prediction cache with single-flight deduplication
+- asgi: ASGI bridge running the Flask app on a bounded thread/process pool
+- coalescer: Adaptive micro-batching of concurrent single-row requests
+- readiness: Background model loading, warm-up and readiness reporting
+
+Components are imported on first use, so the WSGI app doesn't pay for
+asyncio and the ASGI bridge doesn't pay for the cache.
+"""
+
+import importlib
+
+_EXPORTS = {
+    'PredictionCache': '.cache',
+    'feature_key': '.cache',
+    'FeatureError': '.cache',
+    'ASGIBridge': '.asgi',
+    'MicroBatcher': '.coalescer',
+    'BackgroundLoader': '.readiness'
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    if name not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    return getattr(importlib.import_module(_EXPORTS[name], __name__), name)
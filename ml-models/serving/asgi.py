@@ -0,0 +1,229 @@
+"""
+ASGI Bridge
+Serves the Flask (WSGI) app from an async server with scoring off the event loop
+"""
+
+import asyncio
+import importlib
+import io
+import sys
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple
+
+# WSGI app loaded in each process-pool worker (see _init_worker)
+_worker_app = None
+
+
+def _load_app(target: str):
+    """Import 'module:attribute'"""
+    module_name, _, attribute = target.partition(':')
+    return getattr(importlib.import_module(module_name), attribute or 'app')
+
+
+def _init_worker(target: str):
+    global _worker_app
+    _worker_app = _load_app(target)
+
+
+def _call_in_worker(request: Dict[str, Any]) -> Tuple[int, List[Tuple[str, str]], bytes]:
+    return call_wsgi(_worker_app, request)
+
+
+def call_wsgi(wsgi_app, request: Dict[str, Any]) -> Tuple[int, List[Tuple[str, str]], bytes]:
+    """
+    Run one buffered request through a WSGI app
+
+    Args:
+        wsgi_app: WSGI callable
+        request: plain dict built from the ASGI scope (picklable, so it can
+                 cross into a process pool)
+
+    Returns:
+        (status code, headers, body)
+    """
+    body = request['body']
+    server_name, server_port = request['server'] or ('localhost', 80)
+
+    environ = {
+        'REQUEST_METHOD': request['method'],
+        'SCRIPT_NAME': request['root_path'],
+        'PATH_INFO': request['path'],
+        'QUERY_STRING': request['query_string'],
+        'SERVER_NAME': server_name,
+        'SERVER_PORT': str(server_port),
+        'SERVER_PROTOCOL': f"HTTP/{request['http_version']}",
+        'REMOTE_ADDR': request['client'][0] if request['client'] else '',
+        'CONTENT_LENGTH': str(len(body)),
+        'wsgi.version': (1, 0),
+        'wsgi.url_scheme': request['scheme'],
+        'wsgi.input': io.BytesIO(body),
+        'wsgi.errors': sys.stderr,
+        'wsgi.multithread': request.get('multithread', True),
+        'wsgi.multiprocess': request.get('multiprocess', True),
+        'wsgi.run_once': False
+    }
+    for name, value in request['headers']:
+        key = name.upper().replace('-', '_')
+        if key == 'CONTENT_TYPE':
+            environ['CONTENT_TYPE'] = value
+        elif key != 'CONTENT_LENGTH':
+            key = f"HTTP_{key}"
+            environ[key] = f"{environ[key]},{value}" if key in environ else value
+
+    response = {}
+
+    def start_response(status, headers, exc_info=None):
+        response['status'] = int(status.split(' ', 1)[0])
+        response['headers'] = headers
+
+    result = wsgi_app(environ, start_response)
+    try:
+        payload = b''.join(result)
+    finally:
+        if hasattr(result, 'close'):
+            result.close()
+
+    return response['status'], response['headers'], payload
+
+
+class ASGIBridge:
+    """
+    ASGI application that runs a WSGI app on a bounded executor
+
+    Requests are buffered, handed to a thread or process pool and the
+    buffered response is written back. At most max_concurrency requests run
+    at once; up to max_queue more wait for a slot and anything beyond that
+    is rejected with 503 so callers fall back quickly instead of timing out.
+    """
+
+    def __init__(
+        self,
+        wsgi_app=None,
+        app_target: Optional[str] = None,
+        executor: str = 'thread',
+        max_workers: int = 4,
+        max_concurrency: Optional[int] = None,
+        max_queue: Optional[int] = None
+    ):
+        if executor not in ('thread', 'process'):
+            raise ValueError(f"Unknown executor: {executor}")
+        if executor == 'process' and not app_target:
+            raise ValueError("Process executor needs app_target ('module:attribute')")
+
+        self.wsgi_app = wsgi_app if wsgi_app is not None else _load_app(app_target)
+        self.app_target = app_target
+        self.executor_kind = executor
+        self.max_workers = max_workers
+        self.max_concurrency = max_concurrency or max_workers
+        self.max_queue = max_queue
+
+        self._executor = None
+        self._semaphore = None
+        self._waiting = 0
+
+    def start(self):
+        if self._executor is not None:
+            return
+        if self.executor_kind == 'process':
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                initializer=_init_worker,
+                initargs=(self.app_target,)
+            )
+        else:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.max_workers,
+                thread_name_prefix='ml-score'
+            )
+        self._semaphore = asyncio.Semaphore(self.max_concurrency)
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'lifespan':
+            await self._lifespan(receive, send)
+            return
+        if scope['type'] != 'http':
+            raise RuntimeError(f"Unsupported ASGI scope type: {scope['type']}")
+
+        self.start()
+        request = await self._read_request(scope, receive)
+
+        if self.max_queue is not None and self._semaphore.locked() and self._waiting >= self.max_queue:
+            await self._send(send, 503, [('Content-Type', 'application/json')],
+                             b'{"error": "ML API overloaded, retry later"}')
+            return
+
+        self._waiting += 1
+        try:
+            await self._semaphore.acquire()
+        finally:
+            self._waiting -= 1
+
+        try:
+            loop = asyncio.get_running_loop()
+            if self.executor_kind == 'process':
+                status, headers, body = await loop.run_in_executor(self._executor, _call_in_worker, request)
+            else:
+                status, headers, body = await loop.run_in_executor(self._executor, call_wsgi, self.wsgi_app, request)
+        finally:
+            self._semaphore.release()
+
+        await self._send(send, status, headers, body)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            'executor': self.executor_kind,
+            'max_workers': self.max_workers,
+            'max_concurrency': self.max_concurrency,
+            'max_queue': self.max_queue,
+            'waiting': self._waiting
+        }
+
+    async def _lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                self.start()
+                await send({'type': 'lifespan.startup.complete'})
+            elif message['type'] == 'lifespan.shutdown':
+                self.shutdown()
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
+
+    async def _read_request(self, scope, receive) -> Dict[str, Any]:
+        chunks = []
+        while True:
+            message = await receive()
+            chunks.append(message.get('body', b''))
+            if not message.get('more_body', False):
+                break
+
+        return {
+            'method': scope['method'],
+            'scheme': scope.get('scheme', 'http'),
+            'http_version': scope.get('http_version', '1.1'),
+            'root_path': scope.get('root_path', ''),
+            'path': scope['path'],
+            'query_string': scope.get('query_string', b'').decode('latin-1'),
+            'headers': [(name.decode('latin-1'), value.decode('latin-1')) for name, value in scope['headers']],
+            'server': scope.get('server'),
+            'client': scope.get('client'),
+            'body': b''.join(chunks),
+            # Whether this process serves other requests at the same time
+            # (a process pool worker runs one at a time), and whether other
+            # processes serve the app's requests too
+            'multithread': self.executor_kind == 'thread' and self.max_workers > 1,
+            'multiprocess': self.executor_kind == 'process' and self.max_workers > 1
+        }
+
+    async def _send(self, send, status, headers, body):
+        await send({
+            'type': 'http.response.start',
+            'status': status,
+            'headers': [(name.lower().encode('latin-1'), value.encode('latin-1')) for name, value in headers]
+        })
+        await send({'type': 'http.response.body', 'body': body})
@@ -0,0 +1,220 @@
+"""
+Prediction Cache
+Bounded LRU/TTL cache for scoring results with single-flight deduplication
+"""
+
+import sys
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Iterable, Optional, Tuple
+
+
+class FeatureError(ValueError):
+    """Request features that can't be scored (or cached): not an object, or a field of the wrong type"""
+
+
+def feature_key(features: Dict[str, Any], fields: Iterable[Tuple[str, Any]]) -> tuple:
+    """
+    Normalize a feature dict into a hashable cache key
+
+    Args:
+        features: request payload
+        fields: (name, default) pairs, in key order. A default of KeyError
+                means the field is required and a missing value raises,
+                exactly as the engine itself would.
+
+    Returns:
+        tuple of normalized values (numbers as float, so 45 and 45.0 share a key)
+
+    Raises:
+        FeatureError: features isn't a dict, or a field has the wrong type
+                      (lists, objects, null; text for a numeric field)
+    """
+    if not isinstance(features, dict):
+        raise FeatureError(f"Expected an object of features, got {type(features).__name__}")
+    key = []
+    for name, default in fields:
+        if default is KeyError:
+            value = features[name]
+        else:
+            value = features.get(name, default)
+        # Fields with a string default (slaStatus) are strings, all others numbers
+        if isinstance(default, str):
+            if not isinstance(value, str):
+                raise FeatureError(f"{name} must be a string, got {type(value).__name__}")
+        elif isinstance(value, (int, float)):
+            value = float(value)
+        else:
+            raise FeatureError(f"{name} must be a number, got {type(value).__name__}")
+        key.append(value)
+    return tuple(key)
+
+
+def _estimate_size(obj: Any) -> int:
+    """Approximate deep size in bytes of a JSON-like result"""
+    size = sys.getsizeof(obj)
+    if isinstance(obj, dict):
+        size += sum(_estimate_size(k) + _estimate_size(v) for k, v in obj.items())
+    elif isinstance(obj, (list, tuple)):
+        size += sum(_estimate_size(item) for item in obj)
+    return size
+
+
+class _Flight:
+    """A computation in progress that concurrent callers can wait on"""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+        self.version = None
+
+
+class PredictionCache:
+    """
+    Thread-safe LRU cache bounded by entry count and estimated bytes
+
+    Entries expire after ttl_seconds. When a version function is given, the
+    cache is cleared as soon as the version it returns changes (e.g. a new
+    model was loaded). Concurrent misses on the same key are collapsed into
+    one computation; the other callers wait for its result.
+
+    Cached values are shared between callers and must be treated as read-only.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        max_entries: int = 100_000,
+        max_bytes: int = 64 * 1024 * 1024,
+        ttl_seconds: float = 300.0,
+        version: Optional[Callable[[], Any]] = None
+    ):
+        self.name = name
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self._version_fn = version
+        self._version = version() if version else None
+
+        self._lock = threading.Lock()
+        self._entries: 'OrderedDict[Hashable, Tuple[Any, float, int]]' = OrderedDict()
+        self._inflight: Dict[Hashable, _Flight] = {}
+        self._bytes = 0
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.coalesced = 0
+        self.invalidations = 0
+
+    def get_or_compute(self, key: Hashable, compute: Callable[[], Any]) -> Any:
+        """
+        Return the cached value for key, computing (once) on a miss
+
+        Exceptions raised by compute are propagated to every waiting caller
+        and nothing is cached.
+        """
+        with self._lock:
+            self._check_version()
+
+            entry = self._entries.get(key)
+            if entry is not None:
+                value, expires_at, _ = entry
+                if expires_at > time.monotonic():
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return value
+                self._remove(key)
+                self.expirations += 1
+
+            flight = self._inflight.get(key)
+            if flight is not None:
+                self.coalesced += 1
+                leader = False
+            else:
+                flight = _Flight()
+                flight.version = self._version
+                self._inflight[key] = flight
+                self.misses += 1
+                leader = True
+
+        if not leader:
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.result
+
+        try:
+            flight.result = compute()
+        except Exception as e:
+            flight.error = e
+            raise
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+                # Don't let a result computed by a replaced model into the new cache
+                if flight.error is None and flight.version == self._version:
+                    self._store(key, flight.result)
+            flight.done.set()
+
+        return flight.result
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses + self.coalesced
+            return {
+                'name': self.name,
+                'version': self._version,
+                'entries': len(self._entries),
+                'bytes': self._bytes,
+                'max_entries': self.max_entries,
+                'max_bytes': self.max_bytes,
+                'ttl_seconds': self.ttl_seconds,
+                'hits': self.hits,
+                'misses': self.misses,
+                'coalesced': self.coalesced,
+                'evictions': self.evictions,
+                'expirations': self.expirations,
+                'invalidations': self.invalidations,
+                'hit_rate': round(self.hits / lookups, 4) if lookups else 0.0
+            }
+
+    # Internal helpers - callers hold self._lock
+
+    def _check_version(self):
+        if self._version_fn is None:
+            return
+        version = self._version_fn()
+        if version != self._version:
+            self._entries.clear()
+            self._bytes = 0
+            self._version = version
+            self.invalidations += 1
+
+    def _store(self, key, value):
+        size = _estimate_size(key) + _estimate_size(value)
+        if size > self.max_bytes:
+            return
+
+        if key in self._entries:
+            self._remove(key)
+
+        self._entries[key] = (value, time.monotonic() + self.ttl_seconds, size)
+        self._bytes += size
+
+        while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+            oldest = next(iter(self._entries))
+            self._remove(oldest)
+            self.evictions += 1
+
+    def _remove(self, key):
+        _, _, size = self._entries.pop(key)
+        self._bytes -= size
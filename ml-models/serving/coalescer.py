@@ -0,0 +1,161 @@
+"""
+Request Coalescer
+Adaptive micro-batching of concurrent single-row scoring requests
+"""
+
+import os
+import queue
+import threading
+import time
+from bisect import bisect_left
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, List, Optional
+
+BATCH_SIZE_BUCKETS = [1, 2, 4, 8, 16, 32, 64, 128, 256]
+QUEUE_DELAY_BUCKETS_MS = [0.1, 0.5, 1, 2, 5, 10, 25, 50, 100]
+
+
+def _histogram(buckets):
+    return [0] * (len(buckets) + 1)
+
+
+def _bucket_labels(buckets, unit=''):
+    return [f"<={b}{unit}" for b in buckets] + [f">{buckets[-1]}{unit}"]
+
+
+class MicroBatcher:
+    """
+    Collects concurrent submit() calls into batches for one vectorized call
+
+    A background thread takes the first waiting request, then keeps
+    collecting until max_batch_size requests are gathered or max_wait_ms has
+    passed since the first one arrived. The window is adaptive: when the
+    previous batch held a single request and nothing else is queued (light
+    load), the request is dispatched immediately and pays no added latency.
+
+    batch_fn receives a list of items and must return a list of results in
+    the same order. If a batch fails, its items are retried one by one so a
+    single bad request only fails its own caller.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        batch_fn: Callable[[List[Any]], List[Any]],
+        max_batch_size: int = 64,
+        max_wait_ms: float = 2.0
+    ):
+        self.name = name
+        self.batch_fn = batch_fn
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+
+        self._lock = threading.Lock()
+        self._queue = None
+        self._pid = None
+        self._last_batch_size = 1
+
+        self._batches = 0
+        self._items = 0
+        self._failed_batches = 0
+        self._batch_sizes = _histogram(BATCH_SIZE_BUCKETS)
+        self._queue_delays = _histogram(QUEUE_DELAY_BUCKETS_MS)
+        self._delay_total_ms = 0.0
+        self._delay_max_ms = 0.0
+
+    def submit(self, item: Any, timeout: Optional[float] = None) -> Any:
+        """Score one item as part of the next batch; blocks for the result"""
+        self._ensure_worker()
+        future = Future()
+        self._queue.put((item, future, time.perf_counter()))
+        return future.result(timeout)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                'name': self.name,
+                'max_batch_size': self.max_batch_size,
+                'max_wait_ms': self.max_wait * 1000,
+                'batches': self._batches,
+                'items': self._items,
+                'failed_batches': self._failed_batches,
+                'mean_batch_size': round(self._items / self._batches, 2) if self._batches else 0.0,
+                'batch_size_histogram': dict(zip(_bucket_labels(BATCH_SIZE_BUCKETS), self._batch_sizes)),
+                'queue_delay_ms': {
+                    'mean': round(self._delay_total_ms / self._items, 4) if self._items else 0.0,
+                    'max': round(self._delay_max_ms, 4),
+                    'histogram': dict(zip(_bucket_labels(QUEUE_DELAY_BUCKETS_MS, 'ms'), self._queue_delays))
+                }
+            }
+
+    def _ensure_worker(self):
+        # Threads don't survive fork - (re)start the worker in each process
+        if self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+            self._queue = queue.Queue()
+            thread = threading.Thread(target=self._run, name=f"coalescer-{self.name}", daemon=True)
+            thread.start()
+            self._pid = os.getpid()
+
+    def _run(self):
+        pending = self._queue
+        while True:
+            first = pending.get()
+            batch = [first]
+            deadline = first[2] + self.max_wait
+            keep_waiting = self._last_batch_size > 1 or not pending.empty()
+
+            while len(batch) < self.max_batch_size:
+                try:
+                    batch.append(pending.get_nowait())
+                    continue
+                except queue.Empty:
+                    pass
+                remaining = deadline - time.perf_counter()
+                if not keep_waiting or remaining <= 0:
+                    break
+                try:
+                    batch.append(pending.get(timeout=remaining))
+                except queue.Empty:
+                    break
+
+            self._last_batch_size = len(batch)
+            self._dispatch(batch)
+
+    def _dispatch(self, batch):
+        started = time.perf_counter()
+        self._record(batch, started)
+
+        items = [item for item, _, _ in batch]
+        try:
+            results = self.batch_fn(items)
+        except Exception as e:
+            with self._lock:
+                self._failed_batches += 1
+            if len(batch) == 1:
+                batch[0][1].set_exception(e)
+                return
+            # Isolate the failing request(s)
+            for item, future, _ in batch:
+                try:
+                    future.set_result(self.batch_fn([item])[0])
+                except Exception as item_error:
+                    future.set_exception(item_error)
+            return
+
+        for (_, future, _), result in zip(batch, results):
+            future.set_result(result)
+
+    def _record(self, batch, dispatched_at):
+        with self._lock:
+            self._batches += 1
+            self._items += len(batch)
+            self._batch_sizes[bisect_left(BATCH_SIZE_BUCKETS, len(batch))] += 1
+            for _, _, enqueued_at in batch:
+                delay_ms = (dispatched_at - enqueued_at) * 1000
+                self._delay_total_ms += delay_ms
+                self._delay_max_ms = max(self._delay_max_ms, delay_ms)
+                self._queue_delays[bisect_left(QUEUE_DELAY_BUCKETS_MS, delay_ms)] += 1
@@ -0,0 +1,112 @@
+"""
+Background Loader
+Loads models off the import path and reports readiness
+"""
+
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, Optional
+
+
+class BackgroundLoader:
+    """
+    Runs load_fn, then warmup_fn(result), on a background thread
+
+    Importing the app stays fast; the first request that needs the models
+    blocks in get() until they are loaded and warmed up. ready tells a load
+    balancer or platform probe whether the instance can take traffic without
+    paying that wait.
+
+    Threads don't survive fork: a process forked mid-load restarts the load
+    itself, a process forked after it keeps the loaded result.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        load_fn: Callable[[], Any],
+        warmup_fn: Optional[Callable[[Any], None]] = None
+    ):
+        self.name = name
+        self.load_fn = load_fn
+        self.warmup_fn = warmup_fn
+
+        self._lock = threading.Lock()
+        self._pid = None
+        self._done = None
+        self._state = 'pending'
+        self._value = None
+        self._error = None
+        self.load_seconds = None
+        self.warmup_seconds = None
+
+    def start(self):
+        """Start loading in this process (no-op if already started or loaded)"""
+        if self._pid == os.getpid() or self._state in ('ready', 'failed'):
+            return
+        with self._lock:
+            if self._pid == os.getpid() or self._state in ('ready', 'failed'):
+                return
+            self._done = threading.Event()
+            self._state = 'loading'
+            thread = threading.Thread(target=self._run, name=f"loader-{self.name}", daemon=True)
+            thread.start()
+            self._pid = os.getpid()
+
+    def get(self, timeout: Optional[float] = None) -> Any:
+        """Return the loaded value, waiting for load and warm-up to finish"""
+        if self._state != 'ready':
+            self.start()
+            if not self._done.wait(timeout):
+                raise TimeoutError(f"{self.name} still loading after {timeout}s")
+        if self._error is not None:
+            raise self._error
+        return self._value
+
+    def replace(self, value: Any) -> Any:
+        """
+        Swap in a new value once loaded, returning the old one
+
+        A single reference assignment: callers that already hold the old
+        value (in-flight requests) finish with it, later get() calls see
+        the new one.
+        """
+        if self._state != 'ready':
+            raise RuntimeError(f"{self.name} is not loaded yet")
+        with self._lock:
+            old, self._value = self._value, value
+        return old
+
+    @property
+    def ready(self) -> bool:
+        return self._state == 'ready'
+
+    def status(self) -> Dict[str, Any]:
+        return {
+            'name': self.name,
+            'state': self._state,
+            'load_ms': round(self.load_seconds * 1000, 1) if self.load_seconds is not None else None,
+            'warmup_ms': round(self.warmup_seconds * 1000, 1) if self.warmup_seconds is not None else None,
+            'error': str(self._error) if self._error is not None else None
+        }
+
+    def _run(self):
+        try:
+            started = time.perf_counter()
+            value = self.load_fn()
+            self.load_seconds = time.perf_counter() - started
+
+            self._state = 'warming'
+            started = time.perf_counter()
+            if self.warmup_fn is not None:
+                self.warmup_fn(value)
+            self.warmup_seconds = time.perf_counter() - started
+
+            self._value = value
+            self._state = 'ready'
+        except Exception as e:
+            self._error = e
+            self._state = 'failed'
+        finally:
+            self._done.set()
@@ -0,0 +1,78 @@
+"""
+Shared fixtures for the ml-models tests
+
+    cd ml-models && python -m pytest tests
+
+Modules are imported the way the entry points import them: ml-models on
+sys.path, and training/ for the training scripts' sibling imports.
+"""
+
+import os
+import sys
+
+import pytest
+
+ML_MODELS = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, ML_MODELS)
+sys.path.insert(0, os.path.join(ML_MODELS, 'training'))
+
+
+@pytest.fixture
+def fallback_predictor():
+    """A PaymentPredictor with no model, scoring with the rule-based fallback"""
+    from prediction.predict import PaymentPredictor
+
+    predictor = PaymentPredictor.__new__(PaymentPredictor)
+    predictor.is_trained = False
+    return predictor
+
+
+@pytest.fixture(scope='session')
+def trained_model():
+    """(model, scaler) - a small forest on synthetic data"""
+    from sklearn.preprocessing import StandardScaler
+    from train_model import FEATURE_COLUMNS, generate_training_data, new_forest
+
+    data = generate_training_data(4000)
+    X = data[FEATURE_COLUMNS].to_numpy(dtype=float)
+    scaler = StandardScaler().fit(X)
+    model = new_forest(n_estimators=12, max_depth=6)
+    model.fit(scaler.transform(X), data['payment_class'])
+    return model, scaler
+
+
+@pytest.fixture(scope='session')
+def trained_artifact(trained_model, tmp_path_factory):
+    """Path of the compiled artifact of trained_model"""
+    from prediction.compiled_forest import CompiledForest
+
+    path = tmp_path_factory.mktemp('artifact') / 'payment_predictor'
+    CompiledForest.from_sklearn(*trained_model).save(str(path))
+    return str(path)
+
+
+@pytest.fixture(scope='session')
+def trained_predictor(trained_artifact):
+    from prediction.predict import PaymentPredictor
+
+    return PaymentPredictor(trained_artifact)
+
+
+@pytest.fixture(scope='session')
+def api(tmp_path_factory):
+    """
+    The api module, with an empty model directory (rule-based scoring),
+    no registry watcher and no seeded DCA roster
+    """
+    os.environ['MODEL_PATH'] = str(tmp_path_factory.mktemp('models'))
+    os.environ['ML_MODEL_RELOAD_INTERVAL'] = '0'
+    os.environ.pop('ML_DCA_ROSTER', None)
+    import api as api_module
+
+    api_module.models.get(timeout=120)
+    return api_module
+
+
+@pytest.fixture
+def client(api):
+    return api.app.test_client()
@@ -0,0 +1,161 @@
+"""
+Batch DCA assignment (CasePrioritizer.assign_dcas, /recommend-dca/batch)
+
+assign_dcas must find the highest-scoring assignment that fits every DCA's
+free capacity, scoring each case-DCA pair as recommend_dca_assignment does.
+The optimum is checked against scipy's assignment solver over one slot per
+free place.
+"""
+
+import random
+
+import numpy as np
+import pytest
+from scipy.optimize import linear_sum_assignment
+
+from recommendation.prioritizer import CasePrioritizer, _max_score_transport
+
+SPECIALIZATIONS = ['general', 'complex', 'high_value', 'collections']
+
+
+def random_dca(rng, dca_id):
+    max_load = rng.choice([5, 10, 20])
+    return {
+        'id': dca_id,
+        'name': f"Agency {dca_id}",
+        'success_rate': rng.randint(20, 95),
+        'current_load': rng.randint(0, max_load + 2),
+        'max_load': max_load,
+        'specialization': rng.choice(SPECIALIZATIONS)
+    }
+
+
+def random_case(rng, case_id):
+    return {
+        'id': case_id,
+        'paymentProbability': rng.randint(0, 100),
+        'amount': rng.randint(0, 30000),
+        'overdueDays': rng.randint(0, 200),
+        'slaStatus': rng.choice(['on_track', 'warning', 'breached'])
+    }
+
+
+def best_total(scores):
+    """Highest total of a maximum-cardinality assignment of rows to columns"""
+    if not scores.size:
+        return 0.0
+    rows, cols = linear_sum_assignment(scores, maximize=True)
+    return scores[rows, cols].sum()
+
+
+@pytest.mark.parametrize('seed', range(50))
+def test_transport_is_optimal(seed):
+    rng = np.random.default_rng(seed)
+    n_rows, n_cols = rng.integers(1, 4), rng.integers(1, 6)
+    scores = rng.integers(0, 100, (n_rows, n_cols)).astype(float) / rng.choice([1, 7])
+    supply = rng.integers(0, 8, n_rows)
+    capacity = rng.integers(0, 8, n_cols)
+
+    flow = _max_score_transport(scores, supply, capacity)
+
+    assert (flow >= 0).all()
+    assert (flow.sum(axis=1) <= supply).all()
+    assert (flow.sum(axis=0) <= capacity).all()
+    assert flow.sum() == min(supply.sum(), capacity.sum())
+    units = scores[np.repeat(np.arange(n_rows), supply)][:, np.repeat(np.arange(n_cols), capacity)]
+    assert (flow * scores).sum() == pytest.approx(best_total(units))
+
+
+@pytest.mark.parametrize('seed', range(30))
+def test_assign_dcas_is_optimal_within_capacity(seed):
+    rng = random.Random(seed)
+    prioritizer = CasePrioritizer()
+    dcas = [random_dca(rng, f"D{i}") for i in range(rng.randint(1, 6))]
+    cases = [random_case(rng, f"C{i}") for i in range(rng.randint(0, 60))]
+
+    result = prioritizer.assign_dcas(cases, dcas)
+
+    slots = [max(dca['max_load'] - dca['current_load'], 0) for dca in dcas]
+    assert [a['case_id'] for a in result['assignments']] == [case['id'] for case in cases]
+    assert result['unassigned'] == max(len(cases) - sum(slots), 0)
+    for dca, load, free in zip(dcas, result['dca_load'], slots):
+        assert load['assigned'] == sum(a['dca_id'] == dca['id'] for a in result['assignments'])
+        assert load['assigned'] <= free
+        assert load['current_load'] == dca['current_load'] + load['assigned']
+
+    by_id = {dca['id']: dca for dca in dcas}
+    for case, assignment in zip(cases, result['assignments']):
+        if assignment['dca_id'] is not None:
+            expected = prioritizer.recommend_dca_assignment(case, [by_id[assignment['dca_id']]])
+            assert assignment['match_score'] == expected['match_score']
+
+    pair_scores = np.array([
+        [prioritizer._dca_match(dca, prioritizer.calculate_priority_score(case))['score'] for dca in dcas]
+        for case in cases
+    ]).reshape(len(cases), len(dcas))
+    per_slot = pair_scores[:, np.repeat(np.arange(len(dcas)), slots)]
+    assert result['total_score'] == pytest.approx(best_total(per_slot), abs=0.01 * len(cases) + 0.01)
+
+
+def test_spreads_a_batch_over_capacity():
+    dcas = [
+        {'id': 'A', 'name': 'Apex', 'success_rate': 90, 'current_load': 0, 'max_load': 2},
+        {'id': 'B', 'name': 'Beta', 'success_rate': 40, 'current_load': 0, 'max_load': 2}
+    ]
+    cases = [{'id': i, 'amount': 1000 * i} for i in range(5)]
+
+    result = CasePrioritizer().assign_dcas(cases, dcas)
+
+    assert [load['assigned'] for load in result['dca_load']] == [2, 2]
+    assert result['unassigned'] == 1
+    # The lowest-priority case is the one left over
+    assert result['assignments'][0]['dca_id'] is None
+
+
+def test_no_dcas():
+    assert CasePrioritizer().assign_dcas([{'id': 1}], []) is None
+
+
+@pytest.fixture
+def roster(api):
+    api.dca_registry.upsert_many([
+        {'id': 'A', 'name': 'Apex', 'success_rate': 80, 'max_load': 3},
+        {'id': 'B', 'name': 'Beta', 'max_load': 2, 'specialization': 'complex'}
+    ])
+    yield api.dca_registry
+    for dca in api.dca_registry.dcas():
+        api.dca_registry.remove(dca['id'])
+
+
+def test_batch_route_with_available_dcas(client):
+    dcas = [{'id': 'X', 'name': 'X', 'max_load': 1}]
+    response = client.post('/recommend-dca/batch', json={'cases': [{'id': 1}, {'id': 2}], 'available_dcas': dcas})
+
+    assert response.status_code == 200
+    assert response.json['unassigned'] == 1
+
+
+def test_batch_route_counts_roster_loads(client, roster):
+    cases = [{'id': i, 'amount': 500 * i} for i in range(4)]
+
+    first = client.post('/recommend-dca/batch', json={'cases': cases})
+    assert first.status_code == 200
+    assert first.json['unassigned'] == 0
+    assert [dca['current_load'] for dca in roster.dcas()] == [load['current_load'] for load in first.json['dca_load']]
+
+    # One free place is left on the roster
+    second = client.post('/recommend-dca/batch', json={'cases': cases})
+    assert second.json['unassigned'] == 3
+    assert all(dca['current_load'] == dca['max_load'] for dca in roster.dcas())
+
+
+def test_batch_route_roster_needs_a_single_process(client, roster):
+    response = client.post('/recommend-dca/batch', json={'cases': [{'id': 1}]},
+                           environ_overrides={'wsgi.multiprocess': True})
+
+    assert response.status_code == 409
+    assert all(dca['current_load'] == 0 for dca in roster.dcas())
+
+
+def test_batch_route_without_dcas(client):
+    assert client.post('/recommend-dca/batch', json={'cases': [{'id': 1}]}).status_code == 400
@@ -0,0 +1,71 @@
+"""
+Batch input forms (prediction.predict)
+
+predict_many and predict_with_explanation_many take feature dicts, an
+N x 4 array, a dict of columns or a features.case_batch.CaseBatch. The
+same cases given in every form must give the dict form's results, on the
+trained model and on the rule-based fallback - including the explanation
+text, where whole counts read "45 days", not "45.0 days".
+"""
+
+import numpy as np
+import pytest
+
+from features.case_batch import CaseBatch
+from prediction.predict import FEATURE_NAMES
+
+
+def random_cases(n, seed=42):
+    rng = np.random.default_rng(seed)
+    return [
+        {
+            'overdueDays': int(rng.integers(0, 200)),
+            'amount': float(rng.uniform(0, 30000)),
+            'historicalPayments': int(rng.integers(0, 8)),
+            'contactFrequency': int(rng.integers(0, 6))
+        }
+        for _ in range(n)
+    ]
+
+
+CASES = random_cases(2000)
+X = np.array([[case[name] for name in FEATURE_NAMES] for case in CASES], dtype=float)
+FORMS = {
+    'array': lambda: X,
+    'columns': lambda: {name: X[:, i] for i, name in enumerate(FEATURE_NAMES)},
+    'CaseBatch': lambda: CaseBatch.from_dicts(CASES)
+}
+
+
+@pytest.fixture(params=['fallback', 'trained'])
+def predictor(request):
+    return request.getfixturevalue(f"{request.param}_predictor")
+
+
+@pytest.mark.parametrize('form', ['array', 'columns', 'CaseBatch'])
+def test_forms_match_dicts(predictor, form):
+    rows = FORMS[form]()
+    explain = list(range(0, len(CASES), 7))
+
+    assert predictor.predict_many(rows) == predictor.predict_many(CASES)
+    assert predictor.predict_with_explanation_many(rows, explain=explain) == \
+        predictor.predict_with_explanation_many(CASES, explain=explain)
+
+
+def test_whole_counts_render_as_ints(predictor):
+    case = {'overdueDays': 45, 'amount': 1200.5, 'historicalPayments': 2, 'contactFrequency': 1}
+    rows = np.array([[45.0, 1200.5, 2.0, 1.0]])
+
+    explanation = predictor.predict_with_explanation_many(rows)['explanations'][0]
+    assert explanation == predictor.predict_with_explanation(case)['explanation']
+    for factor in explanation['factors']:
+        assert type(factor['value']) is (float if factor['factor'] == 'Outstanding Amount' else int)
+    assert '45.0' not in str(explanation)
+
+
+def test_integer_array_predictions_match_int_dicts(fallback_predictor):
+    rows = X.astype(int)
+    cases = [{name: int(value) for name, value in zip(FEATURE_NAMES, row)} for row in rows]
+
+    assert fallback_predictor.predict_with_explanation_many(rows) == \
+        fallback_predictor.predict_with_explanation_many(cases)
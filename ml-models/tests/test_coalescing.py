@@ -0,0 +1,82 @@
+"""
+Request coalescing on /predict and /score-risk
+
+Concurrent requests on a threaded server are scored in shared batches with
+the same results as scoring each alone; requests from a single-threaded
+server (wsgi.multithread unset, as on gunicorn sync workers) bypass the
+batchers.
+"""
+
+import json
+import random
+import threading
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from werkzeug.serving import make_server
+
+
+def random_case(rng):
+    return {
+        'overdueDays': rng.randint(0, 200),
+        'amount': rng.randint(100, 50000),
+        'historicalPayments': rng.randint(0, 10),
+        'contactFrequency': rng.randint(0, 8),
+        'historicalDefaults': rng.randint(0, 3),
+        'paymentProbability': rng.randint(0, 100)
+    }
+
+
+def _post(url, body):
+    request = urllib.request.Request(url, json.dumps(body).encode(), {'Content-Type': 'application/json'})
+    with urllib.request.urlopen(request, timeout=30) as response:
+        return json.loads(response.read())
+
+
+def _items(api):
+    return {batcher.name: batcher.stats()['items'] for batcher in (api.predict_batcher, api.risk_batcher)}
+
+
+@pytest.fixture
+def server_url(api):
+    server = make_server('127.0.0.1', 0, api.app, threaded=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{server.server_port}"
+    server.shutdown()
+
+
+def test_concurrent_requests_share_batches(api, server_url):
+    rng = random.Random(8)
+    cases = [random_case(rng) for _ in range(300)]
+    before = _items(api)
+    batches_before = {b.name: b.stats()['batches'] for b in (api.predict_batcher, api.risk_batcher)}
+
+    with ThreadPoolExecutor(max_workers=32) as pool:
+        predicted = list(pool.map(lambda case: _post(f"{server_url}/predict", case), cases))
+        assessed = list(pool.map(lambda case: _post(f"{server_url}/score-risk", case), cases))
+
+    predictor = api.models.get().predictor
+    for case, prediction, risk in zip(cases, predicted, assessed):
+        expected = predictor.predict(case)
+        assert {name: prediction[name] for name in expected} == expected
+        assert risk == json.loads(json.dumps(api.risk_engine.get_risk_assessment(case)))
+
+    after = _items(api)
+    for batcher in (api.predict_batcher, api.risk_batcher):
+        items = after[batcher.name] - before[batcher.name]
+        batches = batcher.stats()['batches'] - batches_before[batcher.name]
+        # /predict assesses risk too, so the risk batcher also sees its rows
+        assert items >= len(cases)
+        assert batches < items, f"{batcher.name}: concurrent requests were never batched together"
+
+
+def test_single_threaded_requests_bypass_batchers(api, client):
+    rng = random.Random(9)
+    before = _items(api)
+    for case in (random_case(rng) for _ in range(20)):
+        assert client.post('/predict', json=case).status_code == 200
+        assert client.post('/score-risk', json=case).status_code == 200
+
+    assert _items(api) == before
+    assert client.get('/batching/stats').json['active'] is False
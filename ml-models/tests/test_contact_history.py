@@ -0,0 +1,116 @@
+"""
+Contact-history features (features.contact_history)
+
+build_features must agree with counting each case's events one by one:
+windowed contact counts per channel, days since the last contact, promise
+outcomes and payments, with only events at or before as_of counting.
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from compliance.compliance_engine import count_recent_contacts
+from features.contact_history import (
+    CHANNELS, PROMISE_STATUSES, SECONDS_PER_DAY, WINDOWS_DAYS,
+    build_features, compliance_context, predictor_features
+)
+
+AS_OF = 1_790_000_000
+
+
+def random_events(n, n_cases, seed=0):
+    rng = np.random.default_rng(seed)
+    event = rng.choice(['contact', 'escalation', 'promise', 'payment', 'Contact'], n)
+    return pd.DataFrame({
+        'case_id': rng.choice([f"C{i}" for i in range(n_cases)], n),
+        'timestamp': AS_OF - rng.integers(-5, 60, n) * SECONDS_PER_DAY + rng.integers(-3600, 3600, n),
+        'event': event,
+        'channel': np.where(np.char.lower(event.astype(str)) == 'contact', rng.choice(CHANNELS + ['fax', None], n), None),
+        'status': np.where(event == 'promise', rng.choice(PROMISE_STATUSES + [None], n), None)
+    })
+
+
+def reference(events, case_id, as_of):
+    """Features of one case, counted directly"""
+    seen = events[(events['case_id'] == case_id) & (events['timestamp'] <= as_of)].sort_values('timestamp', kind='stable')
+    kind = seen['event'].str.lower()
+    contacts = seen[kind == 'contact']
+    promises = seen[kind == 'promise']
+    features = {}
+    for days in WINDOWS_DAYS:
+        recent = contacts[contacts['timestamp'] > as_of - days * SECONDS_PER_DAY]
+        for name in CHANNELS:
+            features[f"contacts_{name}_{days}d"] = int((recent['channel'] == name).sum())
+        features[f"contacts_{days}d"] = len(recent)
+    features['contacts_total'] = len(contacts)
+    features['days_since_last_contact'] = (
+        (as_of - contacts['timestamp'].iloc[-1]) / SECONDS_PER_DAY if len(contacts) else np.nan
+    )
+    features['escalations'] = int((kind == 'escalation').sum())
+    for name in PROMISE_STATUSES:
+        features[f"promises_{name}"] = int((promises['status'] == name).sum())
+    features['last_promise_status'] = promises['status'].iloc[-1] if len(promises) else None
+    features['payments'] = int((kind == 'payment').sum())
+    return features
+
+
+def assert_matches_reference(features, events, case_ids, as_of):
+    for case_id, case_as_of in zip(case_ids, np.broadcast_to(as_of, (len(case_ids),))):
+        row = features.loc[case_id]
+        for name, expected in reference(events, case_id, case_as_of).items():
+            if isinstance(expected, float):
+                assert row[name] == pytest.approx(expected, nan_ok=True), (case_id, name)
+            else:
+                assert row[name] == expected, (case_id, name)
+
+
+@pytest.mark.parametrize('seed', range(5))
+def test_matches_per_case_counts(seed):
+    events = random_events(3000, 200, seed)
+    features = build_features(events, as_of=AS_OF)
+
+    assert sorted(features.index) == sorted(events['case_id'].unique())
+    assert_matches_reference(features, events, features.index, AS_OF)
+
+
+def test_per_case_as_of_and_cases_without_events():
+    events = random_events(2000, 50, seed=7)
+    case_ids = np.array([f"C{i}" for i in range(60)])
+    as_of = AS_OF - np.random.default_rng(1).integers(0, 40, len(case_ids)) * SECONDS_PER_DAY
+    features = build_features(events, case_ids=case_ids, as_of=as_of)
+
+    assert list(features.index) == list(case_ids)
+    assert_matches_reference(features, events, case_ids, as_of)
+    assert features.loc['C55', 'contacts_total'] == 0
+    assert features.loc['C55', 'last_promise_status'] is None
+
+
+def test_datetime_timestamps_match_epoch_seconds():
+    events = random_events(500, 20, seed=3)
+    dated = events.assign(timestamp=pd.to_datetime(events['timestamp'], unit='s', utc=True))
+    as_of = pd.Timestamp(AS_OF, unit='s', tz='UTC')
+
+    pd.testing.assert_frame_equal(build_features(dated, as_of=as_of), build_features(events, as_of=AS_OF))
+
+
+def test_no_cases_is_an_error():
+    with pytest.raises(ValueError):
+        build_features(random_events(0, 1), as_of=AS_OF)
+
+
+def test_predictor_and_compliance_views():
+    events = random_events(1000, 10, seed=5)
+    features = build_features(events, as_of=AS_OF)
+    inputs = predictor_features(features)
+
+    assert inputs['historicalPayments'].tolist() == features['payments'].tolist()
+    assert inputs['contactFrequency'].tolist() == features['contacts_30d'].tolist()
+
+    case_id = features.index[0]
+    context = compliance_context(features, case_id)
+    for days in WINDOWS_DAYS:
+        for name in CHANNELS:
+            assert count_recent_contacts(context, name, days) == features.loc[case_id, f"contacts_{name}_{days}d"]
+    assert context['past_contact_count'] == features.loc[case_id, 'contacts_total']
+    assert context['escalation_count'] == features.loc[case_id, 'escalations']
@@ -0,0 +1,157 @@
+"""
+Server-side DCA roster (recommendation.dca_registry, /dcas routes)
+
+top() must agree with scoring the full list (recommend_dca_assignment),
+including after updates that are rejected; a rejected update leaves the
+roster exactly as it was. Batches assigned over the roster from several
+threads at once must not take more than each DCA's free capacity.
+"""
+
+import random
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from recommendation.dca_registry import DCARegistry
+from recommendation.prioritizer import CasePrioritizer
+
+SPECIALIZATIONS = ['general', 'complex', 'high_value', 'collections']
+
+BAD_UPDATES = [
+    {'max_load': 0},
+    {'max_load': -5},
+    {'success_rate': 'high'},
+    {'current_load': None},
+    {'max_load': True},
+    {'specialization': 3}
+]
+
+
+def random_dca(rng, dca_id):
+    return {
+        'id': dca_id,
+        'name': f"Agency {dca_id}",
+        'success_rate': rng.choice([rng.randint(20, 95), 60]),
+        'current_load': rng.choice([0, 10, rng.randint(0, 20)]),
+        'max_load': rng.choice([20, 50]),
+        'specialization': rng.choice(SPECIALIZATIONS)
+    }
+
+
+def random_case(rng, case_id=None):
+    return {
+        'id': case_id,
+        'paymentProbability': rng.randint(0, 100),
+        'amount': rng.randint(0, 30000),
+        'overdueDays': rng.randint(0, 200)
+    }
+
+
+@pytest.mark.parametrize('seed', range(100))
+def test_top_matches_full_list_scoring(seed):
+    rng = random.Random(seed)
+    prioritizer = CasePrioritizer()
+    roster = [random_dca(rng, f"D{i}") for i in range(rng.randint(1, 30))]
+    registry = DCARegistry.from_dcas(roster)
+    with_registry = CasePrioritizer(registry)
+
+    for _ in range(30):
+        dca = rng.choice(roster)
+        action = rng.random()
+        if action < 0.3:
+            registry.add_load(dca['id'])
+            dca['current_load'] += 1
+        elif action < 0.5:
+            registry.update(dca['id'], success_rate=70)
+            dca['success_rate'] = 70
+
+        case = random_case(rng)
+        expected = prioritizer.recommend_dca_assignment(case, roster, top_k=5)
+        assert with_registry.recommend_dca_assignment(case, top_k=5) == expected
+
+
+@pytest.mark.parametrize('fields', BAD_UPDATES)
+def test_rejected_update_leaves_roster_unchanged(fields):
+    rng = random.Random(1)
+    registry = DCARegistry.from_dcas([random_dca(rng, f"D{i}") for i in range(10)])
+    before = registry.dcas()
+
+    with pytest.raises(ValueError):
+        registry.update('D3', **fields)
+    assert registry.dcas() == before
+
+
+def test_batch_upsert_is_all_or_nothing():
+    registry = DCARegistry.from_dcas([{'id': 'A', 'max_load': 10}])
+    before = registry.dcas()
+
+    with pytest.raises(ValueError):
+        registry.upsert_many([{'id': 'B'}, {'id': 'A', 'max_load': 0}])
+    assert registry.dcas() == before
+
+
+@pytest.mark.parametrize('seed', range(10))
+def test_concurrent_assignments_stay_within_capacity(seed):
+    rng = random.Random(seed)
+    prioritizer = CasePrioritizer()
+    roster = [random_dca(rng, f"D{i}") for i in range(5)]
+    registry = DCARegistry.from_dcas(roster)
+    batches = [[random_case(rng, f"B{b}-{i}") for i in range(20)] for b in range(16)]
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        results = list(pool.map(
+            lambda cases: registry.assign(lambda dcas: prioritizer.assign_dcas(cases, dcas)), batches
+        ))
+
+    assigned = {dca['id']: 0 for dca in roster}
+    for result in results:
+        for load in result['dca_load']:
+            assigned[load['dca_id']] += load['assigned']
+    for before, after in zip(roster, registry.dcas()):
+        assert after['current_load'] == before['current_load'] + assigned[before['id']]
+        assert after['current_load'] <= max(before['current_load'], before['max_load'])
+
+
+@pytest.fixture
+def roster(api):
+    api.dca_registry.upsert_many([
+        {'id': 'A', 'name': 'Apex', 'success_rate': 80, 'max_load': 10},
+        {'id': 'B', 'name': 'Beta', 'max_load': 5, 'specialization': 'complex'}
+    ])
+    yield api.dca_registry
+    for dca in api.dca_registry.dcas():
+        api.dca_registry.remove(dca['id'])
+
+
+def test_patch_updates_fields_and_load(client, roster):
+    response = client.patch('/dcas/A', json={'success_rate': 70, 'loadDelta': 2})
+
+    assert response.status_code == 200
+    assert response.json['dca']['success_rate'] == 70
+    assert response.json['dca']['current_load'] == 2
+
+
+@pytest.mark.parametrize('kwargs', [
+    {},
+    {'json': [1]},
+    {'json': {'loadDelta': True}},
+    {'json': {'loadDelta': 1.5}},
+    {'json': {'load_delta': 1}},
+    {'json': {'dca_id': 'B'}},
+    {'json': {'id': 'B'}},
+    {'json': {'rating': 5}},
+    {'json': {'max_load': 0}}
+])
+def test_patch_rejects_bad_updates(client, roster, kwargs):
+    before = roster.dcas()
+
+    assert client.patch('/dcas/A', **kwargs).status_code == 400
+    assert roster.dcas() == before
+
+
+def test_post_rejects_batch_with_an_invalid_dca(client, roster):
+    before = roster.dcas()
+    response = client.post('/dcas', json={'dcas': [{'id': 'C'}, {'id': 'A', 'success_rate': 'x'}]})
+
+    assert response.status_code == 400
+    assert roster.dcas() == before
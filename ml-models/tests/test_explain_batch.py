@@ -0,0 +1,76 @@
+"""Batched explainable predictions (predict_with_explanation_many, POST /predict/explain/batch)"""
+
+import random
+
+import pytest
+
+CASE = {'overdueDays': 45, 'amount': 5000, 'historicalPayments': 3, 'contactFrequency': 2}
+
+
+def random_cases(n, seed=6):
+    rng = random.Random(seed)
+    return [
+        {
+            'overdueDays': rng.randint(0, 200),
+            'amount': rng.choice([rng.randint(100, 30000), rng.uniform(100, 30000)]),
+            'historicalPayments': rng.randint(0, 8),
+            'contactFrequency': rng.randint(0, 6)
+        }
+        for _ in range(n)
+    ]
+
+
+@pytest.mark.parametrize('predictor_name', ['fallback_predictor', 'trained_predictor'])
+def test_batch_matches_single_row(request, predictor_name):
+    predictor = request.getfixturevalue(predictor_name)
+    cases = random_cases(300)
+    batch = predictor.predict_with_explanation_many(cases)
+
+    assert batch['explainedRows'] == list(range(len(cases)))
+    for i, case in enumerate(cases):
+        single = predictor.predict_with_explanation(case)
+        assert batch['explanations'][i] == single.pop('explanation')
+        assert {key: batch[key][i] for key in single} == single
+
+
+def test_explains_only_requested_rows(trained_predictor):
+    cases = random_cases(20)
+    batch = trained_predictor.predict_with_explanation_many(cases, explain=[3, 0, 17])
+
+    assert batch['explainedRows'] == [3, 0, 17]
+    assert len(batch['paymentProbability']) == 20
+    assert batch['explanations'] == [
+        trained_predictor.predict_with_explanation(cases[i])['explanation'] for i in (3, 0, 17)
+    ]
+
+
+def test_route_returns_explanations(client):
+    response = client.post('/predict/explain/batch', json={'cases': [CASE, CASE], 'explain': [1]})
+
+    assert response.status_code == 200
+    assert response.json['count'] == 2
+    assert response.json['explainedRows'] == [1]
+
+
+@pytest.mark.parametrize('body', [
+    [CASE],
+    {'cases': CASE},
+    {'cases': [CASE], 'explain': 5},
+    {'cases': [CASE], 'explain': True},
+    {'cases': [CASE], 'explain': [True]},
+    {'cases': [CASE], 'explain': [1]},
+    {'cases': [CASE], 'explain': '0'},
+    {'cases': [CASE, 3]},
+    {'cases': [{'amount': 1}]}
+])
+def test_route_rejects_bad_requests(client, body):
+    response = client.post('/predict/explain/batch', json=body)
+
+    assert response.status_code == 400
+    assert response.json['success'] is False
+
+
+def test_route_rejects_non_json_body(client):
+    response = client.post('/predict/explain/batch', data='cases', content_type='text/plain')
+
+    assert response.status_code == 400
@@ -0,0 +1,104 @@
+"""
+Vectorized rule-based fallback against the scalar rules
+
+_fallback_prediction_many and _fallback_explanation_many must return
+exactly what _fallback_prediction and _fallback_explanation return, down to
+int or float in the JSON (75 and 75.0). Every bucket edge, the values either
+side of it and the cap points of the linear terms are checked exhaustively,
+as floats and, where integral, as ints, followed by a random sample of int,
+integral float and fractional inputs.
+"""
+
+import itertools
+import json
+
+import numpy as np
+import pytest
+
+from prediction.predict import FEATURE_NAMES
+
+
+def _edge_values(edges, low, high):
+    values = {low, high}
+    for edge in edges:
+        values.update([edge - 1, edge - 0.5, np.nextafter(edge, -np.inf), edge,
+                       np.nextafter(edge, np.inf), edge + 0.5, edge + 1])
+    return sorted(float(v) for v in values)
+
+
+def boundary_grid():
+    """Cartesian product of the interesting values of every feature"""
+    overdue = _edge_values([30, 60, 90, 120], -1, 400)
+    amount = _edge_values([2000, 5000, 10000], 0, 1e6)
+    payments = _edge_values([5], 0, 50) + [0.3, 4.9999]
+    contacts = _edge_values([7.5], 0, 50) + [0.3, 7.4999]
+    return [list(row) for row in itertools.product(overdue, amount, payments, contacts)]
+
+
+def integer_grid():
+    """The boundary grid's integral values, as Python ints"""
+    return [
+        [int(value) for value in row]
+        for row in boundary_grid() if all(value == int(value) for value in row)
+    ]
+
+
+def random_sample(n, seed=42):
+    """Random rows, half of them fractional; integral values randomly given as ints"""
+    rng = np.random.default_rng(seed)
+    X = np.column_stack([
+        rng.integers(-5, 400, n),
+        rng.uniform(0, 50000, n),
+        rng.integers(0, 12, n),
+        rng.integers(0, 25, n)
+    ]).astype(float)
+    fractional = rng.random(n) < 0.5
+    X[fractional] += rng.random((fractional.sum(), 4))
+    as_int = rng.random(X.shape) < 0.5
+    return [
+        [int(value) if flag and value == int(value) else value for value, flag in zip(row, flags)]
+        for row, flags in zip(X.tolist(), as_int.tolist())
+    ]
+
+
+def _json(value):
+    return json.dumps(value, sort_keys=True)
+
+
+@pytest.mark.parametrize('rows', [
+    pytest.param(boundary_grid(), id='boundary-grid'),
+    pytest.param(integer_grid(), id='integer-grid'),
+    pytest.param(random_sample(50_000), id='random-sample')
+])
+def test_batch_matches_scalar_rules(fallback_predictor, rows):
+    cases = [dict(zip(FEATURE_NAMES, row)) for row in rows]
+    batch = fallback_predictor.predict_many(cases)
+    explanations = fallback_predictor.predict_with_explanation_many(cases)['explanations']
+
+    for i, features in enumerate(cases):
+        expected = fallback_predictor._fallback_prediction(features)
+        assert _json({key: batch[key][i] for key in expected}) == _json(expected), features
+        expected_explanation = fallback_predictor._fallback_explanation(features, expected)
+        assert _json(explanations[i]) == _json(expected_explanation), features
+
+
+def test_integer_inputs_score_as_ints(fallback_predictor):
+    case = {'overdueDays': 10, 'amount': 1000, 'historicalPayments': 2, 'contactFrequency': 1}
+    assert fallback_predictor.predict_many([case])['paymentProbability'] == [97]
+    assert isinstance(fallback_predictor.predict_many([case])['paymentProbability'][0], int)
+    fractional = {**case, 'historicalPayments': 2.0}
+    assert isinstance(fallback_predictor.predict_many([fractional])['paymentProbability'][0], float)
+
+
+def test_missing_default_model_falls_back(tmp_path, monkeypatch):
+    from prediction.predict import PaymentPredictor
+
+    monkeypatch.setenv('MODEL_PATH', str(tmp_path))
+    assert not PaymentPredictor().is_trained
+
+
+def test_missing_explicit_artifact_raises(tmp_path):
+    from prediction.predict import PaymentPredictor
+
+    with pytest.raises(FileNotFoundError):
+        PaymentPredictor(str(tmp_path / 'no-such-artifact'))
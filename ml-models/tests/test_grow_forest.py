@@ -0,0 +1,45 @@
+"""
+Chunked forest growth (train_model.grow_forest)
+
+Each chunk adds its share of trees with warm_start. A chunk that misses a
+class is merged into the next one; the trees it would have added are not
+grown, and the shortfall is reported.
+"""
+
+import copy
+
+import pytest
+
+from train_model import generate_training_data, grow_forest
+
+
+@pytest.fixture
+def forest(trained_model):
+    model, scaler = trained_model
+    model = copy.deepcopy(model)
+    model.set_params(warm_start=True)
+    return model, scaler
+
+
+def run(forest, chunks, new_trees):
+    model, scaler = forest
+    start = len(model.estimators_)
+    grow_forest(model, scaler, lambda: iter(chunks), {'low', 'medium', 'high'}, len(chunks), new_trees)
+    return len(model.estimators_) - start
+
+
+def test_grows_every_tree(forest, capsys):
+    chunks = [generate_training_data(2000, seed=seed) for seed in range(4)]
+
+    assert run(forest, chunks, new_trees=8) == 8
+    assert 'Warning: grew' not in capsys.readouterr().out
+
+
+def test_reports_the_shortfall_of_merged_chunks(forest, capsys):
+    data = generate_training_data(2000, seed=1)
+    chunks = [data[data['payment_class'] == 'low'], data, generate_training_data(2000, seed=2)]
+
+    grown = run(forest, chunks, new_trees=6)
+
+    assert grown < 6
+    assert f"Warning: grew {grown} of 6 trees - 1 of 3 chunks" in capsys.readouterr().out
@@ -0,0 +1,40 @@
+"""
+/predict/batch
+
+Results match /predict case by case; malformed bodies and cases are
+rejected with a 400 instead of failing as a server error.
+"""
+
+import pytest
+
+CASES = [
+    {'overdueDays': 10, 'amount': 1500, 'historicalPayments': 3, 'contactFrequency': 1},
+    {'overdueDays': 95, 'amount': 12000.5, 'historicalPayments': 0, 'contactFrequency': 0},
+    {'overdueDays': 45, 'amount': 5000, 'historicalPayments': 1, 'contactFrequency': 9}
+]
+
+
+def test_matches_single_predictions(client):
+    response = client.post('/predict/batch', json={'cases': CASES})
+
+    assert response.status_code == 200
+    assert response.json['count'] == len(CASES)
+    for i, case in enumerate(CASES):
+        single = client.post('/predict', json=case).json
+        for key in ('paymentProbability', 'riskScore', 'priority', 'confidence'):
+            assert response.json[key][i] == single[key]
+
+
+@pytest.mark.parametrize('kwargs', [
+    {'json': [CASES[0]]},
+    {'json': {'cases': CASES[0]}},
+    {'json': {'cases': [CASES[0], 'case']}},
+    {'json': {'cases': [CASES[0], {'overdueDays': 10, 'amount': 1500, 'contactFrequency': 1}]}},
+    {'json': {'cases': [{**CASES[0], 'amount': 'lots'}]}},
+    {'data': 'not json', 'content_type': 'application/json'}
+])
+def test_rejects_bad_requests(client, kwargs):
+    response = client.post('/predict/batch', **kwargs)
+
+    assert response.status_code == 400
+    assert 'error' in response.json
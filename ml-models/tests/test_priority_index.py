@@ -0,0 +1,187 @@
+"""
+Case priority index (recommendation.priority_index, /cases routes)
+
+The index must order the open cases exactly as prioritize_cases orders
+them - scores and ties (first arrival first) - through upserts, closures,
+SLA changes and daily ticks, and a rejected update leaves it unchanged.
+"""
+
+import random
+
+import pytest
+
+from recommendation.prioritizer import CasePrioritizer
+from recommendation.priority_index import PriorityIndex
+
+TODAY = 740_000
+SLA_STATUSES = ['on_track', 'warning', 'breached']
+
+
+def random_features(rng):
+    return {
+        'paymentProbability': rng.choice([rng.randint(0, 100), 50]),
+        'amount': rng.choice([rng.randint(0, 30000), 5000]),
+        'overdueDays': rng.randint(0, 150),
+        'slaStatus': rng.choice(SLA_STATUSES)
+    }
+
+
+def expected_order(open_cases, today):
+    """prioritize_cases over the open cases as of today, in arrival order"""
+    cases = [
+        {**features, 'id': case_id, 'overdueDays': today - since}
+        for case_id, (features, since) in open_cases.items()
+    ]
+    return [
+        {key: case[key] for key in ('id', 'priorityScore', 'priorityLevel')}
+        for case in CasePrioritizer().prioritize_cases(cases)
+    ]
+
+
+@pytest.mark.parametrize('seed', range(20))
+def test_matches_prioritize_cases(seed):
+    rng = random.Random(seed)
+    open_cases = {}
+    for i in range(rng.randint(1, 300)):
+        features = random_features(rng)
+        open_cases[f"C{i}"] = (features, TODAY - features['overdueDays'])
+    index = PriorityIndex.from_cases(
+        [{**features, 'id': case_id} for case_id, (features, _) in open_cases.items()], today=TODAY
+    )
+    today = TODAY
+    next_id = len(open_cases)
+
+    for _ in range(100):
+        action = rng.random()
+        if action < 0.3:
+            case_id = f"C{next_id}"
+            next_id += 1
+            features = random_features(rng)
+            index.upsert(case_id, **features)
+            open_cases[case_id] = (features, today - features['overdueDays'])
+        elif action < 0.5 and open_cases:
+            case_id = rng.choice(list(open_cases))
+            assert index.close(case_id)
+            del open_cases[case_id]
+        elif action < 0.7 and open_cases:
+            case_id = rng.choice(list(open_cases))
+            features, since = open_cases[case_id]
+            status = rng.choice(SLA_STATUSES)
+            index.set_sla_status(case_id, status)
+            open_cases[case_id] = ({**features, 'slaStatus': status}, since)
+        elif action < 0.8 and open_cases:
+            case_id = rng.choice(list(open_cases))
+            features, since = open_cases[case_id]
+            amount = rng.randint(0, 30000)
+            index.upsert(case_id, amount=amount)
+            open_cases[case_id] = ({**features, 'amount': amount}, since)
+        else:
+            today += rng.choice([1, 1, 1, 30])
+            index.tick(today)
+
+        expected = expected_order(open_cases, today)
+        assert index.top(len(open_cases) + 1) == expected
+        assert index.next_best() == (expected[0] if expected else None)
+
+    for position, case in enumerate(expected_order(open_cases, today)):
+        assert index.rank(case['id']) == position
+
+
+def test_tick_rescores_only_cases_crossing_a_bucket_edge():
+    index = PriorityIndex.from_cases(
+        [{'id': 'fresh', 'overdueDays': 29}, {'id': 'sweet', 'overdueDays': 50}], today=TODAY
+    )
+
+    assert index.tick() == 1
+    assert index.get('fresh')['overdueDays'] == 30
+    with pytest.raises(ValueError):
+        index.tick(TODAY - 1)
+
+
+def test_from_cases_merges_duplicate_ids():
+    index = PriorityIndex.from_cases([
+        {'id': 'A', 'amount': 100, 'slaStatus': 'breached'},
+        {'id': 'B', 'amount': 20000},
+        {'id': 'A', 'amount': 25000}
+    ], today=TODAY)
+    upserted = PriorityIndex(today=TODAY)
+    upserted.upsert('A', amount=100, slaStatus='breached')
+    upserted.upsert('B', amount=20000)
+    upserted.upsert('A', amount=25000)
+
+    assert len(index) == 2
+    assert index.get('A')['slaStatus'] == 'breached'
+    assert index.top(3) == upserted.top(3)
+    assert [index.rank(case_id) for case_id in 'AB'] == [0, 1]
+
+
+@pytest.mark.parametrize('features', [
+    {'amount': 'lots'},
+    {'paymentProbability': None},
+    {'overdueDays': 1.5},
+    {'overdueDays': float('nan')},
+    {'amount': True},
+    {'slaStatus': 3}
+])
+def test_rejected_update_leaves_index_unchanged(features):
+    index = PriorityIndex.from_cases([{'id': f"C{i}", 'amount': i * 1000} for i in range(10)], today=TODAY)
+    before = index.top(10)
+
+    with pytest.raises(ValueError):
+        index.upsert('C3', **features)
+    with pytest.raises(ValueError):
+        index.upsert_many([{'id': 'C11'}, {'id': 'C4', **features}])
+    assert index.top(11) == before
+    assert 'C11' not in index
+
+
+@pytest.fixture
+def case_index(api):
+    yield api.case_index
+    for case in api.case_index.top(len(api.case_index)):
+        api.case_index.close(case['id'])
+
+
+def test_case_routes(client, case_index):
+    response = client.post('/cases', json={'cases': [
+        {'id': 1, 'amount': 1000, 'overdueDays': 10},
+        {'id': 'C-2', 'amount': 20000, 'overdueDays': 45}
+    ]})
+    assert response.status_code == 200
+    assert response.json['count'] == 2
+
+    assert client.get('/cases/next').json['case']['id'] == 'C-2'
+    assert [case['id'] for case in client.get('/cases/queue?topK=5').json['cases']] == ['C-2', '1']
+
+    response = client.patch('/cases/1', json={'amount': 30000, 'overdueDays': 45, 'slaStatus': 'breached'})
+    assert response.status_code == 200
+    assert response.json['case']['rank'] == 0
+    assert client.get('/cases/C-2').json['case']['rank'] == 1
+
+    assert client.delete('/cases/1').status_code == 200
+    assert client.delete('/cases/1').status_code == 404
+    assert client.get('/cases/1').status_code == 404
+    assert client.get('/cases/next').json['case']['id'] == 'C-2'
+
+
+@pytest.mark.parametrize('method, path, kwargs', [
+    ('post', '/cases', {'json': [1]}),
+    ('post', '/cases', {'json': {'cases': [{'amount': 5}]}}),
+    ('post', '/cases', {'json': {'cases': [{'id': 'C-9'}, {'id': 'C-1', 'amount': 'x'}]}}),
+    ('patch', '/cases/C-1', {}),
+    ('patch', '/cases/C-1', {'json': {'priority': 'high'}}),
+    ('patch', '/cases/C-1', {'json': {'overdueDays': 'old'}}),
+    ('get', '/cases/queue?topK=-1', {})
+])
+def test_case_routes_reject_bad_requests(client, case_index, method, path, kwargs):
+    client.post('/cases', json={'cases': [{'id': 'C-1', 'amount': 500}]})
+    before = case_index.top(10)
+
+    assert getattr(client, method)(path, **kwargs).status_code == 400
+    assert case_index.top(10) == before
+
+
+def test_case_routes_need_a_single_process(client, case_index):
+    response = client.get('/cases/next', environ_overrides={'wsgi.multiprocess': True})
+
+    assert response.status_code == 409
@@ -0,0 +1,31 @@
+"""
+Registry watcher start (api._start_registry_watcher)
+
+Every request checks that its process has a watcher thread; concurrent
+first requests of a threaded worker must still start exactly one.
+"""
+
+import threading
+
+
+def test_concurrent_first_requests_start_one_watcher(api, monkeypatch):
+    started = []
+    monkeypatch.setattr(api, 'reload_interval', 1.0)
+    monkeypatch.setattr(api, '_watcher_pid', None)
+    monkeypatch.setattr(api, '_watch_registry', lambda: started.append(threading.get_ident()))
+    barrier = threading.Barrier(16)
+
+    def first_request():
+        barrier.wait()
+        api._start_registry_watcher()
+
+    threads = [threading.Thread(target=first_request) for _ in range(16)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    for thread in threading.enumerate():
+        if thread.name == 'model-registry-watcher':
+            thread.join(timeout=5)
+    assert len(started) == 1
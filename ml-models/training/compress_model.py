@@ -0,0 +1,307 @@
+"""
+Forest compression
+
+    python training/compress_model.py --source synthetic:200000 --tolerance 0.005
+
+Shrinks the registry's active payment forest (loaded as refresh_model.py
+loads it) in two steps, each stopping before held-out accuracy falls more
+than --tolerance below the original forest's:
+
+1. Tree selection - greedy forward selection: trees are added one at a time,
+   each time the one that most improves the subset's accuracy, until the
+   subset is within tolerance.
+2. Depth capping - the selected trees are cut at the shallowest depth that
+   stays within tolerance. Cut nodes become leaves with the class
+   distribution they already carry.
+
+Both choices are made on one half of the validation rows and reported on
+the other half. The report compares trees, nodes, bytes and measured
+latency before and after. The compressed model is saved and published like
+any other version, with the parent version in its metadata - but only if
+it is also within tolerance on the report half. Otherwise nothing is saved
+and the script exits non-zero.
+"""
+
+import argparse
+import copy
+import json
+import os
+import pickle
+import sys
+from datetime import datetime, timezone
+
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from prediction.compiled_forest import CompiledForest
+from refresh_model import load_active
+from train_model import DEFAULT_CHUNK_SIZE, _open_chunks, _split_chunk, save_model
+from tuning import measure_latency
+
+MODEL_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'models')
+
+
+def compress_model(source, tolerance=0.005, max_rows=100_000, min_trees=10, min_depth=2,
+                   chunk_size=DEFAULT_CHUNK_SIZE, model_dir=MODEL_DIR, output_dir=None,
+                   activate=True, latency_budget_ms=None, report_path=None, seed=7):
+    """
+    Prune and depth-cap the active forest and save it as a new version
+
+    Args:
+        source: held-out outcomes the model was not trained on, any spec
+                train_model accepts ('synthetic:N', CSV/Parquet files,
+                'postgres:<table or query>')
+        tolerance: accuracy (as a fraction, 0.005 = half a point) the
+                   compressed forest may lose against the original
+        max_rows: validation rows read from source
+        min_trees: keep at least this many trees - payment probabilities
+                   are averaged over the trees and get coarse with only a few
+        latency_budget_ms: single-row p50 the compressed model should meet
+        output_dir: where to write the compressed model (default: model_dir)
+
+    Returns:
+        (model, report) - report['saved'] is False if the compressed forest
+        lost more than tolerance on the report rows and was not saved
+    """
+    # The version serving traffic, not whatever pickles a later training
+    # run left in model_dir
+    model, scaler, parent_version = load_active(model_dir)
+
+    X, y = _validation_rows(model, source, chunk_size, max_rows, seed)
+    select = np.random.default_rng(seed).random(len(X)) < 0.5
+    X_select = scaler.transform(X[select]).astype(np.float32)
+    y_select = y[select]
+
+    tree_proba = np.stack([tree.predict_proba(X_select) for tree in model.estimators_]).astype(np.float32)
+    baseline = _accuracy(tree_proba.sum(axis=0), y_select)
+    target = baseline - tolerance
+    print(f"Original forest: {len(model.estimators_)} trees, selection accuracy {baseline:.2%} "
+          f"(target >= {target:.2%}) on {int(select.sum()):,} rows")
+
+    order = select_trees(tree_proba, y_select, target, min_trees)
+    trees = [model.estimators_[i] for i in order]
+    print(f"Tree selection: kept {len(trees)} of {len(model.estimators_)} trees")
+
+    depth = max(tree.tree_.max_depth for tree in trees)
+    for cap in range(depth - 1, min_depth - 1, -1):
+        capped = [truncate_tree(tree, cap) for tree in trees]
+        proba = sum(tree.predict_proba(X_select) for tree in capped)
+        if _accuracy(proba, y_select) < target:
+            break
+        trees, depth = capped, cap
+    print(f"Depth capping: max depth {depth}")
+
+    compressed = copy.copy(model)
+    compressed.estimators_ = trees
+    compressed.set_params(n_estimators=len(trees), max_depth=depth)
+    # Bootstrap bookkeeping of the last fit (estimators_samples_) - one
+    # weight per training row, meaningless once trees are dropped
+    compressed._sample_weight = None
+
+    X_report, y_report = X[~select], y[~select]
+    before = _describe(model, scaler, X_report, y_report)
+    after = _describe(compressed, scaler, X_report, y_report)
+    # The selection half chose the trees and depth, so only the report half
+    # says whether the result really stays within tolerance
+    loss = before['accuracy'] - after['accuracy']
+    report = {
+        'generated_at': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'source': source,
+        'tolerance': tolerance,
+        'latency_budget_ms': latency_budget_ms,
+        'rows': {'selection': int(select.sum()), 'report': int(len(y_report))},
+        'before': before,
+        'after': after,
+        'accuracy_loss': round(loss, 4),
+        'saved': loss <= tolerance + 1e-9
+    }
+    print(f"\n{format_report(report)}")
+
+    if report_path:
+        with open(report_path, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"\nReport written to: {report_path}")
+
+    if not report['saved']:
+        print(f"\nNot saved: report accuracy fell {loss:.2%}, more than the {tolerance:.2%} tolerance")
+        return compressed, report
+
+    save_model(compressed, scaler, model_dir=output_dir or model_dir, activate=activate, metadata={
+        'training': 'compressed',
+        'parent_version': parent_version,
+        'source': source,
+        'tolerance': tolerance,
+        'trees_kept': len(trees),
+        'max_depth': depth,
+        'holdout_accuracy': after['accuracy'],
+        'parent_holdout_accuracy': before['accuracy'],
+        'compressed_at': report['generated_at']
+    })
+
+    return compressed, report
+
+
+def select_trees(tree_proba, y, target, min_trees=1):
+    """
+    Greedy forward selection of trees
+
+    Args:
+        tree_proba: n_trees x n_rows x n_classes per-tree class probabilities
+        y: class index of every row
+        target: accuracy at which to stop (once min_trees are selected)
+
+    Returns:
+        indices of the selected trees, in the order they were added (every
+        tree if the target is never reached)
+    """
+    total = np.zeros_like(tree_proba[0])
+    remaining = list(range(len(tree_proba)))
+    selected = []
+    while remaining:
+        # Accuracy of the current subset plus each remaining tree
+        accuracy = ((total + tree_proba[remaining]).argmax(axis=2) == y).mean(axis=1)
+        best = int(np.argmax(accuracy))
+        selected.append(remaining.pop(best))
+        total += tree_proba[selected[-1]]
+        if accuracy[best] >= target and len(selected) >= min_trees:
+            break
+    return selected
+
+
+def truncate_tree(estimator, max_depth):
+    """
+    Copy of a fitted decision tree cut at max_depth
+
+    Nodes below the cut are dropped from the node table, so the copy is
+    smaller on disk and when compiled, not just shallower.
+    """
+    state = estimator.tree_.__getstate__()
+    nodes = state['nodes']
+    left, right = nodes['left_child'], nodes['right_child']
+
+    # Breadth-first over the nodes that survive the cut
+    order, depths = [0], [0]
+    for node, depth in zip(order, depths):
+        if left[node] != -1 and depth < max_depth:
+            order += [left[node], right[node]]
+            depths += [depth + 1, depth + 1]
+
+    new_id = np.full(len(nodes), -1)
+    new_id[order] = np.arange(len(order))
+    kept = nodes[order].copy()
+    is_leaf = (kept['left_child'] == -1) | (new_id[kept['left_child']] == -1)
+    kept['left_child'] = np.where(is_leaf, -1, new_id[kept['left_child']])
+    kept['right_child'] = np.where(is_leaf, -1, new_id[kept['right_child']])
+    kept['feature'][is_leaf] = -2
+    kept['threshold'][is_leaf] = -2.0
+
+    truncated = copy.deepcopy(estimator)
+    truncated.tree_.__setstate__({
+        'max_depth': max(depths),
+        'node_count': len(order),
+        'nodes': kept,
+        'values': state['values'][order]
+    })
+    truncated.max_depth = max_depth
+    return truncated
+
+
+def format_report(report):
+    before, after = report['before'], report['after']
+    rows = [
+        ('trees', 'n_trees', '{:,.0f}'),
+        ('max depth', 'max_depth', '{:,.0f}'),
+        ('nodes', 'n_nodes', '{:,.0f}'),
+        ('compiled KB', 'compiled_bytes', '{:,.0f}', 1024),
+        ('pickle KB', 'pickle_bytes', '{:,.0f}', 1024),
+        ('single-row p50 ms', 'single_row_p50_ms', '{:.4f}'),
+        ('single-row p99 ms', 'single_row_p99_ms', '{:.4f}'),
+        ('batch ms per 1k', 'batch_ms_per_1k', '{:.3f}'),
+        ('accuracy', 'accuracy', '{:.2%}')
+    ]
+    lines = [f"{'':<20} {'before':>12} {'after':>12} {'change':>9}"]
+    for label, key, fmt, *divisor in rows:
+        scale = divisor[0] if divisor else 1
+        old, new = before[key], after[key]
+        change = f"{(new - old) / old:+.0%}" if old else ''
+        lines.append(f"{label:<20} {fmt.format(old / scale):>12} {fmt.format(new / scale):>12} {change:>9}")
+
+    budget = report['latency_budget_ms']
+    if budget is not None:
+        met = after['single_row_p50_ms'] <= budget
+        lines.append(f"\nLatency budget {budget} ms: {'met' if met else 'NOT met - raise --tolerance'}")
+    return '\n'.join(lines)
+
+
+def _validation_rows(model, source, chunk_size, max_rows, seed):
+    X, y = [], []
+    taken = 0
+    for i, chunk in enumerate(_open_chunks(source, min(chunk_size, max_rows), seed)()):
+        X_chunk, y_chunk, _ = _split_chunk(chunk, i, 0, seed)
+        X.append(X_chunk[:max_rows - taken])
+        y.append(y_chunk[:max_rows - taken])
+        taken += len(X[-1])
+        if taken >= max_rows:
+            break
+
+    X, y = np.concatenate(X), np.concatenate(y)
+    known = np.isin(y, model.classes_)
+    if not known.all():
+        print(f"Warning: skipping {int((~known).sum()):,} rows with classes the model doesn't know")
+    # Class indices, as the trees' predict_proba columns are ordered
+    return X[known], np.searchsorted(model.classes_, y[known])
+
+
+def _accuracy(proba, y):
+    return float(np.mean(proba.argmax(axis=1) == y))
+
+
+def _describe(model, scaler, X, y):
+    """Size, measured latency and accuracy of one forest"""
+    compiled = CompiledForest.from_sklearn(model, scaler)
+    return {
+        'model_version': compiled.model_version,
+        'n_trees': compiled.n_trees,
+        'n_nodes': compiled.n_nodes,
+        'max_depth': compiled.max_depth,
+        'compiled_bytes': int(compiled.nbytes),
+        'pickle_bytes': len(pickle.dumps(model, protocol=pickle.HIGHEST_PROTOCOL)),
+        **measure_latency(compiled, np.ascontiguousarray(X, dtype=np.float64)),
+        'accuracy': round(_accuracy(compiled.predict_proba(X), y), 4)
+    }
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Prune and depth-cap the payment model')
+    parser.add_argument('--source', required=True,
+                        help="held-out outcomes: 'synthetic:N', CSV/Parquet files or 'postgres:<table|query>'")
+    parser.add_argument('--tolerance', type=float, default=0.005,
+                        help='accuracy the compressed model may lose (fraction, default 0.005)')
+    parser.add_argument('--max-rows', type=int, default=100_000, help='validation rows read from --source')
+    parser.add_argument('--min-trees', type=int, default=10)
+    parser.add_argument('--min-depth', type=int, default=2)
+    parser.add_argument('--latency-budget-ms', type=float, help='single-row p50 the result should meet')
+    parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE)
+    parser.add_argument('--model-dir', default=MODEL_DIR)
+    parser.add_argument('--output-dir', help='write the compressed model here (default: --model-dir)')
+    parser.add_argument('--no-activate', action='store_true',
+                        help="publish to the registry without switching the active version")
+    parser.add_argument('--report', help='write the before/after report as JSON')
+    args = parser.parse_args()
+
+    _, report = compress_model(
+        args.source,
+        tolerance=args.tolerance,
+        max_rows=args.max_rows,
+        min_trees=args.min_trees,
+        min_depth=args.min_depth,
+        chunk_size=args.chunk_size,
+        model_dir=args.model_dir,
+        output_dir=args.output_dir,
+        activate=not args.no_activate,
+        latency_budget_ms=args.latency_budget_ms,
+        report_path=args.report
+    )
+    sys.exit(0 if report['saved'] else 1)
@@ -0,0 +1,95 @@
+"""
+Streaming model evaluation
+
+    python training/evaluate_model.py --source 'postgres:SELECT * FROM outcomes_2026' --version 35d102d9cf49 --version 9bf1048bd283
+
+Scores a holdout set of any size through PaymentPredictor.predict_many,
+one chunk at a time. The confusion matrix, per-class precision/recall,
+calibration bins and predict_many latency histogram are accumulated as
+counts and sums, so memory is one chunk plus a few KB per model whether
+the source has thousands of rows or tens of millions. Several model
+versions can be compared on the same pass over the data.
+"""
+
+import argparse
+import json
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from evaluation import evaluate_stream, format_report
+from prediction.predict import PaymentPredictor
+from prediction.registry import ModelRegistry
+from sources import LABEL_COLUMN, PROBABILITY_COLUMN
+from train_model import DEFAULT_CHUNK_SIZE, FEATURE_COLUMNS, _open_chunks
+
+
+def evaluate_model(source, versions=None, chunk_size=DEFAULT_CHUNK_SIZE, batch_size=1000,
+                   limit=None, report_path=None, seed=7):
+    """
+    Evaluate model versions on a holdout source without loading it whole
+
+    Args:
+        source: holdout outcomes, any spec train_model accepts ('synthetic:N',
+                CSV/Parquet files, 'postgres:<table or query>')
+        versions: registry versions to evaluate (default: the model the API
+                  would load)
+        batch_size: rows per predict_many call
+        limit: stop after this many rows
+
+    Returns:
+        list of report dicts, one per version
+    """
+    if versions:
+        registry = ModelRegistry()
+        missing = [version for version in versions if not os.path.isdir(registry.path(version))]
+        if missing:
+            raise ValueError(f"Not in the registry ({registry.root}): {', '.join(missing)}")
+        predictors = {version: PaymentPredictor(artifact_path=registry.path(version)) for version in versions}
+    else:
+        predictor = PaymentPredictor()
+        predictors = {predictor.model_version or 'fallback': predictor}
+
+    def chunks():
+        for chunk in _open_chunks(source, chunk_size, seed)():
+            chunk = chunk.dropna(subset=FEATURE_COLUMNS + [LABEL_COLUMN])
+            yield (
+                chunk[FEATURE_COLUMNS].to_numpy(dtype=float),
+                chunk[LABEL_COLUMN].astype(str).to_numpy(),
+                chunk[PROBABILITY_COLUMN].to_numpy(dtype=float) if PROBABILITY_COLUMN in chunk else None
+            )
+
+    print(f"Evaluating {', '.join(predictors)} on {source}...")
+    reports = evaluate_stream(predictors, chunks(), batch_size=batch_size, limit=limit)
+    print(f"\n{format_report(reports)}")
+
+    if report_path:
+        with open(report_path, 'w') as f:
+            json.dump({'source': source, 'batch_size': batch_size, 'models': reports}, f, indent=2)
+        print(f"\nReport written to: {report_path}")
+
+    return reports
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Evaluate payment models on a large holdout set')
+    parser.add_argument('--source', required=True,
+                        help="holdout outcomes: 'synthetic:N', CSV/Parquet files or 'postgres:<table|query>'")
+    parser.add_argument('--version', action='append', dest='versions',
+                        help='registry version to evaluate (repeat to compare; default: the active model)')
+    parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE)
+    parser.add_argument('--batch-size', type=int, default=1000, help='rows per predict_many call')
+    parser.add_argument('--limit', type=int, help='stop after this many rows')
+    parser.add_argument('--report', help='write the full report (bins and histograms) as JSON')
+    args = parser.parse_args()
+
+    evaluate_model(
+        args.source,
+        versions=args.versions,
+        chunk_size=args.chunk_size,
+        batch_size=args.batch_size,
+        limit=args.limit,
+        report_path=args.report
+    )
@@ -0,0 +1,268 @@
+"""
+Streaming Evaluation
+Constant-memory metric accumulators for scoring holdout sets chunk by chunk
+"""
+
+import time
+from typing import Any, Dict, Iterable, List, Optional
+
+import numpy as np
+
+# Class labels in the order the predictor's priority bands use them
+LABELS = ['low', 'medium', 'high']
+
+
+class ConfusionMatrix:
+    """Actual x predicted class counts, plus per-class precision/recall"""
+
+    def __init__(self, labels: List[str] = LABELS):
+        self.labels = list(labels)
+        self.counts = np.zeros((len(labels), len(labels)), dtype=np.int64)
+
+    def update(self, actual: np.ndarray, predicted: np.ndarray):
+        """Add a batch of class indices"""
+        n = len(self.labels)
+        self.counts += np.bincount(actual * n + predicted, minlength=n * n).reshape(n, n)
+
+    @property
+    def total(self) -> int:
+        return int(self.counts.sum())
+
+    def to_dict(self) -> Dict[str, Any]:
+        true_positives = np.diag(self.counts)
+        predicted = self.counts.sum(axis=0)
+        actual = self.counts.sum(axis=1)
+        precision = np.divide(true_positives, predicted, out=np.zeros(len(self.labels)), where=predicted > 0)
+        recall = np.divide(true_positives, actual, out=np.zeros(len(self.labels)), where=actual > 0)
+        f1 = np.divide(2 * precision * recall, precision + recall,
+                       out=np.zeros(len(self.labels)), where=precision + recall > 0)
+        return {
+            'accuracy': round(float(true_positives.sum() / max(self.total, 1)), 4),
+            'labels': self.labels,
+            'matrix': self.counts.tolist(),
+            'classes': {
+                label: {
+                    'precision': round(float(precision[i]), 4),
+                    'recall': round(float(recall[i]), 4),
+                    'f1': round(float(f1[i]), 4),
+                    'support': int(actual[i])
+                }
+                for i, label in enumerate(self.labels)
+            }
+        }
+
+
+class CalibrationBins:
+    """
+    Predicted vs. observed values in fixed-width bins of the prediction
+
+    Keeps a count and two sums per bin, so memory doesn't grow with rows.
+    Used for confidence vs. accuracy (observed is 0/1) and for predicted vs.
+    actual payment probability.
+    """
+
+    def __init__(self, n_bins: int = 10, low: float = 0.0, high: float = 1.0):
+        self.edges = np.linspace(low, high, n_bins + 1)
+        self.count = np.zeros(n_bins, dtype=np.int64)
+        self.predicted_sum = np.zeros(n_bins)
+        self.observed_sum = np.zeros(n_bins)
+
+    def update(self, predicted: np.ndarray, observed: np.ndarray):
+        known = ~np.isnan(observed)
+        predicted, observed = predicted[known], observed[known]
+        bins = np.clip(np.searchsorted(self.edges, predicted, side='right') - 1, 0, len(self.count) - 1)
+        self.count += np.bincount(bins, minlength=len(self.count))
+        self.predicted_sum += np.bincount(bins, weights=predicted, minlength=len(self.count))
+        self.observed_sum += np.bincount(bins, weights=observed, minlength=len(self.count))
+
+    def to_dict(self) -> Dict[str, Any]:
+        filled = self.count > 0
+        predicted = np.divide(self.predicted_sum, self.count, out=np.zeros_like(self.predicted_sum), where=filled)
+        observed = np.divide(self.observed_sum, self.count, out=np.zeros_like(self.observed_sum), where=filled)
+        total = max(int(self.count.sum()), 1)
+        # Expected calibration error: bin gaps weighted by bin size
+        error = float(np.sum(self.count * np.abs(predicted - observed)) / total)
+        return {
+            'calibration_error': round(error, 4),
+            'bins': [
+                {
+                    'range': [round(float(self.edges[i]), 4), round(float(self.edges[i + 1]), 4)],
+                    'count': int(self.count[i]),
+                    'predicted': round(float(predicted[i]), 4),
+                    'observed': round(float(observed[i]), 4)
+                }
+                for i in range(len(self.count)) if filled[i]
+            ]
+        }
+
+
+class LatencyHistogram:
+    """
+    Call latencies in log-spaced buckets (1 us to 100 s)
+
+    Percentiles are read off the bucket upper bounds, capped at the largest
+    recorded latency, so they are accurate to one bucket width (~12% at the
+    default 20 buckets per decade) and never exceed the max.
+    """
+
+    def __init__(self, buckets_per_decade: int = 20, low: float = 1e-6, high: float = 100.0):
+        n_edges = int(round(np.log10(high / low) * buckets_per_decade)) + 1
+        self.edges = np.logspace(np.log10(low), np.log10(high), n_edges)
+        self.counts = np.zeros(n_edges + 1, dtype=np.int64)
+        self.total_seconds = 0.0
+        self.max_seconds = 0.0
+
+    def record(self, seconds: float):
+        self.counts[np.searchsorted(self.edges, seconds)] += 1
+        self.total_seconds += seconds
+        self.max_seconds = max(self.max_seconds, seconds)
+
+    def percentile(self, q: float) -> float:
+        """Upper bound of the bucket holding the q-th percentile (at most the max), in seconds"""
+        total = self.counts.sum()
+        if total == 0:
+            return 0.0
+        bucket = int(np.searchsorted(np.cumsum(self.counts), q / 100 * total))
+        if bucket >= len(self.edges):
+            return self.max_seconds
+        return min(float(self.edges[bucket]), self.max_seconds)
+
+    def to_dict(self) -> Dict[str, Any]:
+        calls = int(self.counts.sum())
+        return {
+            'calls': calls,
+            'mean_ms': round(self.total_seconds / max(calls, 1) * 1000, 4),
+            'p50_ms': round(self.percentile(50) * 1000, 4),
+            'p95_ms': round(self.percentile(95) * 1000, 4),
+            'p99_ms': round(self.percentile(99) * 1000, 4),
+            'max_ms': round(self.max_seconds * 1000, 4),
+            'buckets': [
+                {'le_ms': round(float(self.edges[i]) * 1000, 6) if i < len(self.edges) else None,
+                 'count': int(count)}
+                for i, count in enumerate(self.counts) if count
+            ]
+        }
+
+
+class Evaluation:
+    """Every accumulator for one model"""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.confusion = ConfusionMatrix()
+        self.confidence = CalibrationBins()
+        self.probability = CalibrationBins(low=0, high=100)
+        self.latency = LatencyHistogram()
+        self.rows = 0
+        self.scoring_seconds = 0.0
+
+    def score(self, predictor, X: np.ndarray, actual: np.ndarray,
+              actual_probability: Optional[np.ndarray], batch_size: int):
+        """Score X through predictor.predict_many, batch_size rows per call"""
+        for start in range(0, len(X), batch_size):
+            stop = start + batch_size
+            started = time.perf_counter()
+            predictions = predictor.predict_many(X[start:stop])
+            elapsed = time.perf_counter() - started
+            self.latency.record(elapsed)
+            self.scoring_seconds += elapsed
+
+            predicted = class_index(predictions['priority'])
+            self.confusion.update(actual[start:stop], predicted)
+            self.confidence.update(
+                np.asarray(predictions['confidence']) / 100,
+                (predicted == actual[start:stop]).astype(float)
+            )
+            if actual_probability is not None:
+                self.probability.update(
+                    np.asarray(predictions['paymentProbability']),
+                    actual_probability[start:stop]
+                )
+        self.rows += len(X)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'model': self.name,
+            'rows': self.rows,
+            'rows_per_second': round(self.rows / self.scoring_seconds) if self.scoring_seconds else None,
+            **self.confusion.to_dict(),
+            'confidence_calibration': self.confidence.to_dict(),
+            'probability_calibration': self.probability.to_dict() if self.probability.count.any() else None,
+            'latency': self.latency.to_dict()
+        }
+
+
+def class_index(labels) -> np.ndarray:
+    """Position of every label in LABELS (-1 if it isn't one)"""
+    labels = np.asarray(labels)
+    index = np.full(len(labels), -1)
+    for i, label in enumerate(LABELS):
+        index[labels == label] = i
+    return index
+
+
+def evaluate_stream(predictors: Dict[str, Any], chunks: Iterable, batch_size: int = 1000,
+                    limit: Optional[int] = None) -> List[Dict[str, Any]]:
+    """
+    Score every chunk with every predictor, accumulating metrics as it goes
+
+    Args:
+        predictors: name -> PaymentPredictor (evaluated on the same rows)
+        chunks: iterable of (X, labels, payment_probability or None), X raw
+                features in FEATURE_NAMES order, labels class strings
+        batch_size: rows per predict_many call (the latency histogram is per call)
+        limit: stop after this many rows
+
+    Returns:
+        one report dict per predictor
+    """
+    evaluations = {name: Evaluation(name) for name in predictors}
+    seen = 0
+    for X, labels, probability in chunks:
+        if limit is not None:
+            X, labels = X[:limit - seen], labels[:limit - seen]
+            probability = probability[:limit - seen] if probability is not None else None
+        seen += len(labels)
+        actual = class_index(labels)
+        known = actual >= 0
+        X, actual = X[known], actual[known]
+        probability = probability[known] if probability is not None else None
+
+        for name, predictor in predictors.items():
+            evaluations[name].score(predictor, X, actual, probability, batch_size)
+
+        print(f"  {seen:,} rows scored")
+        if limit is not None and seen >= limit:
+            break
+
+    return [evaluation.to_dict() for evaluation in evaluations.values()]
+
+
+def format_report(reports: List[Dict[str, Any]]) -> str:
+    lines = []
+    for report in reports:
+        latency = report['latency']
+        lines += [
+            f"Model {report['model']}: {report['rows']:,} rows, accuracy {report['accuracy']:.2%}, "
+            f"{report['rows_per_second'] or 0:,} rows/s",
+            f"  {'class':<8} {'precision':>9} {'recall':>7} {'f1':>7} {'support':>12}"
+        ]
+        for label, metrics in report['classes'].items():
+            lines.append(
+                f"  {label:<8} {metrics['precision']:>9.2%} {metrics['recall']:>7.2%} "
+                f"{metrics['f1']:>7.2%} {metrics['support']:>12,}"
+            )
+        lines.append(f"  confusion (rows actual, columns predicted {'/'.join(report['labels'])}):")
+        lines += [f"    {' '.join(f'{count:>12,}' for count in row)}" for row in report['matrix']]
+        lines.append(f"  confidence calibration error: {report['confidence_calibration']['calibration_error']:.4f}")
+        if report['probability_calibration']:
+            lines.append(
+                f"  payment probability calibration error: "
+                f"{report['probability_calibration']['calibration_error']:.2f} points"
+            )
+        lines.append(
+            f"  predict_many latency per call: p50 {latency['p50_ms']:.3f} ms, p95 {latency['p95_ms']:.3f} ms, "
+            f"p99 {latency['p99_ms']:.3f} ms, max {latency['max_ms']:.3f} ms ({latency['calls']:,} calls)"
+        )
+        lines.append('')
+    return '\n'.join(lines).rstrip()
@@ -0,0 +1,169 @@
+"""
+Incremental model refresh
+
+    python training/refresh_model.py --source data/recent_outcomes.csv --new-trees 20 --drop-oldest 20
+
+Loads the registry's active version (its payment_predictor.pkl and
+scaler.pkl), optionally drops the oldest trees, grows new ones on recent
+outcomes with warm_start and writes a new versioned artifact. Cost is
+proportional to the new data, not to the full history that train_model.py
+reads.
+
+The refreshed model is saved only if it added trees and its held-out
+accuracy is at most --max-regression below the active version's on the
+same rows; otherwise nothing is saved and the script exits non-zero.
+
+The scaler is kept as is: the existing trees were trained on its output
+(and the compiled artifact folds it into every threshold), so refitting it
+would silently shift all of them. Retrain in full when the feature
+distribution has drifted enough to matter.
+"""
+
+import argparse
+import copy
+import os
+import sys
+from datetime import datetime, timezone
+
+import joblib
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from prediction.compiled_forest import CompiledForest
+from prediction.registry import ModelRegistry
+from train_model import DEFAULT_CHUNK_SIZE, _open_chunks, evaluate, grow_forest, save_model, scan_chunks
+
+MODEL_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'models')
+
+
+def refresh_model(source, new_trees=20, drop_oldest=0, chunk_size=DEFAULT_CHUNK_SIZE,
+                  trees_per_chunk=None, test_size=0.2, model_dir=MODEL_DIR, output_dir=None,
+                  activate=True, max_regression=0.01):
+    """
+    Grow the current forest on new data and save it as a new version
+
+    Args:
+        source: recent outcomes, any spec train_model accepts ('synthetic:N',
+                CSV/Parquet files, 'postgres:<table or query>')
+        new_trees: trees to add, spread over the source's chunks
+        drop_oldest: trees to remove from the front of the forest first
+                     (keeps the forest size stable across daily refreshes)
+        output_dir: where to write the refreshed model (default: model_dir)
+        activate: make it the registry's active version (running APIs reload it)
+        max_regression: held-out accuracy (as a fraction) the refreshed model
+                        may lose against the active version
+
+    Returns:
+        (model, scaler)
+
+    Raises:
+        ValueError: the refresh added no trees or lost more than
+                    max_regression accuracy - nothing was saved
+    """
+    model, scaler, parent_version = load_active(model_dir)
+    parent = copy.copy(model)
+    parent.estimators_ = list(model.estimators_)
+
+    if drop_oldest >= len(model.estimators_):
+        raise ValueError(f"Can't drop {drop_oldest} of {len(model.estimators_)} trees")
+
+    # Seed new trees from the parent version - warm_start would otherwise
+    # reuse the seeds of trees that were dropped or already exist
+    seed = int(parent_version, 16) % (2 ** 31)
+    model.estimators_ = model.estimators_[drop_oldest:]
+    model.set_params(n_estimators=len(model.estimators_), warm_start=True, random_state=seed)
+
+    chunks = _open_chunks(source, chunk_size, seed)
+    n_chunks, n_rows, classes = scan_chunks(chunks, test_size, seed)
+    if not classes <= set(model.classes_):
+        raise ValueError(f"New data has classes the model doesn't know: {sorted(classes - set(model.classes_))}")
+
+    print(f"Refreshing model {parent_version}: dropping {drop_oldest} oldest tree(s), "
+          f"adding {new_trees} on {n_rows:,} new rows in {n_chunks} chunk(s)...")
+    X_test, y_test = grow_forest(
+        model, scaler, chunks, set(model.classes_), n_chunks, new_trees,
+        trees_per_chunk=trees_per_chunk, test_size=test_size, seed=seed
+    )
+
+    # Chunks missing a class are skipped, so the refresh may have grown nothing
+    trees_added = len(model.estimators_) - len(parent.estimators_) + drop_oldest
+    if trees_added <= 0:
+        raise ValueError(f"No trees were added (no chunk covered every class) - {parent_version} stays active")
+
+    print("\nCurrent model on held-out new data:")
+    parent_accuracy = evaluate(parent, scaler.transform(X_test), y_test)
+    print("Refreshed model on held-out new data:")
+    accuracy = evaluate(model, scaler.transform(X_test), y_test)
+    if parent_accuracy - accuracy > max_regression:
+        raise ValueError(
+            f"Refreshed model lost {parent_accuracy - accuracy:.2%} held-out accuracy "
+            f"({parent_accuracy:.2%} -> {accuracy:.2%}), more than {max_regression:.2%} - "
+            f"not saved, {parent_version} stays active"
+        )
+
+    save_model(model, scaler, model_dir=output_dir or model_dir, activate=activate, metadata={
+        'training': 'incremental',
+        'parent_version': parent_version,
+        'source': source,
+        'rows': n_rows,
+        'trees_dropped': drop_oldest,
+        'trees_added': trees_added,
+        'holdout_accuracy': round(accuracy, 4),
+        'parent_holdout_accuracy': round(parent_accuracy, 4),
+        'refreshed_at': datetime.now(timezone.utc).isoformat(timespec='seconds')
+    })
+
+    return model, scaler
+
+
+def load_active(model_dir=MODEL_DIR):
+    """
+    The registry's active model and scaler
+
+    Before any version is activated, or for versions published without
+    their pickles, the pickles in model_dir are used - if they are the
+    active version.
+
+    Returns:
+        (model, scaler, version)
+    """
+    registry = ModelRegistry(os.path.join(model_dir, 'registry'))
+    active = registry.current()
+    for directory in ([registry.path(active)] if active else []) + [model_dir]:
+        model_path = os.path.join(directory, 'payment_predictor.pkl')
+        if not os.path.isfile(model_path):
+            continue
+        model = joblib.load(model_path)
+        scaler = joblib.load(os.path.join(directory, 'scaler.pkl'))
+        version = CompiledForest.from_sklearn(model, scaler).model_version
+        if active is None or version == active:
+            return model, scaler, version
+    raise ValueError(f"No payment_predictor.pkl for the active version {active} - retrain with train_model.py")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Refresh the payment model on recent outcomes')
+    parser.add_argument('--source', required=True,
+                        help="recent outcomes: 'synthetic:N', CSV/Parquet files or 'postgres:<table|query>'")
+    parser.add_argument('--new-trees', type=int, default=20)
+    parser.add_argument('--drop-oldest', type=int, default=0)
+    parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE)
+    parser.add_argument('--model-dir', default=MODEL_DIR)
+    parser.add_argument('--output-dir', help='write the refreshed model here (default: --model-dir)')
+    parser.add_argument('--no-activate', action='store_true',
+                        help="publish to the registry without switching the active version")
+    parser.add_argument('--max-regression', type=float, default=0.01,
+                        help='held-out accuracy the refresh may lose (fraction, default 0.01)')
+    args = parser.parse_args()
+
+    refresh_model(
+        args.source,
+        new_trees=args.new_trees,
+        drop_oldest=args.drop_oldest,
+        chunk_size=args.chunk_size,
+        model_dir=args.model_dir,
+        output_dir=args.output_dir,
+        activate=not args.no_activate,
+        max_regression=args.max_regression
+    )
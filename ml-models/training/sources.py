@@ -0,0 +1,108 @@
+"""
+Training Data Sources
+Chunked readers for out-of-core training (CSV, Parquet, Postgres)
+"""
+
+import glob
+import os
+import sys
+from typing import Callable, Iterator, List
+
+import pandas as pd
+
+PROJECT_ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..')
+
+LABEL_COLUMN = 'payment_class'
+PROBABILITY_COLUMN = 'payment_probability'
+
+
+def open_source(spec: str, feature_columns: List[str],
+                chunk_size: int = 1_000_000) -> Callable[[], Iterator[pd.DataFrame]]:
+    """
+    Resolve a source spec to a function that iterates its DataFrame chunks
+
+    The returned function can be called again for another pass (the
+    training pipeline makes two). Specs:
+
+        data/history.parquet, data/*.csv, data/   Parquet/CSV files
+        postgres:table_name                       whole table
+        postgres:SELECT ... FROM ...              custom query
+
+    Chunks carry feature_columns plus payment_class (derived from
+    payment_probability when only that is present).
+    """
+    if spec.startswith('postgres:'):
+        target = spec.split(':', 1)[1].strip()
+        return lambda: _labelled(iter_postgres(target, feature_columns, chunk_size))
+
+    paths = _expand_paths(spec)
+    return lambda: _labelled(
+        chunk for path in paths for chunk in iter_file(path, feature_columns, chunk_size)
+    )
+
+
+def iter_file(path: str, columns: List[str], chunk_size: int) -> Iterator[pd.DataFrame]:
+    """Read one CSV or Parquet file chunk_size rows at a time"""
+    if path.endswith('.parquet'):
+        try:
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise ImportError("Parquet training data needs pyarrow (pip install -r training/requirements.txt)")
+
+        parquet = pq.ParquetFile(path)
+        wanted = [name for name in parquet.schema_arrow.names if name in columns + [LABEL_COLUMN, PROBABILITY_COLUMN]]
+        for batch in parquet.iter_batches(batch_size=chunk_size, columns=wanted):
+            yield batch.to_pandas()
+    else:
+        wanted = set(columns + [LABEL_COLUMN, PROBABILITY_COLUMN])
+        yield from pd.read_csv(path, chunksize=chunk_size, usecols=lambda name: name in wanted)
+
+
+def iter_postgres(target: str, columns: List[str], chunk_size: int) -> Iterator[pd.DataFrame]:
+    """Stream a table or query through a server-side cursor"""
+    sys.path.append(os.path.join(PROJECT_ROOT, 'pipeline'))
+    from connectors.db_connector import DBConnector
+
+    if target.lower().startswith('select'):
+        query = target
+    else:
+        from psycopg2 import sql
+        query = sql.SQL('SELECT * FROM {}').format(sql.Identifier(*target.split('.')))
+
+    db = DBConnector()
+    if db.connect() is None:
+        raise ConnectionError("Could not connect to the training database")
+    try:
+        for names, rows in db.stream_query(query, chunk_size=chunk_size, name='collectiq_training'):
+            df = pd.DataFrame.from_records(rows, columns=names)
+            yield df[[name for name in names if name in columns + [LABEL_COLUMN, PROBABILITY_COLUMN]]]
+    finally:
+        db.close()
+
+
+def _expand_paths(spec: str) -> List[str]:
+    if os.path.isdir(spec):
+        pattern = os.path.join(spec, '*')
+    else:
+        pattern = spec
+    paths = sorted(
+        path for path in glob.glob(pattern)
+        if path.endswith(('.csv', '.csv.gz', '.parquet'))
+    )
+    if not paths:
+        raise FileNotFoundError(f"No CSV or Parquet training files match {spec}")
+    return paths
+
+
+def _labelled(chunks: Iterator[pd.DataFrame]) -> Iterator[pd.DataFrame]:
+    for chunk in chunks:
+        if LABEL_COLUMN not in chunk:
+            if PROBABILITY_COLUMN not in chunk:
+                raise ValueError(f"Training data needs a {LABEL_COLUMN} or {PROBABILITY_COLUMN} column")
+            chunk[LABEL_COLUMN] = pd.cut(
+                chunk[PROBABILITY_COLUMN],
+                bins=[0, 40, 70, 100],
+                labels=['low', 'medium', 'high'],
+                include_lowest=True
+            )
+        yield chunk
@@ -5,80 +5,122 @@ from sklearn.model_selection import train_test_split
 from sklearn.preprocessing import StandardScaler
 from sklearn.metrics import classification_report, accuracy_score
 import joblib
+import argparse
 import os
+import shutil
+import sys
+import warnings
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from prediction.compiled_forest import CompiledForest
+from prediction.registry import ModelRegistry
+from sources import open_source
+import tuning
+
+FEATURE_COLUMNS = ['overdue_days', 'amount', 'historical_payments', 'contact_frequency']
+
+# Rows read per chunk when training out of core
+DEFAULT_CHUNK_SIZE = 1_000_000
+
+# Score adjustments for the synthetic target: np.digitize bin edges and the
+# points for each bin (overdue < 30, < 60, < 90, < 120, >= 120 days;
+# amount < 2000, < 5000, < 10000, >= 10000)
+OVERDUE_EDGES = np.array([30, 60, 90, 120])
+OVERDUE_POINTS = np.array([25, 15, 5, -10, -25])
+AMOUNT_EDGES = np.array([2000, 5000, 10000])
+AMOUNT_POINTS = np.array([15, 10, 0, -10])
+
+# Independent random streams, one per column (see iter_training_data)
+STREAMS = ['overdue_days', 'amount', 'historical_payments', 'contact_frequency', 'noise']
+
 
 # Generate synthetic training data
-def generate_training_data(n_samples=1000):
-    np.random.seed(42)
-    
-    data = {
-        'overdue_days': np.random.randint(1, 180, n_samples),
-        'amount': np.random.uniform(100, 20000, n_samples),
-        'historical_payments': np.random.randint(0, 10, n_samples),
-        'contact_frequency': np.random.randint(0, 20, n_samples),
-    }
-    
-    df = pd.DataFrame(data)
+def generate_training_data(n_samples=1000, seed=42):
+    """
+    Synthetic training set as one DataFrame
+
+    Same rows as concatenating iter_training_data(n_samples, seed=seed).
+    """
+    return next(iter_training_data(n_samples, chunk_size=max(n_samples, 1), seed=seed))
+
+def iter_training_data(n_samples, chunk_size=1_000_000, seed=42):
+    """
+    Synthetic training set as DataFrame chunks of at most chunk_size rows
     
-    # Generate target based on features (probability of payment)
-    # Higher historical payments, lower overdue days, moderate amount = higher probability
-    probability = np.zeros(n_samples)
+    Each column is drawn from its own random stream, so the data depends only
+    on n_samples and seed - not on chunk_size - and a smaller n_samples gives
+    a prefix of a larger one. Peak memory is bounded by chunk_size.
+    """
+    generators = [np.random.default_rng(child) for child in np.random.SeedSequence(seed).spawn(len(STREAMS))]
+    overdue_rng, amount_rng, payments_rng, contacts_rng, noise_rng = generators
     
-    for i in range(n_samples):
-        score = 50  # Base score
-        
-        # Overdue days impact (negative)
-        if df.loc[i, 'overdue_days'] < 30:
-            score += 25
-        elif df.loc[i, 'overdue_days'] < 60:
-            score += 15
-        elif df.loc[i, 'overdue_days'] < 90:
-            score += 5
-        elif df.loc[i, 'overdue_days'] < 120:
-            score -= 10
-        else:
-            score -= 25
+    for start in range(0, n_samples, chunk_size):
+        size = min(chunk_size, n_samples - start)
         
-        # Amount impact
-        if df.loc[i, 'amount'] < 2000:
-            score += 15
-        elif df.loc[i, 'amount'] < 5000:
-            score += 10
-        elif df.loc[i, 'amount'] < 10000:
-            score += 0
-        else:
-            score -= 10
-        
-        # Historical payments (positive)
-        score += df.loc[i, 'historical_payments'] * 5
+        df = pd.DataFrame({
+            'overdue_days': overdue_rng.integers(1, 180, size),
+            'amount': amount_rng.uniform(100, 20000, size),
+            'historical_payments': payments_rng.integers(0, 10, size),
+            'contact_frequency': contacts_rng.integers(0, 20, size),
+        }, index=pd.RangeIndex(start, start + size))
         
-        # Contact frequency (positive but diminishing)
-        score += min(df.loc[i, 'contact_frequency'] * 2, 15)
+        # Generate target based on features (probability of payment)
+        # Higher historical payments, lower overdue days, moderate amount = higher probability
+        score = (
+            50.0  # Base score
+            + OVERDUE_POINTS[np.digitize(df['overdue_days'].to_numpy(), OVERDUE_EDGES)]
+            + AMOUNT_POINTS[np.digitize(df['amount'].to_numpy(), AMOUNT_EDGES)]
+            + df['historical_payments'].to_numpy() * 5
+            # Contact frequency (positive but diminishing)
+            + np.minimum(df['contact_frequency'].to_numpy() * 2, 15)
+            # Add some noise
+            + noise_rng.normal(0, 10, size)
+        )
+        df['payment_probability'] = np.clip(score, 0, 100)
         
-        # Add some noise
-        score += np.random.normal(0, 10)
+        # Create class labels (high/medium/low); include_lowest keeps a
+        # clamped probability of exactly 0 in 'low' instead of NaN
+        df['payment_class'] = pd.cut(
+            df['payment_probability'],
+            bins=[0, 40, 70, 100],
+            labels=['low', 'medium', 'high'],
+            include_lowest=True
+        )
         
-        # Clamp
-        probability[i] = max(0, min(100, score))
-    
-    df['payment_probability'] = probability
-    
-    # Create class labels (high/medium/low)
-    df['payment_class'] = pd.cut(
-        df['payment_probability'],
-        bins=[0, 40, 70, 100],
-        labels=['low', 'medium', 'high']
-    )
-    
-    return df
+        yield df
+
+# Production forest settings; override with --params (see --tune)
+FOREST_PARAMS = {
+    'n_estimators': 100,
+    'max_depth': 10,
+    'random_state': 42,
+    'class_weight': 'balanced'
+}
+
+def new_forest(**params):
+    return RandomForestClassifier(**{**FOREST_PARAMS, **params})
 
 # Train the model
-def train_model():
+def train_model(source=None, chunk_size=DEFAULT_CHUNK_SIZE, n_samples=1000, params=None):
+    """
+    Train and save the payment model
+    
+    Args:
+        source: None to train in memory on n_samples synthetic rows, or a
+                training data spec to train out of core, chunk_size rows at
+                a time (see train_model_out_of_core)
+        params: forest parameters overriding FOREST_PARAMS
+    """
+    params = params or {}
+    if source is not None:
+        return train_model_out_of_core(source, chunk_size, params=params)
+    
     print("Generating training data...")
-    df = generate_training_data(1000)
+    df = generate_training_data(n_samples)
     
     # Features
-    X = df[['overdue_days', 'amount', 'historical_payments', 'contact_frequency']]
+    X = df[FEATURE_COLUMNS]
     y = df['payment_class']
     
     # Split data
@@ -93,45 +135,270 @@ def train_model():
     
     # Train Random Forest
     print("Training Random Forest model...")
-    model = RandomForestClassifier(
-        n_estimators=100,
-        max_depth=10,
-        random_state=42,
-        class_weight='balanced'
-    )
+    model = new_forest(**params)
     model.fit(X_train_scaled, y_train)
     
-    # Evaluate
+    evaluate(model, X_test_scaled, y_test)
+    save_model(model, scaler, metadata={'training': 'full', 'rows': len(X_train)})
+    
+    return model, scaler
+
+def train_model_out_of_core(source, chunk_size=DEFAULT_CHUNK_SIZE, params=None,
+                            trees_per_chunk=None, test_size=0.2, max_test_rows=200_000, seed=42):
+    """
+    Train from a dataset larger than memory, one chunk at a time
+    
+    Pass 1 fits the scaler incrementally (partial_fit). Pass 2 grows the
+    forest with warm_start: every chunk adds trees fitted on that chunk
+    alone (see grow_forest). Peak memory is one chunk plus the forest.
+    
+    A seeded test_size fraction of every chunk is held out from both passes;
+    the first max_test_rows held-out rows are kept for evaluation.
+    
+    Args:
+        source: 'synthetic:N', CSV/Parquet file, glob or directory, or
+                'postgres:<table or SELECT query>' (see training/sources.py)
+    """
+    chunks = _open_chunks(source, chunk_size, seed)
+    params = {**FOREST_PARAMS, **(params or {})}
+    n_estimators = params.pop('n_estimators')
+    
+    print(f"Pass 1: fitting scaler on {source} ({chunk_size:,}-row chunks)...")
+    scaler = StandardScaler()
+    n_chunks, n_rows, classes = scan_chunks(chunks, test_size, seed, scaler)
+    
+    print(f"Pass 2: growing forest on {n_rows:,} rows in {n_chunks} chunk(s)...")
+    model = new_forest(**params, n_estimators=0, warm_start=True)
+    X_test, y_test = grow_forest(
+        model, scaler, chunks, classes, n_chunks, n_estimators,
+        trees_per_chunk=trees_per_chunk, test_size=test_size,
+        max_test_rows=max_test_rows, seed=seed
+    )
+    
+    evaluate(model, scaler.transform(X_test), y_test)
+    save_model(model, scaler, metadata={'training': 'out_of_core', 'source': source, 'rows': n_rows})
+    
+    return model, scaler
+
+def scan_chunks(chunks, test_size=0.2, seed=42, scaler=None):
+    """
+    One pass over the training rows of every chunk (held-out rows skipped)
+    
+    Returns (chunk count, row count, set of classes); partial_fits scaler
+    along the way when one is given.
+    """
+    classes = set()
+    n_chunks = 0
+    n_rows = 0
+    for i, chunk in enumerate(chunks()):
+        X, y, test = _split_chunk(chunk, i, test_size, seed)
+        if test.all():
+            continue
+        if scaler is not None:
+            scaler.partial_fit(X[~test])
+        classes.update(np.unique(y[~test]))
+        n_chunks += 1
+        n_rows += int((~test).sum())
+    
+    if n_rows == 0:
+        raise ValueError("No training rows in the source")
+    return n_chunks, n_rows, classes
+
+def grow_forest(model, scaler, chunks, classes, n_chunks, new_trees, trees_per_chunk=None,
+                test_size=0.2, max_test_rows=200_000, seed=42):
+    """
+    Add trees to a warm_start forest, each chunk's share fitted on that chunk
+    
+    Every chunk adds trees_per_chunk trees, or by default new_trees spread
+    evenly over the n_chunks chunks (at least one per chunk). The scaler is
+    only applied, never refitted.
+    
+    A chunk missing a class is merged into the next one, so it grows no
+    trees of its own; a warning reports how many fewer trees were grown.
+    
+    Returns:
+        (X_test, y_test): raw held-out rows, up to max_test_rows
+    """
+    X_test, y_test = [], []
+    held_out = 0
+    pending = None
+    fitted_chunks = 0
+    start_trees = len(getattr(model, 'estimators_', []))
+    for i, chunk in enumerate(chunks()):
+        X, y, test = _split_chunk(chunk, i, test_size, seed)
+        
+        if held_out < max_test_rows and test.any():
+            keep = np.flatnonzero(test)[:max_test_rows - held_out]
+            X_test.append(X[keep])
+            y_test.append(y[keep])
+            held_out += len(keep)
+        
+        X_train, y_train = X[~test], y[~test]
+        if pending is not None:
+            X_train = np.concatenate([pending[0], X_train])
+            y_train = np.concatenate([pending[1], y_train])
+            pending = None
+        
+        # Every tree must see every class, or the forest's class
+        # columns stop lining up - carry a short chunk into the next one
+        if set(np.unique(y_train)) != classes:
+            pending = (X_train, y_train)
+            continue
+        
+        fitted_chunks += 1
+        if trees_per_chunk:
+            model.n_estimators += trees_per_chunk
+        else:
+            model.n_estimators = start_trees + max(round(new_trees * fitted_chunks / n_chunks), fitted_chunks)
+        with warnings.catch_warnings():
+            # 'balanced' weights are per chunk - fine, chunks are samples of one population
+            warnings.filterwarnings('ignore', message='class_weight presets')
+            model.fit(scaler.transform(X_train), y_train)
+        print(f"  chunk {i + 1}: {len(X_train):,} rows -> {model.n_estimators} trees")
+    
+    if pending is not None and len(pending[1]):
+        print(f"Warning: last {len(pending[1]):,} rows don't cover every class and were not trained on")
+    expected = trees_per_chunk * n_chunks if trees_per_chunk else max(new_trees, n_chunks)
+    grown = len(getattr(model, 'estimators_', [])) - start_trees
+    if grown < expected:
+        print(f"Warning: grew {grown} of {expected} trees - {n_chunks - fitted_chunks} of {n_chunks} "
+              f"chunks were merged into the next one or left untrained")
+    if not X_test:
+        raise ValueError("No held-out rows to evaluate on - use more data or a larger test_size")
+    
+    return np.concatenate(X_test), np.concatenate(y_test)
+
+def tune_model(source=None, n_samples=100_000, chunk_size=DEFAULT_CHUNK_SIZE, grid=None,
+               n_folds=3, workers=None, latency_budget_ms=None, report_path='tuning-report.json'):
+    """
+    Search forest parameters for the best accuracy/latency/size trade-off
+    
+    Tunes on n_samples rows - synthetic, or the first rows of source - and
+    writes the report (every candidate plus the Pareto front) to report_path.
+    See training/tuning.py.
+    """
+    if source is None:
+        df = generate_training_data(n_samples)
+    else:
+        taken = []
+        for chunk in _open_chunks(source, min(chunk_size, n_samples), seed=42):
+            taken.append(chunk.dropna(subset=FEATURE_COLUMNS + ['payment_class']))
+            if sum(len(part) for part in taken) >= n_samples:
+                break
+        df = pd.concat(taken).iloc[:n_samples]
+    
+    report = tuning.tune(
+        df[FEATURE_COLUMNS].to_numpy(dtype=float),
+        df['payment_class'].astype(str).to_numpy(),
+        grid=grid,
+        n_folds=n_folds,
+        workers=workers,
+        latency_budget_ms=latency_budget_ms,
+        fixed_params=FOREST_PARAMS
+    )
+    tuning.write_report(report, report_path)
+    
+    print(f"\nPareto front (accuracy vs. latency vs. size) of {len(report['candidates'])} candidates:")
+    print(tuning.format_report(report))
+    print(f"\nReport written to: {report_path}")
+    return report
+
+def _open_chunks(source, chunk_size, seed):
+    if source.startswith('synthetic:'):
+        n_samples = int(source.split(':', 1)[1])
+        return lambda: iter_training_data(n_samples, chunk_size=chunk_size, seed=seed)
+    return open_source(source, FEATURE_COLUMNS, chunk_size)
+
+def _split_chunk(chunk, index, test_size, seed):
+    """Features, labels and a deterministic held-out mask for one chunk"""
+    chunk = chunk.dropna(subset=FEATURE_COLUMNS + ['payment_class'])
+    X = chunk[FEATURE_COLUMNS].to_numpy(dtype=float)
+    y = chunk['payment_class'].astype(str).to_numpy()
+    test = np.random.default_rng([seed, index]).random(len(chunk)) < test_size
+    return X, y, test
+
+def evaluate(model, X_test_scaled, y_test):
     y_pred = model.predict(X_test_scaled)
     accuracy = accuracy_score(y_test, y_pred)
     
     print(f"\nModel Accuracy: {accuracy:.2%}")
     print("\nClassification Report:")
     print(classification_report(y_test, y_pred))
+    return accuracy
+
+def save_model(model, scaler, metadata=None, model_dir=None, activate=True):
+    """
+    Write the pickles and the compiled serving artifact, and publish it to
+    the model registry
     
+    metadata (how the model was trained) is recorded in the compiled
+    artifact's manifest. The pickles are published with the artifact, so
+    refresh_model.py can grow any version further. activate=False publishes
+    without switching the active version (activate later with python -m
+    prediction.registry).
+    """
     # Save model and scaler
-    model_dir = os.path.join(os.path.dirname(__file__), '..', 'models')
+    model_dir = model_dir or os.path.join(os.path.dirname(__file__), '..', 'models')
     os.makedirs(model_dir, exist_ok=True)
     
     model_path = os.path.join(model_dir, 'payment_predictor.pkl')
     scaler_path = os.path.join(model_dir, 'scaler.pkl')
     
+    # warm_start only matters while training
+    model.warm_start = False
     joblib.dump(model, model_path)
     joblib.dump(scaler, scaler_path)
     
+    # Compiled serving artifact (scaler folded into the tree thresholds)
+    compiled_path = os.path.join(model_dir, 'payment_predictor')
+    compiled = CompiledForest.from_sklearn(model, scaler)
+    compiled.save(compiled_path, metadata=metadata)
+    for path in (model_path, scaler_path):
+        shutil.copy2(path, compiled_path)
+    
+    # Publish to the registry and make it the active version - running APIs
+    # pick it up without a restart
+    registry = ModelRegistry(os.path.join(model_dir, 'registry'))
+    registry.publish(compiled_path, activate=activate)
+    
     print(f"\nModel saved to: {model_path}")
     print(f"Scaler saved to: {scaler_path}")
+    print(f"Compiled model saved to: {compiled_path} (version {compiled.model_version})")
+    print(f"Published to registry: {registry.path(compiled.model_version)}"
+          f"{' (active)' if activate else ''}")
     
     # Feature importance
     feature_importance = pd.DataFrame({
-        'feature': X.columns,
+        'feature': FEATURE_COLUMNS,
         'importance': model.feature_importances_
     }).sort_values('importance', ascending=False)
     
     print("\nFeature Importance:")
     print(feature_importance)
-    
-    return model, scaler
 
 if __name__ == '__main__':
-    train_model()
+    parser = argparse.ArgumentParser(description='Train the payment prediction model')
+    parser.add_argument('--source', help="train out of core from 'synthetic:N', CSV/Parquet files or 'postgres:<table|query>'")
+    parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE, help='rows per chunk (out of core)')
+    parser.add_argument('--samples', type=int, help='rows to train on in memory (default 1000) or tune on (default 100000)')
+    parser.add_argument('--params', default='', help="forest parameters, e.g. 'n_estimators=50,max_depth=8'")
+    parser.add_argument('--tune', action='store_true', help='search forest parameters instead of training')
+    parser.add_argument('--grid', help="tuning grid, e.g. 'n_estimators=25,50,100;max_depth=6,8,None'")
+    parser.add_argument('--folds', type=int, default=3)
+    parser.add_argument('--workers', type=int, help='tuning processes (default: CPU count)')
+    parser.add_argument('--latency-budget-ms', type=float, help='single-row p50 budget for the recommendation')
+    parser.add_argument('--report', default='tuning-report.json')
+    args = parser.parse_args()
+    
+    if args.tune:
+        tune_model(
+            args.source, args.samples or 100_000, args.chunk_size,
+            grid=tuning.parse_grid(args.grid) if args.grid else None,
+            n_folds=args.folds,
+            workers=args.workers,
+            latency_budget_ms=args.latency_budget_ms,
+            report_path=args.report
+        )
+    else:
+        train_model(args.source, args.chunk_size, args.samples or 1000,
+                    params=tuning.parse_params(args.params))
@@ -0,0 +1,258 @@
+"""
+Hyperparameter Tuning
+Parallel grid search scored on accuracy, serving latency and model size
+"""
+
+import itertools
+import json
+import os
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.model_selection import StratifiedKFold
+from sklearn.preprocessing import StandardScaler
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from prediction.compiled_forest import CompiledForest
+
+DEFAULT_GRID = {
+    'n_estimators': [25, 50, 100, 200],
+    'max_depth': [6, 8, 10, 12],
+    'min_samples_leaf': [1, 10]
+}
+
+# Every pool worker fits one forest at a time
+WORKER_PARAMS = {'n_jobs': 1}
+
+# Objectives for the Pareto front: (result key, True if higher is better)
+OBJECTIVES = [
+    ('accuracy', True),
+    ('single_row_p50_ms', False),
+    ('batch_ms_per_1k', False),
+    ('model_bytes', False)
+]
+
+# Folds and fixed parameters shared with pool workers (see _init_worker)
+_folds = None
+
+
+def parse_params(spec: str) -> Dict[str, Any]:
+    """'n_estimators=50,max_depth=8' -> {'n_estimators': 50, 'max_depth': 8}"""
+    params = {}
+    for part in filter(None, spec.split(',')):
+        name, _, value = part.partition('=')
+        params[name.strip()] = _parse_value(value.strip())
+    return params
+
+
+def parse_grid(spec: str) -> Dict[str, List[Any]]:
+    """'n_estimators=25,50;max_depth=6,None' -> {'n_estimators': [25, 50], ...}"""
+    grid = {}
+    for part in filter(None, spec.split(';')):
+        name, _, values = part.partition('=')
+        grid[name.strip()] = [_parse_value(value.strip()) for value in values.split(',')]
+    return grid
+
+
+def tune(X: np.ndarray, y: np.ndarray, grid: Optional[Dict[str, List[Any]]] = None,
+         n_folds: int = 3, workers: Optional[int] = None,
+         latency_budget_ms: Optional[float] = None,
+         fixed_params: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """
+    Cross-validate every grid candidate in a process pool
+
+    Folds are split and scaled once, written as float32 .npy files and
+    memory-mapped by every worker, so the pool shares one copy of the data
+    and sklearn doesn't need to convert it. Workers return each candidate's
+    fold-0 forest compiled for serving; its single-row and batch latency are
+    then measured here, one candidate at a time, on otherwise idle cores.
+
+    Args:
+        X, y: raw features (FEATURE_COLUMNS order) and class labels
+        latency_budget_ms: single-row p50 budget used to pick a recommendation
+        fixed_params: parameters every candidate shares, overridden by the
+                      grid's (train_model passes FOREST_PARAMS)
+
+    Returns:
+        report dict - every candidate, the Pareto front and the recommendation
+    """
+    grid = grid or DEFAULT_GRID
+    # Fixed-width labels - object arrays can't be memory-mapped
+    y = np.asarray(y).astype(str)
+    candidates = [dict(zip(grid, values)) for values in itertools.product(*grid.values())]
+    fixed_params = {**(fixed_params or {}), **WORKER_PARAMS}
+    workers = workers or os.cpu_count() or 1
+
+    splits = list(StratifiedKFold(n_folds, shuffle=True, random_state=42).split(X, y))
+    scalers = [StandardScaler().fit(X[train]) for train, _ in splits]
+
+    with tempfile.TemporaryDirectory(prefix='collectiq-tuning-') as fold_dir:
+        started = time.perf_counter()
+        for i, ((train, validation), scaler) in enumerate(zip(splits, scalers)):
+            for name, rows in (('train', train), ('validation', validation)):
+                np.save(os.path.join(fold_dir, f"X_{name}_{i}.npy"),
+                        scaler.transform(X[rows]).astype(np.float32))
+                np.save(os.path.join(fold_dir, f"y_{name}_{i}.npy"), y[rows])
+        print(f"Prepared {n_folds} scaled folds of {len(X):,} rows in {time.perf_counter() - started:.1f}s")
+
+        print(f"Cross-validating {len(candidates)} candidates on {workers} worker(s)...")
+        started = time.perf_counter()
+        with ProcessPoolExecutor(workers, initializer=_init_worker,
+                                 initargs=(fold_dir, n_folds, scalers[0], fixed_params)) as pool:
+            evaluated = list(pool.map(_evaluate, candidates))
+        print(f"Cross-validation took {time.perf_counter() - started:.1f}s")
+
+    # Latency is measured on raw rows - the compiled forest has the scaler folded in
+    X_latency = np.ascontiguousarray(X[splits[0][1]], dtype=np.float64)
+    results = []
+    for params, (accuracy, accuracy_std, fit_seconds, forest) in zip(candidates, evaluated):
+        results.append({
+            'params': params,
+            'accuracy': round(accuracy, 4),
+            'accuracy_std': round(accuracy_std, 4),
+            'fit_seconds': round(fit_seconds, 3),
+            **measure_latency(forest, X_latency),
+            'model_bytes': int(forest.nbytes),
+            'n_nodes': int(forest.n_nodes)
+        })
+
+    front = pareto_front(results)
+    for i, result in enumerate(results):
+        result['pareto'] = i in front
+
+    return {
+        'generated_at': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'rows': int(len(X)),
+        'folds': n_folds,
+        'workers': workers,
+        'grid': grid,
+        'latency_budget_ms': latency_budget_ms,
+        'recommended': recommend(results, latency_budget_ms),
+        'pareto_front': [results[i] for i in front],
+        'candidates': results
+    }
+
+
+def pareto_front(results: List[Dict[str, Any]]) -> List[int]:
+    """Indices of candidates no other candidate beats on every objective"""
+    points = np.array([
+        [result[key] if higher else -result[key] for key, higher in OBJECTIVES]
+        for result in results
+    ])
+    front = []
+    for i, point in enumerate(points):
+        dominated = np.any(np.all(points >= point, axis=1) & np.any(points > point, axis=1))
+        if not dominated:
+            front.append(i)
+    return front
+
+
+def recommend(results: List[Dict[str, Any]], latency_budget_ms: Optional[float] = None) -> Optional[Dict[str, Any]]:
+    """Most accurate Pareto candidate within the latency budget (smallest on ties)"""
+    eligible = [
+        result for result in results
+        if result.get('pareto', True)
+        and (latency_budget_ms is None or result['single_row_p50_ms'] <= latency_budget_ms)
+    ]
+    if not eligible:
+        return None
+    return max(eligible, key=lambda result: (result['accuracy'], -result['model_bytes']))
+
+
+def format_report(report: Dict[str, Any]) -> str:
+    lines = [
+        f"{'params':<52} {'accuracy':>9} {'p50 ms':>8} {'p99 ms':>8} {'ms/1k':>8} {'size KB':>9}"
+    ]
+    for result in report['pareto_front']:
+        params = ', '.join(f"{name}={value}" for name, value in result['params'].items())
+        lines.append(
+            f"{params:<52} {result['accuracy']:>9.2%} {result['single_row_p50_ms']:>8.3f} "
+            f"{result['single_row_p99_ms']:>8.3f} {result['batch_ms_per_1k']:>8.2f} "
+            f"{result['model_bytes'] / 1024:>9.0f}"
+        )
+    recommended = report['recommended']
+    if recommended:
+        params = ','.join(f"{name}={value}" for name, value in recommended['params'].items())
+        lines.append(f"\nRecommended: {params}  (train with --params '{params}')")
+    else:
+        lines.append(f"\nNo candidate meets the {report['latency_budget_ms']} ms single-row budget")
+    return '\n'.join(lines)
+
+
+def write_report(report: Dict[str, Any], path: str):
+    with open(path, 'w') as f:
+        json.dump(report, f, indent=2)
+
+
+def measure_latency(forest, X, single_rows=300, batch_rows=10_000, repeat=3):
+    """Best-of-repeat single-row p50/p99 and batch time, after a warm-up"""
+    rows = X[:single_rows]
+    for row in rows[:20]:
+        forest.predict_proba(row[np.newaxis])
+
+    p50, p99 = [], []
+    for _ in range(repeat):
+        single = [_timed(forest.predict_proba, row[np.newaxis]) for row in rows]
+        p50.append(np.percentile(single, 50))
+        p99.append(np.percentile(single, 99))
+
+    batch = X[:batch_rows]
+    best = min(_timed(forest.predict_proba, batch) for _ in range(repeat))
+    return {
+        'single_row_p50_ms': round(float(min(p50)) * 1000, 4),
+        'single_row_p99_ms': round(float(min(p99)) * 1000, 4),
+        'batch_ms_per_1k': round(best * 1000 * 1000 / len(batch), 3)
+    }
+
+
+def _init_worker(fold_dir, n_folds, scaler, fixed_params):
+    global _folds
+    _folds = {
+        'scaler': scaler,
+        'fixed_params': fixed_params,
+        'folds': [
+            tuple(np.load(os.path.join(fold_dir, f"{array}_{i}.npy"), mmap_mode='r')
+                  for array in ('X_train', 'y_train', 'X_validation', 'y_validation'))
+            for i in range(n_folds)
+        ]
+    }
+
+
+def _evaluate(params):
+    """Mean/std validation accuracy, mean fit time and the compiled fold-0 forest"""
+    accuracies = []
+    fit_seconds = []
+    forest = None
+    for i, (X_train, y_train, X_validation, y_validation) in enumerate(_folds['folds']):
+        model = RandomForestClassifier(**{**_folds['fixed_params'], **params})
+        started = time.perf_counter()
+        model.fit(X_train, y_train)
+        fit_seconds.append(time.perf_counter() - started)
+        accuracies.append(float(np.mean(model.predict(X_validation) == y_validation)))
+        if i == 0:
+            forest = CompiledForest.from_sklearn(model, _folds['scaler'])
+    return float(np.mean(accuracies)), float(np.std(accuracies)), float(np.mean(fit_seconds)), forest
+
+
+def _timed(fn, *args):
+    started = time.perf_counter()
+    fn(*args)
+    return time.perf_counter() - started
+
+
+def _parse_value(value):
+    if value == 'None':
+        return None
+    for cast in (int, float):
+        try:
+            return cast(value)
+        except ValueError:
+            pass
+    return value
@@ -0,0 +1,11 @@
+"""
+Shared helpers for the scoring engines
+
+Components:
+- rounding: round2, Python's round(value, 2) over arrays, so the batch
+  engines report exactly the scores their per-case methods do
+"""
+
+from .rounding import round2
+
+__all__ = ['round2']
@@ -0,0 +1,21 @@
+"""
+Rounding
+Python's round() semantics for numpy arrays
+"""
+
+import numpy as np
+
+
+def round2(values) -> np.ndarray:
+    """
+    round(value, 2) for an array (or list), matching Python's round() exactly
+
+    np.round only disagrees with round() when value * 100 is within float
+    error of a .5 tie, so just those values go through round().
+    """
+    values = np.asarray(values, dtype=float)
+    scaled = values * 100
+    rounded = np.rint(scaled) / 100
+    near_tie = np.abs(scaled - np.floor(scaled) - 0.5) < 1e-6
+    rounded[near_tie] = [round(value, 2) for value in values[near_tie].tolist()]
+    return rounded
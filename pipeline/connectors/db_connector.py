@@ -39,3 +39,23 @@ class DBConnector:
             print(f"Query execution error: {e}")
             self.connection.rollback()
             return None
+    
+    def stream_query(self, query, params=None, chunk_size=10000, name='collectiq_stream'):
+        """
+        Stream a large result set in chunks through a server-side cursor
+        
+        Only chunk_size rows are held client-side at a time. Yields
+        (column_names, rows) per chunk.
+        """
+        cursor = self.connection.cursor(name=name)
+        cursor.itersize = chunk_size
+        try:
+            cursor.execute(query, params)
+            while True:
+                rows = cursor.fetchmany(chunk_size)
+                if not rows:
+                    break
+                yield [column[0] for column in cursor.description], rows
+        finally:
+            cursor.close()
+            self.connection.rollback()